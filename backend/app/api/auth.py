@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.models.user import User
 from app.schemas.user import UserCreate, UserLogin, UserResponse, Token
-from app.utils.auth import verify_password, get_password_hash, create_tokens, verify_token
+from app.utils.auth import create_tokens, verify_token
+from app.utils.password_hasher import password_hasher
 from app.utils.audit import log_audit_event, get_client_ip, get_user_agent
 from app.utils.rate_limiter import rate_limiter
 from app.utils.security import get_current_user
@@ -17,11 +19,11 @@ router = APIRouter(prefix="/auth", tags=["authentication"])
 async def register(
     user_data: UserCreate,
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Register a new user."""
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = await db.scalar(select(User).where(User.email == user_data.email))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -29,7 +31,7 @@ async def register(
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await password_hasher.hash(user_data.password)
     db_user = User(
         email=user_data.email,
         hashed_password=hashed_password,
@@ -41,11 +43,11 @@ async def register(
     )
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     
     # Log audit event
-    log_audit_event(
+    await log_audit_event(
         db=db,
         user=db_user,
         action="register",
@@ -62,13 +64,13 @@ async def register(
 async def login(
     user_credentials: UserLogin,
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Login user and return tokens."""
     # Find user
-    user = db.query(User).filter(User.email == user_credentials.email).first()
+    user = await db.scalar(select(User).where(User.email == user_credentials.email))
     
-    if not user or not verify_password(user_credentials.password, user.hashed_password):
+    if not user or not await password_hasher.verify(user_credentials.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
@@ -82,13 +84,13 @@ async def login(
     
     # Update last login
     user.last_login = datetime.utcnow()
-    db.commit()
+    await db.commit()
     
     # Create tokens
     tokens = create_tokens(user.id, user.email, user.role.value)
     
     # Log audit event
-    log_audit_event(
+    await log_audit_event(
         db=db,
         user=user,
         action="login",
@@ -105,7 +107,7 @@ async def login(
 async def refresh_token(
     refresh_token: str,
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Refresh access token using refresh token."""
     try:
@@ -113,7 +115,7 @@ async def refresh_token(
         token_data = verify_token(refresh_token, "refresh")
         
         # Get user
-        user = db.query(User).filter(User.id == token_data.user_id).first()
+        user = await db.scalar(select(User).where(User.id == token_data.user_id))
         if not user or not user.is_active:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -124,7 +126,7 @@ async def refresh_token(
         tokens = create_tokens(user.id, user.email, user.role.value)
         
         # Log audit event
-        log_audit_event(
+        await log_audit_event(
             db=db,
             user=user,
             action="token_refresh",
@@ -155,11 +157,11 @@ async def get_current_user_profile(
 async def logout(
     request: Request,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Logout user (client should discard tokens)."""
     # Log audit event
-    log_audit_event(
+    await log_audit_event(
         db=db,
         user=current_user,
         action="logout",
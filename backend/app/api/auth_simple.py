@@ -1,9 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from app.database import get_async_mongo_collection
-from app.schemas.user_simple import UserCreate, UserLogin, UserResponse, Token
-from app.utils.auth_simple import verify_password, get_password_hash, create_tokens, verify_token
+from app.schemas.user_simple import UserCreate, UserLogin, UserResponse, Token, LogoutRequest
+from app.utils.auth_simple import create_tokens, verify_token
+from app.utils.password_hasher import password_hasher
 from app.utils.rate_limiter import rate_limiter
+from app.utils.security_simple import get_current_user, security
+from app.utils.token_cache import token_cache
+from fastapi.security import HTTPAuthorizationCredentials
 from datetime import datetime
+from typing import Optional
 import uuid
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
@@ -36,7 +41,7 @@ async def register(
         
         # Create new user
         user_id = str(uuid.uuid4())
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await password_hasher.hash(user_data.password)
         
         user_doc = {
             "_id": user_id,
@@ -88,7 +93,7 @@ async def login(
             )
         
         # Verify password
-        if not verify_password(user_credentials.password, user["hashed_password"]):
+        if not await password_hasher.verify(user_credentials.password, user["hashed_password"]):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid credentials"
@@ -129,11 +134,17 @@ async def refresh_token(
 ):
     """Refresh access token using refresh token."""
     try:
-        # Verify refresh token
-        payload = verify_token(refresh_token)
+        # Verify refresh token, rejecting ones revoked at logout
+        try:
+            payload = token_cache.get_claims(refresh_token, verify_token)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid refresh token"
+            )
         user_id = payload.get("sub")
         
-        if not user_id:
+        if not user_id or payload.get("type") != "refresh":
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid refresh token"
@@ -172,9 +183,28 @@ async def refresh_token(
 
 @router.post("/logout")
 async def logout(
-    request: Request
+    request: Request,
+    body: Optional[LogoutRequest] = None,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user = Depends(get_current_user)
 ):
-    """Logout user (invalidate tokens)."""
+    """Logout user (invalidate the access token and, when given, the refresh token)."""
+    refresh_payload = None
+    if body and body.refresh_token:
+        try:
+            refresh_payload = verify_token(body.refresh_token)
+        except ValueError:
+            refresh_payload = {}
+        if refresh_payload.get("sub") != current_user["id"] or refresh_payload.get("type") != "refresh":
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid refresh token"
+            )
+    
+    payload = token_cache.get_claims(credentials.credentials, verify_token)
+    await token_cache.revoke(credentials.credentials, payload.get("exp"))
+    if refresh_payload:
+        await token_cache.revoke(body.refresh_token, refresh_payload.get("exp"))
     return {"message": "Logged out successfully"}
 
 
@@ -1,23 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 from app.database import get_async_mongo_collection
 from app.schemas.chat import (
-    ChatMessageCreate, ChatMessageResponse, ChatSessionResponse,
-    SymptomAnalysisRequest, SymptomAnalysisResponse, ChatResponse
+    ChatMessage, ChatMessageCreate, ChatMessageResponse, ChatSessionResponse,
+    SymptomAnalysisRequest, SymptomAnalysisResponse, SymptomJobResponse, ChatResponse
 )
-from app.services.gemini_service import GeminiAIService
-from app.services.cache_service import cache_service
-from app.services.mcp_chatbot import MCPChatbotService  # Update the path if the module is located elsewhere
-gemini_service = GeminiAIService()
-mcp_chatbot = MCPChatbotService()  # Initialize MCPChatbotService
-from app.utils.security_simple import get_current_active_user
+from app.services.gemini_service import get_gemini_service
+from app.services.symptom_cache import symptom_cache
+from app.services.symptom_jobs import create_job, get_job, job_events
+from app.config import settings
+from app.services.mcp_chatbot import get_mcp_chatbot
+from app.utils.security_simple import get_current_active_user, authenticate_token
 from app.utils.rate_limiter import strict_rate_limiter
 from app.utils.audit_simple import log_audit_event, get_client_ip, get_user_agent
+from bson import ObjectId
 from datetime import datetime
+import base64
+import json
 import uuid
 from typing import Optional
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
+# Fields needed for ChatSessionResponse; never load message bodies for listings
+SESSION_PROJECTION = {
+    "session_id": 1,
+    "user_id": 1,
+    "is_active": 1,
+    "created_at": 1,
+    "updated_at": 1,
+    "ended_at": 1
+}
+
 
 @router.post("/symptom", response_model=SymptomAnalysisResponse)
 async def analyze_symptoms(
@@ -30,25 +44,21 @@ async def analyze_symptoms(
         # Convert request to dict for MCP chatbot
         analysis_data = request_data.dict()
         
-        # Generate cache key
-        cache_key = cache_service.generate_key(
-            "symptom_analysis",
-            str(current_user["id"]),
-            hash(str(sorted(request_data.symptoms)))
-        )
-        
-        # Try to get from cache first
-        cached_result = await cache_service.get(cache_key)
-        if cached_result:
-            return SymptomAnalysisResponse(**cached_result)
+        async def run_analysis():
+            # Analyze symptoms using Gemini
+            result = await get_gemini_service().analyze_symptoms(analysis_data)
+            return result.dict()
         
-        # Analyze symptoms using Gemini
-        result = await gemini_service.analyze_symptoms(analysis_data)
-        
-        # Cache the result for 1 hour
-        await cache_service.set(cache_key, result.dict(), ttl=3600)
+        # Cache the result for 1 hour under a canonical key shared across users
+        # and workers; concurrent misses share one Gemini call
+        result = await symptom_cache.get_or_analyze(
+            analysis_data,
+            run_analysis,
+            3600,
+            stale_ttl=settings.symptom_cache_stale_ttl
+        )
         
-        return result
+        return SymptomAnalysisResponse(**result)
         
     except Exception as e:
         raise HTTPException(
@@ -57,6 +67,72 @@ async def analyze_symptoms(
         )
 
 
+def _job_response(job: dict) -> SymptomJobResponse:
+    return SymptomJobResponse(
+        job_id=job["_id"],
+        status=job["status"],
+        created_at=job["created_at"],
+        updated_at=job["updated_at"],
+        result=job.get("analysis"),
+        error=job.get("error")
+    )
+
+
+@router.post("/symptom/jobs", response_model=SymptomJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_symptom_job(
+    request_data: SymptomAnalysisRequest,
+    current_user = Depends(get_current_active_user)
+):
+    """Queue a symptom analysis for a background worker and return its job id."""
+    try:
+        job = await create_job(str(current_user["id"]), request_data.dict())
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Failed to queue symptom analysis: {str(e)}"
+        )
+    return _job_response(job)
+
+
+@router.get("/symptom/jobs/{job_id}", response_model=SymptomJobResponse)
+async def get_symptom_job(
+    job_id: str,
+    current_user = Depends(get_current_active_user)
+):
+    """Get the status and, once completed, the result of a symptom analysis job."""
+    job = await get_job(job_id, str(current_user["id"]))
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Symptom analysis job not found"
+        )
+    return _job_response(job)
+
+
+@router.get("/symptom/jobs/{job_id}/events")
+async def stream_symptom_job(
+    job_id: str,
+    current_user = Depends(get_current_active_user)
+):
+    """Stream job status changes as server-sent events until the job finishes."""
+    user_id = str(current_user["id"])
+    if not await get_job(job_id, user_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Symptom analysis job not found"
+        )
+    
+    async def event_stream():
+        async for job in job_events(job_id, user_id):
+            yield f"event: {job['status']}\ndata: {_job_response(job).model_dump_json()}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post("/session", response_model=ChatSessionResponse)
 async def create_chat_session(
     current_user = Depends(get_current_active_user)
@@ -72,7 +148,7 @@ async def create_chat_session(
         "is_active": True,
         "created_at": datetime.utcnow(),
         "updated_at": datetime.utcnow(),
-        "messages": []
+        "message_count": 0
     }
     
     result = await chat_collection.insert_one(session_data)
@@ -87,15 +163,61 @@ async def create_chat_session(
     )
 
 
+def _encode_cursor(doc: dict) -> str:
+    """Encode the (created_at, _id) position of a session or message as an opaque cursor."""
+    raw = json.dumps({"c": doc["created_at"].isoformat(), "i": str(doc["_id"])})
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    """Decode a cursor produced by _encode_cursor."""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        created_at = datetime.fromisoformat(data["c"])
+        session_key = ObjectId(data["i"]) if ObjectId.is_valid(data["i"]) else data["i"]
+        return created_at, session_key
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+async def _user_owns_session(session_id: str, user_id: str) -> bool:
+    chat_collection = get_async_mongo_collection("chat_sessions")
+    session = await chat_collection.find_one({"session_id": session_id, "user_id": user_id}, {"_id": 1})
+    return session is not None
+
+
 @router.get("/sessions", response_model=list[ChatSessionResponse])
 async def get_chat_sessions(
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
     current_user = Depends(get_current_active_user)
 ):
-    """Get user's chat sessions."""
+    """Get user's chat sessions, newest first.
+    
+    Results are keyset-paginated over (created_at, _id). When more sessions
+    exist, the cursor for the next page is returned in the X-Next-Cursor header.
+    """
     chat_collection = get_async_mongo_collection("chat_sessions")
+    query = {"user_id": str(current_user["id"])}
+    if cursor:
+        created_at, session_key = _decode_cursor(cursor)
+        query["$or"] = [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": session_key}}
+        ]
+    
     sessions = await chat_collection.find(
-        {"user_id": str(current_user["id"])}
-    ).sort("created_at", -1).to_list(length=None)
+        query,
+        SESSION_PROJECTION
+    ).sort([("created_at", -1), ("_id", -1)]).limit(limit + 1).to_list(length=limit + 1)
+    
+    if len(sessions) > limit:
+        sessions = sessions[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(sessions[-1])
     
     return [
         ChatSessionResponse(
@@ -115,12 +237,15 @@ async def get_chat_session(
     session_id: str,
     current_user = Depends(get_current_active_user)
 ):
-    """Get a specific chat session with messages."""
+    """Get a specific chat session; its messages are paged by GET /sessions/{session_id}/messages."""
     chat_collection = get_async_mongo_collection("chat_sessions")
-    session = await chat_collection.find_one({
-        "session_id": session_id,
-        "user_id": str(current_user["id"])
-    })
+    session = await chat_collection.find_one(
+        {
+            "session_id": session_id,
+            "user_id": str(current_user["id"])
+        },
+        SESSION_PROJECTION
+    )
     
     if not session:
         raise HTTPException(
@@ -138,23 +263,66 @@ async def get_chat_session(
     )
 
 
+@router.get("/sessions/{session_id}/messages", response_model=list[ChatMessage])
+async def get_session_messages(
+    session_id: str,
+    response: Response,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
+    current_user = Depends(get_current_active_user)
+):
+    """Get a page of a session's messages in chronological order.
+    
+    Pages run backwards from the newest message over (created_at, _id). When
+    older messages exist, the cursor for them is returned in the X-Next-Cursor header.
+    """
+    if not await _user_owns_session(session_id, str(current_user["id"])):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Chat session not found"
+        )
+    
+    before = _decode_cursor(cursor) if cursor else None
+    messages = await get_mcp_chatbot().get_session_messages(session_id, limit + 1, before)
+    if len(messages) > limit:
+        messages = messages[1:]
+        response.headers["X-Next-Cursor"] = _encode_cursor(messages[0])
+    
+    return [
+        ChatMessage(
+            id=str(message["_id"]),
+            session_id=message["session_id"],
+            content=message.get("content") or "",
+            message_type=message["role"],
+            is_ai_generated=message["role"] == "assistant",
+            created_at=message["created_at"]
+        )
+        for message in messages
+    ]
+
+
 @router.post("/sessions/{session_id}/messages", response_model=ChatResponse)
 async def send_message(
     session_id: str,
     message_data: ChatMessageCreate,
     request: Request,
+    response: Response,
     current_user = Depends(get_current_active_user)
 ):
     """Send a message in a chat session using MCP chatbot."""
     try:
         # Process message using MCP chatbot
-        response = await mcp_chatbot.process_chat_message(
+        chat_response = await get_mcp_chatbot().process_chat_message(
             message=message_data.content,
             user_id=str(current_user["id"]),
             session_id=session_id
         )
         
-        return response
+        if chat_response.stage_timings:
+            response.headers["Server-Timing"] = ", ".join(
+                f"{stage};dur={duration}" for stage, duration in chat_response.stage_timings.items()
+            )
+        return chat_response
         
     except Exception as e:
         raise HTTPException(
@@ -163,6 +331,70 @@ async def send_message(
         )
 
 
+@router.post("/sessions/{session_id}/messages/stream")
+async def stream_message(
+    session_id: str,
+    message_data: ChatMessageCreate,
+    current_user = Depends(get_current_active_user)
+):
+    """Send a message and stream the reply as server-sent events."""
+    if not await _user_owns_session(session_id, str(current_user["id"])):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Chat session not found"
+        )
+    
+    async def event_stream():
+        async for event in get_mcp_chatbot().stream_chat_message(
+            message=message_data.content,
+            user_id=str(current_user["id"]),
+            session_id=session_id
+        ):
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.websocket("/sessions/{session_id}/ws")
+async def chat_websocket(websocket: WebSocket, session_id: str, token: str):
+    """Chat over a WebSocket; each ``{"content": ...}`` message gets a streamed reply."""
+    try:
+        current_user = authenticate_token(token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    if not await _user_owns_session(session_id, str(current_user["id"])):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    await websocket.accept()
+    try:
+        while True:
+            try:
+                data = await websocket.receive_json()
+            except (KeyError, TypeError, ValueError):
+                # Binary or non-JSON frames; json.JSONDecodeError is a ValueError
+                await websocket.send_json({"type": "error", "message": "Message must be JSON"})
+                continue
+            content = data.get("content") if isinstance(data, dict) else None
+            if not content:
+                await websocket.send_json({"type": "error", "message": "Message content is required"})
+                continue
+            
+            async for event in get_mcp_chatbot().stream_chat_message(
+                message=content,
+                user_id=str(current_user["id"]),
+                session_id=session_id
+            ):
+                await websocket.send_json(event)
+    except WebSocketDisconnect:
+        pass
+
+
 @router.delete("/sessions/{session_id}")
 async def end_chat_session(
     session_id: str,
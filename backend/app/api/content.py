@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.models.user import User
 from app.models.content import Service, FAQ
@@ -18,7 +19,7 @@ router = APIRouter(prefix="/content", tags=["content"])
 # Services endpoints
 @router.get("/services", response_model=List[ServiceResponse])
 async def get_services(
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get all active services."""
     # Try cache first
@@ -29,10 +30,17 @@ async def get_services(
         return cached_services
     
     # Get from database
-    services = db.query(Service).filter(Service.is_active == True).order_by(Service.order).all()
+    result = await db.scalars(
+        select(Service).where(Service.is_active == True).order_by(Service.order)
+    )
+    services = result.all()
     
     # Cache for 1 hour
-    await cache_service.set(cache_key, services, ttl=3600)
+    await cache_service.set(
+        cache_key,
+        [ServiceResponse.model_validate(service).model_dump(mode="json") for service in services],
+        ttl=3600
+    )
     
     return services
 
@@ -42,20 +50,20 @@ async def create_service(
     service_data: ServiceCreate,
     request: Request,
     current_user: User = Depends(require_roles(["admin"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new service (admin only)."""
     service = Service(**service_data.dict())
     
     db.add(service)
-    db.commit()
-    db.refresh(service)
+    await db.commit()
+    await db.refresh(service)
     
     # Clear cache
     await cache_service.delete(cache_service.generate_key("services", "active"))
     
     # Log audit event
-    log_audit_event(
+    await log_audit_event(
         db=db,
         user=current_user,
         action="create_service",
@@ -74,10 +82,10 @@ async def update_service(
     service_data: ServiceUpdate,
     request: Request,
     current_user: User = Depends(require_roles(["admin"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update a service (admin only)."""
-    service = db.query(Service).filter(Service.id == service_id).first()
+    service = await db.scalar(select(Service).where(Service.id == service_id))
     
     if not service:
         raise HTTPException(
@@ -89,14 +97,14 @@ async def update_service(
     for field, value in service_data.dict(exclude_unset=True).items():
         setattr(service, field, value)
     
-    db.commit()
-    db.refresh(service)
+    await db.commit()
+    await db.refresh(service)
     
     # Clear cache
     await cache_service.delete(cache_service.generate_key("services", "active"))
     
     # Log audit event
-    log_audit_event(
+    await log_audit_event(
         db=db,
         user=current_user,
         action="update_service",
@@ -114,10 +122,10 @@ async def delete_service(
     service_id: int,
     request: Request,
     current_user: User = Depends(require_roles(["admin"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete a service (admin only)."""
-    service = db.query(Service).filter(Service.id == service_id).first()
+    service = await db.scalar(select(Service).where(Service.id == service_id))
     
     if not service:
         raise HTTPException(
@@ -125,14 +133,14 @@ async def delete_service(
             detail="Service not found"
         )
     
-    db.delete(service)
-    db.commit()
+    await db.delete(service)
+    await db.commit()
     
     # Clear cache
     await cache_service.delete(cache_service.generate_key("services", "active"))
     
     # Log audit event
-    log_audit_event(
+    await log_audit_event(
         db=db,
         user=current_user,
         action="delete_service",
@@ -149,7 +157,7 @@ async def delete_service(
 @router.get("/faq", response_model=List[FAQResponse])
 async def get_faqs(
     category: str = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get all active FAQs, optionally filtered by category."""
     # Try cache first
@@ -160,15 +168,20 @@ async def get_faqs(
         return cached_faqs
     
     # Get from database
-    query = db.query(FAQ).filter(FAQ.is_active == True)
+    query = select(FAQ).where(FAQ.is_active == True)
     
     if category:
-        query = query.filter(FAQ.category == category)
+        query = query.where(FAQ.category == category)
     
-    faqs = query.order_by(FAQ.order).all()
+    result = await db.scalars(query.order_by(FAQ.order))
+    faqs = result.all()
     
     # Cache for 1 hour
-    await cache_service.set(cache_key, faqs, ttl=3600)
+    await cache_service.set(
+        cache_key,
+        [FAQResponse.model_validate(faq).model_dump(mode="json") for faq in faqs],
+        ttl=3600
+    )
     
     return faqs
 
@@ -178,14 +191,14 @@ async def create_faq(
     faq_data: FAQCreate,
     request: Request,
     current_user: User = Depends(require_roles(["admin"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new FAQ (admin only)."""
     faq = FAQ(**faq_data.dict())
     
     db.add(faq)
-    db.commit()
-    db.refresh(faq)
+    await db.commit()
+    await db.refresh(faq)
     
     # Clear cache
     await cache_service.delete(cache_service.generate_key("faqs", "active", "all"))
@@ -193,7 +206,7 @@ async def create_faq(
         await cache_service.delete(cache_service.generate_key("faqs", "active", faq.category))
     
     # Log audit event
-    log_audit_event(
+    await log_audit_event(
         db=db,
         user=current_user,
         action="create_faq",
@@ -212,10 +225,10 @@ async def update_faq(
     faq_data: FAQUpdate,
     request: Request,
     current_user: User = Depends(require_roles(["admin"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update a FAQ (admin only)."""
-    faq = db.query(FAQ).filter(FAQ.id == faq_id).first()
+    faq = await db.scalar(select(FAQ).where(FAQ.id == faq_id))
     
     if not faq:
         raise HTTPException(
@@ -227,8 +240,8 @@ async def update_faq(
     for field, value in faq_data.dict(exclude_unset=True).items():
         setattr(faq, field, value)
     
-    db.commit()
-    db.refresh(faq)
+    await db.commit()
+    await db.refresh(faq)
     
     # Clear cache
     await cache_service.delete(cache_service.generate_key("faqs", "active", "all"))
@@ -236,7 +249,7 @@ async def update_faq(
         await cache_service.delete(cache_service.generate_key("faqs", "active", faq.category))
     
     # Log audit event
-    log_audit_event(
+    await log_audit_event(
         db=db,
         user=current_user,
         action="update_faq",
@@ -254,10 +267,10 @@ async def delete_faq(
     faq_id: int,
     request: Request,
     current_user: User = Depends(require_roles(["admin"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete a FAQ (admin only)."""
-    faq = db.query(FAQ).filter(FAQ.id == faq_id).first()
+    faq = await db.scalar(select(FAQ).where(FAQ.id == faq_id))
     
     if not faq:
         raise HTTPException(
@@ -266,8 +279,8 @@ async def delete_faq(
         )
     
     category = faq.category
-    db.delete(faq)
-    db.commit()
+    await db.delete(faq)
+    await db.commit()
     
     # Clear cache
     await cache_service.delete(cache_service.generate_key("faqs", "active", "all"))
@@ -275,7 +288,7 @@ async def delete_faq(
         await cache_service.delete(cache_service.generate_key("faqs", "active", category))
     
     # Log audit event
-    log_audit_event(
+    await log_audit_event(
         db=db,
         user=current_user,
         action="delete_faq",
@@ -1,63 +1,74 @@
-from fastapi import APIRouter, Depends
-from app.database_manager import db_manager
-from app.services.gemini_service import GeminiAIService
+from fastapi import APIRouter, Response, status
+from app.database import mongo_pool_stats
+from app.services.health_monitor import health_monitor
 from typing import Dict
 import time
 
 router = APIRouter(tags=["health"])
 
+
 @router.get("/health")
 async def health_check() -> Dict:
     """
     Comprehensive health check endpoint.
-    Checks database, AI service, and overall API health.
+    Serves the latest background check results for the database, LLM providers and Celery.
     """
-    start_time = time.time()
-    
-    # Check database
-    db_healthy = await db_manager.health_check()
-    
-    # Check AI service
-    ai_service = GeminiAIService()
-    ai_healthy = await ai_service.health_check()
-    
-    # Calculate response time
-    response_time = time.time() - start_time
-    
     return {
-        "status": "healthy" if (db_healthy and ai_healthy) else "degraded",
+        "status": health_monitor.status(),
         "timestamp": time.time(),
-        "response_time_ms": round(response_time * 1000, 2),
-        "services": {
-            "database": {
-                "status": "healthy" if db_healthy else "unhealthy",
-                "type": "mongodb"
-            },
-            "ai_service": {
-                "status": "healthy" if ai_healthy else "unhealthy",
-                "type": "gemini"
-            }
-        },
+        "services": health_monitor.results(),
+        "mongo_pool": mongo_pool_stats(),
         "version": "1.0.0"
     }
 
+
+@router.get("/health/live")
+async def liveness() -> Dict:
+    """Liveness probe: the process is up and serving requests."""
+    return {"status": "alive", "timestamp": time.time()}
+
+
+@router.get("/health/ready")
+async def readiness(response: Response) -> Dict:
+    """Readiness probe: every critical dependency passed its latest check."""
+    ready = health_monitor.is_ready()
+    if not ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return {
+        "status": "ready" if ready else "not_ready",
+        "timestamp": time.time(),
+        "services": health_monitor.results()
+    }
+
+
 @router.get("/health/db")
 async def database_health() -> Dict:
     """Database-specific health check."""
-    healthy = await db_manager.health_check()
+    result = health_monitor.results().get("database", {"status": "unknown"})
     return {
-        "status": "healthy" if healthy else "unhealthy",
+        **result,
         "timestamp": time.time(),
-        "service": "mongodb"
+        "service": "mongodb",
+        "pool": mongo_pool_stats()
     }
 
+
 @router.get("/health/ai")
 async def ai_service_health() -> Dict:
-    """AI service health check."""
-    ai_service = GeminiAIService()
-    healthy = await ai_service.health_check()
+    """AI provider health checks; ``not_configured`` when no provider has an API key."""
+    providers = {
+        name[len("llm_"):]: result
+        for name, result in health_monitor.results().items()
+        if name.startswith("llm_")
+    }
+    if not providers:
+        ai_status = "not_configured"
+    elif any(result["status"] == "healthy" for result in providers.values()):
+        ai_status = "healthy"
+    else:
+        ai_status = "unhealthy"
     return {
-        "status": "healthy" if healthy else "unhealthy",
+        "status": ai_status,
         "timestamp": time.time(),
-        "service": "gemini"
-    }
\ No newline at end of file
+        "providers": providers
+    }
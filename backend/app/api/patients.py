@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from app.database import get_db
 from app.models.user import User
 from app.models.patient import Patient, MedicalHistory, Allergy, Medication
 from app.schemas.patient import (
-    PatientCreate, PatientUpdate, PatientResponse,
+    PatientCreate, PatientUpdate, PatientResponse, PatientRecordResponse,
     MedicalHistoryCreate, MedicalHistoryUpdate, MedicalHistoryResponse,
     AllergyCreate, AllergyUpdate, AllergyResponse,
     MedicationCreate, MedicationUpdate, MedicationResponse
@@ -12,6 +14,7 @@ from app.schemas.patient import (
 from app.utils.security import get_current_active_user, require_roles
 from app.utils.audit import log_audit_event, get_client_ip, get_user_agent
 from typing import List
+import hashlib
 
 router = APIRouter(prefix="/patients", tags=["patients"])
 
@@ -19,10 +22,10 @@ router = APIRouter(prefix="/patients", tags=["patients"])
 @router.get("/me", response_model=PatientResponse)
 async def get_my_patient_profile(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get current user's patient profile."""
-    patient = db.query(Patient).filter(Patient.user_id == current_user.id).first()
+    patient = await db.scalar(select(Patient).where(Patient.user_id == current_user.id))
     
     if not patient:
         raise HTTPException(
@@ -33,27 +36,73 @@ async def get_my_patient_profile(
     return patient
 
 
+def _record_etag(patient: Patient) -> str:
+    """Build a weak ETag from the ids and modification times of a patient record."""
+    versions = [[(patient.id, patient.updated_at or patient.created_at)]]
+    for rows in (patient.medical_history, patient.allergies, patient.medications):
+        versions.append(sorted((row.id, row.updated_at or row.created_at) for row in rows))
+    digest = hashlib.sha256(repr(versions).encode()).hexdigest()[:32]
+    return f'W/"{digest}"'
+
+
+@router.get("/me/record", response_model=PatientRecordResponse)
+async def get_my_patient_record(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get current user's profile, medical history, allergies and medications in one call.
+    
+    Supports If-None-Match: an unchanged record returns 304 without a body.
+    """
+    patient = await db.scalar(
+        select(Patient)
+        .where(Patient.user_id == current_user.id)
+        .options(
+            selectinload(Patient.medical_history),
+            selectinload(Patient.allergies),
+            selectinload(Patient.medications)
+        )
+    )
+    
+    if not patient:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Patient profile not found"
+        )
+    
+    etag = _record_etag(patient)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("If-None-Match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    response.headers.update(headers)
+    return patient
+
+
 @router.post("/", response_model=PatientResponse, status_code=status.HTTP_201_CREATED)
 async def create_patient_profile(
     patient_data: PatientCreate,
     request: Request,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create or update patient profile."""
     # Check if patient profile already exists
-    existing_patient = db.query(Patient).filter(Patient.user_id == current_user.id).first()
+    existing_patient = await db.scalar(select(Patient).where(Patient.user_id == current_user.id))
     
     if existing_patient:
         # Update existing profile
         for field, value in patient_data.dict(exclude_unset=True).items():
             setattr(existing_patient, field, value)
         
-        db.commit()
-        db.refresh(existing_patient)
+        await db.commit()
+        await db.refresh(existing_patient)
         
         # Log audit event
-        log_audit_event(
+        await log_audit_event(
             db=db,
             user=current_user,
             action="update_patient_profile",
@@ -72,11 +121,11 @@ async def create_patient_profile(
         )
         
         db.add(patient)
-        db.commit()
-        db.refresh(patient)
+        await db.commit()
+        await db.refresh(patient)
         
         # Log audit event
-        log_audit_event(
+        await log_audit_event(
             db=db,
             user=current_user,
             action="create_patient_profile",
@@ -93,10 +142,10 @@ async def create_patient_profile(
 async def get_patient_profile(
     patient_id: int,
     current_user: User = Depends(require_roles(["doctor", "admin"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get patient profile by ID (doctors and admins only)."""
-    patient = db.query(Patient).filter(Patient.id == patient_id).first()
+    patient = await db.scalar(select(Patient).where(Patient.id == patient_id))
     
     if not patient:
         raise HTTPException(
@@ -111,10 +160,10 @@ async def get_patient_profile(
 @router.get("/me/medical-history", response_model=List[MedicalHistoryResponse])
 async def get_my_medical_history(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get current user's medical history."""
-    patient = db.query(Patient).filter(Patient.user_id == current_user.id).first()
+    patient = await db.scalar(select(Patient).where(Patient.user_id == current_user.id))
     
     if not patient:
         raise HTTPException(
@@ -122,7 +171,8 @@ async def get_my_medical_history(
             detail="Patient profile not found"
         )
     
-    return patient.medical_history
+    result = await db.scalars(select(MedicalHistory).where(MedicalHistory.patient_id == patient.id))
+    return result.all()
 
 
 @router.post("/me/medical-history", response_model=MedicalHistoryResponse, status_code=status.HTTP_201_CREATED)
@@ -130,10 +180,10 @@ async def add_medical_history(
     history_data: MedicalHistoryCreate,
     request: Request,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Add medical history entry."""
-    patient = db.query(Patient).filter(Patient.user_id == current_user.id).first()
+    patient = await db.scalar(select(Patient).where(Patient.user_id == current_user.id))
     
     if not patient:
         raise HTTPException(
@@ -147,11 +197,11 @@ async def add_medical_history(
     )
     
     db.add(medical_history)
-    db.commit()
-    db.refresh(medical_history)
+    await db.commit()
+    await db.refresh(medical_history)
     
     # Log audit event
-    log_audit_event(
+    await log_audit_event(
         db=db,
         user=current_user,
         action="add_medical_history",
@@ -168,10 +218,10 @@ async def add_medical_history(
 @router.get("/me/allergies", response_model=List[AllergyResponse])
 async def get_my_allergies(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get current user's allergies."""
-    patient = db.query(Patient).filter(Patient.user_id == current_user.id).first()
+    patient = await db.scalar(select(Patient).where(Patient.user_id == current_user.id))
     
     if not patient:
         raise HTTPException(
@@ -179,7 +229,8 @@ async def get_my_allergies(
             detail="Patient profile not found"
         )
     
-    return patient.allergies
+    result = await db.scalars(select(Allergy).where(Allergy.patient_id == patient.id))
+    return result.all()
 
 
 @router.post("/me/allergies", response_model=AllergyResponse, status_code=status.HTTP_201_CREATED)
@@ -187,10 +238,10 @@ async def add_allergy(
     allergy_data: AllergyCreate,
     request: Request,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Add allergy entry."""
-    patient = db.query(Patient).filter(Patient.user_id == current_user.id).first()
+    patient = await db.scalar(select(Patient).where(Patient.user_id == current_user.id))
     
     if not patient:
         raise HTTPException(
@@ -204,11 +255,11 @@ async def add_allergy(
     )
     
     db.add(allergy)
-    db.commit()
-    db.refresh(allergy)
+    await db.commit()
+    await db.refresh(allergy)
     
     # Log audit event
-    log_audit_event(
+    await log_audit_event(
         db=db,
         user=current_user,
         action="add_allergy",
@@ -225,10 +276,10 @@ async def add_allergy(
 @router.get("/me/medications", response_model=List[MedicationResponse])
 async def get_my_medications(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get current user's medications."""
-    patient = db.query(Patient).filter(Patient.user_id == current_user.id).first()
+    patient = await db.scalar(select(Patient).where(Patient.user_id == current_user.id))
     
     if not patient:
         raise HTTPException(
@@ -236,7 +287,8 @@ async def get_my_medications(
             detail="Patient profile not found"
         )
     
-    return patient.medications
+    result = await db.scalars(select(Medication).where(Medication.patient_id == patient.id))
+    return result.all()
 
 
 @router.post("/me/medications", response_model=MedicationResponse, status_code=status.HTTP_201_CREATED)
@@ -244,10 +296,10 @@ async def add_medication(
     medication_data: MedicationCreate,
     request: Request,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Add medication entry."""
-    patient = db.query(Patient).filter(Patient.user_id == current_user.id).first()
+    patient = await db.scalar(select(Patient).where(Patient.user_id == current_user.id))
     
     if not patient:
         raise HTTPException(
@@ -261,11 +313,11 @@ async def add_medication(
     )
     
     db.add(medication)
-    db.commit()
-    db.refresh(medication)
+    await db.commit()
+    await db.refresh(medication)
     
     # Log audit event
-    log_audit_event(
+    await log_audit_event(
         db=db,
         user=current_user,
         action="add_medication",
@@ -4,8 +4,8 @@ from app.config import settings
 # Create Celery app
 celery_app = Celery(
     "healthify",
-    broker=f"mongodb://{settings.mongo_url.split('://')[1]}/celery_broker",
-    backend=f"mongodb://{settings.mongo_url.split('://')[1]}/celery_backend",
+    broker=settings.celery_broker_url or f"mongodb://{settings.mongo_url.split('://')[1]}/celery_broker",
+    backend=settings.celery_result_backend or f"mongodb://{settings.mongo_url.split('://')[1]}/celery_backend",
     include=["app.tasks"]
 )
 
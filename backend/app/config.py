@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List, Optional
+from typing import Dict, List, Optional
 import os
 
 
@@ -7,32 +7,115 @@ class Settings(BaseSettings):
     # MongoDB (Primary Database)
     mongo_url: str = "mongodb://localhost:27017/healthify"
     mongo_database: str = "healthify"
+    mongo_max_pool_size: int = 50  # per process
+    mongo_min_pool_size: int = 10
+    mongo_max_idle_time_ms: int = 30000
+    mongo_connect_timeout_ms: int = 5000
+    mongo_server_selection_timeout_ms: int = 5000
+    mongo_socket_timeout_ms: Optional[int] = None
+    mongo_wait_queue_timeout_ms: int = 10000  # max wait for a free pooled connection
+    mongo_compressors: Optional[str] = None  # e.g. "zstd,snappy,zlib"; zstd/snappy need zstandard/python-snappy
+    mongo_read_preference: str = "primary"  # primary, primaryPreferred, secondary, secondaryPreferred, nearest
+    mongo_write_concern: Optional[str] = None  # e.g. "1" or "majority"; None uses the server default
     
-    # SQLite for local development (optional)
+    # SQL database for the SQLAlchemy-backed routers (defaults to SQLite)
     sqlite_url: str = "sqlite:///./healthify.db"
+    database_url: Optional[str] = None
+    test_database_url: str = "sqlite:///./test_healthify.db"
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 1800
+    db_echo: bool = False
     
     # Security
     secret_key: str = "your-super-secret-key-change-in-production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
     refresh_token_expire_days: int = 7
+    password_hash_executor: str = "thread"  # thread, process
+    password_hash_workers: int = 4
+    password_hash_max_pending: int = 64  # beyond this, logins are shed with 503
+    token_cache_max_size: int = 10000  # 0 disables the verified-token cache
+    token_revocation_sync_interval: float = 10.0
+    session_cache_ttl: float = 30.0  # seconds a validated session is trusted without a read; 0 disables
+    session_cache_max_size: int = 10000
+    session_activity_granularity: float = 60.0  # last_active is written at most this often per session
+    session_activity_flush_interval: float = 5.0  # seconds between bulk last_active writes
+    
+    # Audit logging
+    audit_durability: str = "buffered"  # sync, buffered, best_effort
+    audit_queue_size: int = 10000
+    audit_batch_size: int = 100
+    audit_flush_interval: float = 1.0
+    audit_write_retries: int = 3  # buffered mode retries of a failed batch before it is dropped
+    audit_retry_backoff: float = 0.5  # seconds before the first retry, doubled for each further one
     
     # AI Configuration - Gemini
     gemini_api_key: Optional[str] = None
     gemini_model: str = "gemini-1.5-pro"
     
+    # AI Configuration - Anthropic / OpenAI (optional fallbacks)
+    anthropic_api_key: Optional[str] = None
+    openai_api_key: Optional[str] = None
+    openai_model: str = "gpt-3.5-turbo"
+    
+    # LLM provider concurrency
+    gemini_max_concurrency: int = 16
+    anthropic_max_concurrency: int = 16
+    openai_max_concurrency: int = 16
+    llm_thread_pool_size: int = 8  # for provider SDKs without an async client
+    
+    # LLM provider routing
+    llm_hedge_after: float = 0.0  # seconds before racing the next provider; 0 disables hedging
+    llm_latency_window: int = 200  # calls kept per provider for p50/p95 and error rate
+    llm_min_samples: int = 20  # calls before a provider is ranked by measured latency
+    llm_breaker_failure_threshold: int = 5  # consecutive failures that open the circuit
+    llm_breaker_reset_timeout: float = 30.0  # seconds before a trial call is allowed
+    
+    # Provider-side prompt caching of static prompt prefixes
+    llm_prompt_caching: bool = True
+    anthropic_cache_min_tokens: int = 1024  # shorter prefixes cannot be cached by Anthropic
+    gemini_cache_min_tokens: int = 32768  # Gemini's minimum for cached content
+    gemini_cache_ttl: int = 3600  # seconds a Gemini cached prefix lives
+    
+    # Symptom analysis micro-batching
+    symptom_batch_max_size: int = 1  # analyses sent in one Gemini call; 1 disables batching
+    symptom_batch_window: float = 0.05  # seconds to wait for more requests before sending a batch
+    symptom_batch_fallback: bool = True  # retry failed batches and invalid items with single calls
+    
     # MCP Configuration
     mcp_enabled: bool = True
     mcp_model: str = "gemini-1.5-pro"
+    chat_fused_llm_call: bool = False  # classify and reply with one LLM call
+    chat_write_behind_queue_size: int = 1000
+    
+    # Session cleanup
+    chat_session_max_age_hours: int = 24  # active chat sessions older than this are ended
+    session_cleanup_batch_size: int = 1000  # sessions ended per update_many
+    session_cleanup_max_batches: int = 0  # per run; 0 runs until the backlog is cleared
+    user_session_ttl_index: bool = False  # let a MongoDB TTL index delete expired user sessions instead
     
     # Environment
     environment: str = "development"
     debug: bool = True
     log_level: str = "INFO"
+    log_queue_size: int = 10000  # records beyond this are dropped, not blocked on
+    request_log_sample_rate: float = 1.0  # share of successful requests logged
+    request_log_sample_rates: Dict[str, float] = {"/health": 0.01, "/health/live": 0.01, "/health/ready": 0.01}  # per-path overrides
     
     # Monitoring
     sentry_dsn: Optional[str] = None
     prometheus_enabled: bool = True
+    health_check_interval: float = 30.0  # probes are served from the last background check
+    health_check_timeout: float = 5.0
+    health_check_celery: bool = False
+    
+    # Celery
+    celery_broker_url: Optional[str] = None  # defaults to the MongoDB broker
+    celery_result_backend: Optional[str] = None  # defaults to the MongoDB backend
+    symptom_job_poll_interval: float = 1.0  # seconds between job status checks on the SSE stream
+    symptom_job_stream_timeout: float = 300.0  # SSE streams close after this many seconds
     
     # Email
     smtp_host: str = "smtp.gmail.com"
@@ -43,6 +126,16 @@ class Settings(BaseSettings):
     # Rate Limiting
     rate_limit_requests: int = 100
     rate_limit_window: int = 60
+    rate_limit_backend: str = "memory"  # memory, mongo
+    rate_limit_max_keys: int = 10000
+    rate_limit_sync_interval: float = 5.0
+    
+    # Cache
+    cache_l1_max_size: int = 1024  # 0 disables the in-process tier
+    cache_l1_max_ttl: int = 60  # bounds staleness across worker processes
+    symptom_cache_stale_ttl: int = 0  # seconds to serve an expired analysis while refreshing
+    symptom_cache_similarity_threshold: float = 0.0  # n-gram Jaccard score to reuse a near-identical analysis; 0 disables
+    symptom_cache_index_size: int = 2048  # recent symptom sets kept for similarity lookups
     
     # CORS
     allowed_origins: List[str] = ["http://localhost:3000", "http://localhost:3001"]
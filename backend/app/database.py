@@ -1,21 +1,100 @@
 from pymongo import MongoClient
 from motor.motor_asyncio import AsyncIOMotorClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
 from app.config import settings
+from app.utils.metrics import mongo_pool_listener
+from typing import Any, AsyncIterator, Dict, Optional
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
 # MongoDB setup
-mongo_client = MongoClient(settings.mongo_url)
-async_mongo_client = AsyncIOMotorClient(settings.mongo_url)
+# One sync and one async client per process, created on first use. Clients
+# inherited across fork() are discarded so each worker opens its own pool.
+_mongo_client: Optional[MongoClient] = None
+_async_mongo_client: Optional[AsyncIOMotorClient] = None
+_mongo_client_pid: Optional[int] = None
+
+def get_mongo_client_options() -> Dict[str, Any]:
+    """Connection pool, timeout, compression and consistency options from Settings."""
+    options = {
+        "appname": "healthify",
+        "maxPoolSize": settings.mongo_max_pool_size,
+        "minPoolSize": settings.mongo_min_pool_size,
+        "maxIdleTimeMS": settings.mongo_max_idle_time_ms,
+        "connectTimeoutMS": settings.mongo_connect_timeout_ms,
+        "serverSelectionTimeoutMS": settings.mongo_server_selection_timeout_ms,
+        "waitQueueTimeoutMS": settings.mongo_wait_queue_timeout_ms,
+        "readPreference": settings.mongo_read_preference,
+        "event_listeners": [mongo_pool_listener],
+    }
+    if settings.mongo_socket_timeout_ms:
+        options["socketTimeoutMS"] = settings.mongo_socket_timeout_ms
+    if settings.mongo_compressors:
+        options["compressors"] = settings.mongo_compressors
+    if settings.mongo_write_concern:
+        w = settings.mongo_write_concern
+        options["w"] = int(w) if w.isdigit() else w
+    return options
+
+def _reset_mongo_clients():
+    global _mongo_client, _async_mongo_client, _mongo_client_pid
+    _mongo_client = None
+    _async_mongo_client = None
+    _mongo_client_pid = os.getpid()
+
+def _check_pid():
+    if _mongo_client_pid != os.getpid():
+        _reset_mongo_clients()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_mongo_clients)
+
+def get_mongo_client() -> MongoClient:
+    """Get the shared synchronous MongoDB client."""
+    global _mongo_client
+    _check_pid()
+    if _mongo_client is None:
+        _mongo_client = MongoClient(settings.mongo_url, **get_mongo_client_options())
+    return _mongo_client
+
+def get_async_mongo_client() -> AsyncIOMotorClient:
+    """Get the shared asynchronous MongoDB client."""
+    global _async_mongo_client
+    _check_pid()
+    if _async_mongo_client is None:
+        _async_mongo_client = AsyncIOMotorClient(settings.mongo_url, **get_mongo_client_options())
+    return _async_mongo_client
+
+def close_mongo_clients():
+    """Close the shared MongoDB clients; they are recreated on next use."""
+    global _mongo_client, _async_mongo_client
+    if _mongo_client is not None:
+        _mongo_client.close()
+    if _async_mongo_client is not None:
+        _async_mongo_client.close()
+    _mongo_client = None
+    _async_mongo_client = None
+
+def mongo_pool_stats() -> Dict[str, Any]:
+    """Pool configuration and current usage of the shared MongoDB clients."""
+    return {
+        "max_pool_size": settings.mongo_max_pool_size,
+        "min_pool_size": settings.mongo_min_pool_size,
+        "sync_client_open": _mongo_client is not None,
+        "async_client_open": _async_mongo_client is not None,
+        "servers": mongo_pool_listener.stats(),
+    }
 
 def get_mongo():
     """Get synchronous MongoDB database instance."""
-    return mongo_client[settings.mongo_database]
+    return get_mongo_client()[settings.mongo_database]
 
 def get_async_mongo():
     """Get asynchronous MongoDB database instance."""
-    return async_mongo_client[settings.mongo_database]
+    return get_async_mongo_client()[settings.mongo_database]
 
 def get_mongo_collection(collection_name: str):
     """Get a specific MongoDB collection."""
@@ -24,3 +103,52 @@ def get_mongo_collection(collection_name: str):
 def get_async_mongo_collection(collection_name: str):
     """Get a specific async MongoDB collection."""
     return get_async_mongo()[collection_name]
+
+
+# SQL setup (used by the SQLAlchemy-backed routers)
+Base = declarative_base()
+
+_async_engine = None
+_async_session_factory = None
+
+def get_async_database_url(url: str) -> str:
+    """Map a sync database URL onto its async driver (aiosqlite / asyncpg)."""
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    if url.startswith("postgresql://") or url.startswith("postgres://"):
+        return "postgresql+asyncpg://" + url.split("://", 1)[1]
+    return url
+
+def get_async_engine():
+    """Get the async SQLAlchemy engine, creating it on first use."""
+    global _async_engine
+    if _async_engine is None:
+        url = get_async_database_url(settings.database_url or settings.sqlite_url)
+        options = {"echo": settings.db_echo}
+        if not url.startswith("sqlite"):
+            options.update(
+                pool_size=settings.db_pool_size,
+                max_overflow=settings.db_max_overflow,
+                pool_timeout=settings.db_pool_timeout,
+                pool_recycle=settings.db_pool_recycle,
+                pool_pre_ping=True
+            )
+        _async_engine = create_async_engine(url, **options)
+    return _async_engine
+
+def get_async_session_factory() -> async_sessionmaker:
+    """Get the AsyncSession factory bound to the async engine."""
+    global _async_session_factory
+    if _async_session_factory is None:
+        _async_session_factory = async_sessionmaker(
+            get_async_engine(),
+            class_=AsyncSession,
+            expire_on_commit=False,
+            autoflush=False
+        )
+    return _async_session_factory
+
+async def get_db() -> AsyncIterator[AsyncSession]:
+    """Dependency that yields an AsyncSession."""
+    async with get_async_session_factory()() as session:
+        yield session
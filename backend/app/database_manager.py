@@ -1,39 +1,21 @@
-from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo import MongoClient, IndexModel, ASCENDING, DESCENDING, TEXT
+from pymongo import IndexModel, ASCENDING, DESCENDING, TEXT
 from app.config import settings
+from app.database import close_mongo_clients, get_async_mongo_client, get_mongo_client
 import structlog
-from typing import List
-from app.utils.error_handlers import exception_handler, APIException
-from app.api import health
-from fastapi import FastAPI
-from app.database_manager import db_manager
 
 logger = structlog.get_logger()
 
 class DatabaseManager:
-    def __init__(self):
-        self.async_client = None
-        self.sync_client = None
-        self._setup_clients()
-        
-    def _setup_clients(self):
-        """Setup MongoDB clients with connection pooling."""
-        # Async client with connection pooling
-        self.async_client = AsyncIOMotorClient(
-            settings.mongo_url,
-            maxPoolSize=50,
-            minPoolSize=10,
-            maxIdleTimeMS=30000
-        )
-        
-        # Sync client with connection pooling
-        self.sync_client = MongoClient(
-            settings.mongo_url,
-            maxPoolSize=50,
-            minPoolSize=10,
-            maxIdleTimeMS=30000
-        )
-        
+    """Index setup and health checks on the shared MongoDB clients from app.database."""
+    
+    @property
+    def async_client(self):
+        return get_async_mongo_client()
+    
+    @property
+    def sync_client(self):
+        return get_mongo_client()
+    
     async def setup_indexes(self):
         """Setup MongoDB indexes for better query performance."""
         db = self.async_client[settings.mongo_database]
@@ -55,8 +37,32 @@ class DatabaseManager:
         
         # Chat indexes
         await db.chat_sessions.create_indexes([
-            IndexModel([("user_id", ASCENDING)]),
-            IndexModel([("created_at", DESCENDING)])
+            # Serves keyset pagination of a user's sessions, newest first
+            IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("session_id", ASCENDING)]),
+            IndexModel([("created_at", DESCENDING)]),
+            # Serves the batched cleanup of old active sessions
+            IndexModel([("is_active", ASCENDING), ("created_at", ASCENDING)])
+        ])
+        
+        # User session indexes; with user_session_ttl_index MongoDB deletes expired sessions
+        user_session_indexes = [IndexModel([("is_active", ASCENDING), ("expires_at", ASCENDING)])]
+        if settings.user_session_ttl_index:
+            user_session_indexes.append(IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0))
+        await db.user_sessions.create_indexes(user_session_indexes)
+        await db.chat_messages.create_indexes([
+            IndexModel([("session_id", ASCENDING), ("created_at", ASCENDING)])
+        ])
+        
+        # Rate limit counters expire once their window has closed
+        await db.rate_limits.create_indexes([
+            IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0)
+        ])
+        
+        # Revoked tokens are only kept until the token itself would expire
+        await db.revoked_tokens.create_indexes([
+            IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+            IndexModel([("revoked_at", ASCENDING)])
         ])
         
         # Content indexes
@@ -87,24 +93,7 @@ class DatabaseManager:
     
     async def close(self):
         """Close database connections."""
-        if self.async_client:
-            self.async_client.close()
-        if self.sync_client:
-            self.sync_client.close()
+        close_mongo_clients()
 
 # Create global instance
 db_manager = DatabaseManager()
-# Initialize FastAPI app
-app = FastAPI()
-
-app.add_exception_handler(Exception, exception_handler)
-app.add_exception_handler(Exception, exception_handler)
-app.include_router(health.router, prefix="/api/v1")
-
-@app.on_event("startup")
-async def startup():
-    await db_manager.setup_indexes()
-
-@app.on_event("shutdown")
-async def shutdown():
-    await db_manager.close()
\ No newline at end of file
@@ -1,35 +1,32 @@
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.openapi.docs import get_swagger_ui_html, get_redoc_html
 from contextlib import asynccontextmanager
 import time
 import logging
 from app.config import settings
-from app.database import get_async_mongo
-from app.api import auth_simple as auth, chat, patients_simple as patients, content_simple as content
-from app.utils.rate_limiter import rate_limiter
+from app.database import close_mongo_clients
+from app.api import auth_simple as auth, chat, health, patients_simple as patients, content_simple as content
+from app.utils.rate_limiter import rate_limiter, strict_rate_limiter
+from app.utils.write_behind import write_behind_queue
+from app.utils.password_hasher import password_hasher
+from app.utils.audit_sink import mongo_audit_sink, sql_audit_sink
+from app.utils.log_queue import configure_logging, should_log_request, stop_logging
+from app.utils.metrics import PrometheusMiddleware, register_stats, render_metrics
+from app.utils.token_cache import token_cache
+from app.utils.session_manager import session_manager
+from app.services.cache_service import cache_service
+from app.services.symptom_cache import symptom_cache
+from app.services.health_monitor import health_monitor, register_default_checks
+from app.services.gemini_service import get_gemini_service, symptom_batcher_stats
+from app.services.mcp_chatbot import get_mcp_chatbot, llm_router_stats
+from app.services.prompts import prompt_registry
 import structlog
 
 # Configure structured logging
-structlog.configure(
-    processors=[
-        structlog.stdlib.filter_by_level,
-        structlog.stdlib.add_logger_name,
-        structlog.stdlib.add_log_level,
-        structlog.stdlib.PositionalArgumentsFormatter(),
-        structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.StackInfoRenderer(),
-        structlog.processors.format_exc_info,
-        structlog.processors.UnicodeDecoder(),
-        structlog.processors.JSONRenderer()
-    ],
-    context_class=dict,
-    logger_factory=structlog.stdlib.LoggerFactory(),
-    wrapper_class=structlog.stdlib.BoundLogger,
-    cache_logger_on_first_use=True,
-)
+configure_logging()
 
 logger = structlog.get_logger()
 
@@ -40,19 +37,34 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting Healthify Backend API")
     
-    # Test MongoDB connection
-    try:
-        db = get_async_mongo()
-        await db.command("ping")
+    # Create the AI service singletons before the first request needs them
+    get_mcp_chatbot()
+    get_gemini_service()
+    
+    # Check dependencies now, then keep checking in the background
+    register_default_checks(health_monitor)
+    results = await health_monitor.run_checks()
+    if results["database"]["status"] == "healthy":
         logger.info("MongoDB connection established")
-    except Exception as e:
-        logger.warning(f"MongoDB not available: {str(e)}")
+    else:
+        logger.warning(f"MongoDB not available: {results['database'].get('error')}")
         logger.info("Running in limited mode - some features may not work")
+    health_monitor.start()
     
     yield
     
     # Shutdown
     logger.info("Shutting down Healthify Backend API")
+    await health_monitor.stop()
+    await write_behind_queue.close()
+    await session_manager.close()
+    await rate_limiter.close()
+    await strict_rate_limiter.close()
+    await mongo_audit_sink.close()
+    await sql_audit_sink.close()
+    password_hasher.shutdown()
+    close_mongo_clients()
+    stop_logging()
 
 
 # Create FastAPI app
@@ -80,6 +92,32 @@ app.add_middleware(
     allowed_hosts=["*"]  # Configure properly for production
 )
 
+# Add Prometheus metrics middleware
+if settings.prometheus_enabled:
+    app.add_middleware(PrometheusMiddleware)
+    register_stats(
+        "healthify_cache", cache_service.stats,
+        counters=("l1_hits", "l1_misses", "l1_evictions", "l2_hits", "l2_misses", "stale_hits", "coalesced")
+    )
+    register_stats("healthify_symptom_cache", symptom_cache.stats, counters=("exact_hits", "similar_hits", "misses", "stale", "coalesced"))
+    register_stats("healthify_token_cache", token_cache.stats, counters=("hits", "misses", "decodes"))
+    register_stats("healthify_sessions", session_manager.stats, counters=("cache_hits", "cache_misses", "touches_written"))
+    register_stats("healthify_password_hash", password_hasher.stats, counters=("completed", "rejected"))
+    register_stats(
+        "healthify_symptom_batcher", symptom_batcher_stats,
+        counters=("batches", "items", "fallbacks", "failed")
+    )
+    register_stats("healthify_prompts", prompt_registry.stats, counters=prompt_registry.counters())
+    register_stats("healthify_llm_router", llm_router_stats, counters=("hedges", "failovers"))
+    register_stats(
+        "healthify_audit_mongo", mongo_audit_sink.stats,
+        counters=("written", "batches", "dropped", "blocked", "failed", "retried")
+    )
+    register_stats(
+        "healthify_audit_sql", sql_audit_sink.stats,
+        counters=("written", "batches", "dropped", "blocked", "failed", "retried")
+    )
+
 # Add rate limiting middleware
 @app.middleware("http")
 async def rate_limit_middleware(request: Request, call_next):
@@ -99,21 +137,24 @@ async def rate_limit_middleware(request: Request, call_next):
 # Add request logging middleware
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    """Log all requests."""
-    start_time = time.time()
+    """Log requests, sampling successful ones."""
+    start_time = time.perf_counter()
     
     response = await call_next(request)
     
-    process_time = time.time() - start_time
+    process_time = time.perf_counter() - start_time
     
-    logger.info(
-        "Request processed",
-        method=request.method,
-        url=str(request.url),
-        status_code=response.status_code,
-        process_time=process_time,
-        client_ip=request.client.host
-    )
+    sample_rate = should_log_request(request.url.path, response.status_code)
+    if sample_rate is not None:
+        logger.info(
+            "Request processed",
+            method=request.method,
+            path=request.url.path,
+            status_code=response.status_code,
+            process_time=process_time,
+            client_ip=request.client.host if request.client else None,
+            sample_rate=sample_rate
+        )
     
     return response
 
@@ -138,18 +179,17 @@ async def global_exception_handler(request: Request, exc: Exception):
     )
 
 
-# Health check endpoint
-@app.get("/health")
-async def health_check():
-    """Health check endpoint."""
-    return {
-        "status": "healthy",
-        "timestamp": time.time(),
-        "version": "1.0.0"
-    }
+# Prometheus metrics endpoint
+if settings.prometheus_enabled:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus metrics endpoint."""
+        payload, content_type = render_metrics()
+        return Response(content=payload, media_type=content_type)
 
 
 # Include API routers
+app.include_router(health.router)
 app.include_router(auth.router)
 app.include_router(chat.router)
 app.include_router(patients.router)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
@@ -51,6 +51,8 @@ class ChatResponse(BaseModel):
     timestamp: datetime
     is_medical: bool = False
     confidence: float = 0.0
+    # Per-stage latency in milliseconds; reported via Server-Timing, not in the body
+    stage_timings: Dict[str, float] = Field(default_factory=dict, exclude=True)
 
 
 class SymptomAnalysisRequest(BaseModel):
@@ -81,3 +83,12 @@ class SymptomAnalysisResponse(BaseModel):
     disclaimer: str
     confidence_score: float
     follow_up_recommendations: List[str]
+
+
+class SymptomJobResponse(BaseModel):
+    job_id: str
+    status: str  # pending, running, completed, failed
+    created_at: datetime
+    updated_at: datetime
+    result: Optional[SymptomAnalysisResponse] = None
+    error: Optional[str] = None
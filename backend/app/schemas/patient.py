@@ -107,3 +107,12 @@ class MedicationResponse(MedicationBase):
 
     class Config:
         from_attributes = True
+
+
+class PatientRecordResponse(PatientResponse):
+    medical_history: List[MedicalHistoryResponse] = []
+    allergies: List[AllergyResponse] = []
+    medications: List[MedicationResponse] = []
+
+    class Config:
+        from_attributes = True
@@ -29,5 +29,9 @@ class Token(BaseModel):
     token_type: str
 
 
+class LogoutRequest(BaseModel):
+    refresh_token: Optional[str] = None
+
+
 class TokenData(BaseModel):
     user_id: Optional[str] = None
@@ -1,21 +1,21 @@
-import openai
 from typing import List, Dict, Any, Optional
 from app.config import settings
 from app.schemas.chat import SymptomAnalysisResponse, Condition, TriageAdvice
+from app.services.prompts import CHAT_ASSISTANT, SYMPTOM_ANALYSIS, RenderedPrompt, format_patient_information, openai_messages
 import json
 import logging
 
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client
-if settings.openai_api_key:
-    openai.api_key = settings.openai_api_key
-
 
 class AIService:
     def __init__(self):
         self.model = settings.openai_model
-        self.client = openai.OpenAI(api_key=settings.openai_api_key) if settings.openai_api_key else None
+        self.client = None
+        if settings.openai_api_key:
+            # Imported here so the SDK is only loaded when a key is configured
+            import openai
+            self.client = openai.AsyncOpenAI(api_key=settings.openai_api_key)
     
     async def analyze_symptoms(self, request_data: dict) -> SymptomAnalysisResponse:
         """Analyze symptoms and provide medical insights."""
@@ -36,75 +36,16 @@ class AIService:
             logger.error(f"Error in symptom analysis: {str(e)}")
             raise Exception(f"AI service error: {str(e)}")
     
-    def _create_symptom_analysis_prompt(self, request_data: dict) -> str:
+    def _create_symptom_analysis_prompt(self, request_data: dict) -> RenderedPrompt:
         """Create a structured prompt for symptom analysis."""
-        symptoms = request_data.get("symptoms", [])
-        age = request_data.get("age")
-        gender = request_data.get("gender")
-        medical_history = request_data.get("medical_history", [])
-        medications = request_data.get("current_medications", [])
-        additional_info = request_data.get("additional_info", "")
-        
-        prompt = f"""
-You are a medical AI assistant. Analyze the following symptoms and provide a structured response.
-
-PATIENT INFORMATION:
-- Age: {age if age else 'Not specified'}
-- Gender: {gender if gender else 'Not specified'}
-- Symptoms: {', '.join(symptoms)}
-- Medical History: {', '.join(medical_history) if medical_history else 'None provided'}
-- Current Medications: {', '.join(medications) if medications else 'None'}
-- Additional Information: {additional_info if additional_info else 'None'}
-
-Please provide a JSON response with the following structure:
-{{
-    "conditions": [
-        {{
-            "name": "Condition Name",
-            "probability": 0.85,
-            "description": "Brief description of the condition",
-            "severity": "mild|moderate|severe"
-        }}
-    ],
-    "triage_advice": {{
-        "urgency": "low|medium|high|emergency",
-        "recommendation": "Specific recommendation for care",
-        "timeframe": "When to seek care (e.g., 'within 24 hours')"
-    }},
-    "disclaimer": "This is not a substitute for professional medical advice. Always consult a healthcare provider.",
-    "confidence_score": 0.75,
-    "follow_up_recommendations": [
-        "Specific follow-up action 1",
-        "Specific follow-up action 2"
-    ]
-}}
-
-IMPORTANT GUIDELINES:
-1. Be conservative in your assessments
-2. Always recommend consulting a healthcare provider for serious symptoms
-3. If symptoms suggest emergency conditions, mark urgency as "emergency"
-4. Provide probabilities as decimal numbers (0.0 to 1.0)
-5. Include appropriate disclaimers
-6. Focus on the most likely 3-5 conditions
-7. Be specific about timeframes for seeking care
-"""
-        return prompt
+        return SYMPTOM_ANALYSIS.render(patient=format_patient_information(request_data))
     
-    async def _call_openai_api(self, prompt: str) -> str:
+    async def _call_openai_api(self, prompt: RenderedPrompt) -> str:
         """Call OpenAI API with the prompt."""
         try:
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a medical AI assistant. Provide accurate, helpful, and responsible medical information. Always recommend consulting healthcare professionals for serious concerns."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
+                messages=openai_messages(prompt),
                 max_tokens=1500,
                 temperature=0.3
             )
@@ -178,16 +119,15 @@ IMPORTANT GUIDELINES:
             return "I'm sorry, I'm not available right now. Please try again later."
         
         try:
-            system_prompt = """You are a helpful medical assistant chatbot. Provide general health information and guidance, but always recommend consulting healthcare professionals for medical concerns. Be empathetic, clear, and helpful."""
-            
-            messages = [{"role": "system", "content": system_prompt}]
+            prompt = CHAT_ASSISTANT.render(message=message)
+            messages = [{"role": "system", "content": prompt.prefix}]
             
             if context:
                 messages.append({"role": "system", "content": f"Context: {json.dumps(context)}"})
             
-            messages.append({"role": "user", "content": message})
+            messages.append({"role": "user", "content": prompt.suffix})
             
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model=self.model,
                 messages=messages,
                 max_tokens=500,
@@ -201,5 +141,13 @@ IMPORTANT GUIDELINES:
             return "I'm sorry, I'm having trouble processing your request. Please try again later."
 
 
-# Global AI service instance
-ai_service = AIService()
+# Global AI service instance, created on first use
+_ai_service: Optional[AIService] = None
+
+
+def get_ai_service() -> AIService:
+    """Get the shared AI service, creating it on first use."""
+    global _ai_service
+    if _ai_service is None:
+        _ai_service = AIService()
+    return _ai_service
@@ -1,40 +1,167 @@
-import json
-from typing import Any, Optional
+import asyncio
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
 from app.database import get_async_mongo
 from app.config import settings
 import logging
+import time
 from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
 
-class CacheService:
+class LocalCache:
+    """In-process LRU cache with per-entry TTL."""
+    
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        # key -> (value, monotonic expiry or None)
+        self._entries: "OrderedDict[str, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Get a live entry and mark it most recently used."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+    
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """Store an entry, evicting the least recently used ones when full."""
+        if self.max_size <= 0:
+            return
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def delete(self, key: str):
+        """Drop an entry if present."""
+        self._entries.pop(key, None)
+    
+    def clear(self):
+        """Drop all entries."""
+        self._entries.clear()
+    
+    def __contains__(self, key: str) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and (entry[1] is None or entry[1] > time.monotonic())
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into a single execution."""
+    
     def __init__(self):
+        self._calls: Dict[str, asyncio.Future] = {}
+        self.coalesced = 0
+    
+    async def do(self, key: str, func, *args, **kwargs) -> Any:
+        """Run func for key, or await the result of the call already in flight."""
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._run(key, func, *args, **kwargs))
+            self._calls[key] = future
+        else:
+            self.coalesced += 1
+        # Shield so a cancelled waiter does not cancel the shared call
+        return await asyncio.shield(future)
+    
+    def in_flight(self, key: str) -> bool:
+        """Check whether a call for key is currently running."""
+        return key in self._calls
+    
+    async def _run(self, key: str, func, *args, **kwargs) -> Any:
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            self._calls.pop(key, None)
+
+
+class CacheService:
+    """Two-tier cache: an in-process LRU (L1) in front of the Mongo cache collection (L2)."""
+    
+    def __init__(self, l1_max_size: Optional[int] = None):
         self.default_ttl = 3600  # 1 hour
+        self.l1 = LocalCache(
+            max_size=settings.cache_l1_max_size if l1_max_size is None else l1_max_size
+        )
+        self.l2_hits = 0
+        self.l2_misses = 0
+        self.stale_hits = 0
+        self.flights = SingleFlight()
+        self._refresh_tasks: Set[asyncio.Task] = set()
     
-    async def get(self, key: str) -> Optional[Any]:
-        """Get value from cache."""
+    def _l1_ttl(self, ttl: Optional[float]) -> float:
+        """Cap L1 lifetimes so other workers' writes become visible in bounded time."""
+        max_ttl = settings.cache_l1_max_ttl
+        return max_ttl if ttl is None else min(ttl, max_ttl)
+    
+    async def _lookup(self, key: str) -> Tuple[Optional[Any], bool]:
+        """Look a key up in both tiers and return (value, is_stale)."""
+        value = self.l1.get(key)
+        if value is not None:
+            return value, False
+        
         try:
             db = get_async_mongo()
             doc = await db.cache.find_one({"_id": key})
-            if doc and (not doc.get("expires_at") or doc["expires_at"] > datetime.utcnow()):
-                return doc["value"]
-            return None
+            now = datetime.utcnow()
+            if doc and (not doc.get("expires_at") or doc["expires_at"] > now):
+                stale_at = doc.get("stale_at")
+                if stale_at and stale_at <= now:
+                    return doc["value"], True
+                self.l2_hits += 1
+                fresh_until = stale_at or doc.get("expires_at")
+                ttl = (fresh_until - now).total_seconds() if fresh_until else None
+                self.l1.set(key, doc["value"], self._l1_ttl(ttl))
+                return doc["value"], False
+            self.l2_misses += 1
+            return None, False
         except Exception as e:
             logger.error(f"Cache get error for key {key}: {str(e)}")
-            return None
+            return None, False
+    
+    async def get(self, key: str) -> Optional[Any]:
+        """Get value from cache."""
+        value, is_stale = await self._lookup(key)
+        return None if is_stale else value
     
-    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
-        """Set value in cache."""
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None, stale_ttl: int = 0) -> bool:
+        """Set value in cache.
+        
+        With ``stale_ttl`` the value is kept for that many extra seconds after
+        it expires so ``get_or_set`` can serve it while refreshing.
+        """
         try:
             db = get_async_mongo()
             ttl = ttl or self.default_ttl
-            expires_at = datetime.utcnow() + timedelta(seconds=ttl)
+            stale_at = datetime.utcnow() + timedelta(seconds=ttl)
+            expires_at = stale_at + timedelta(seconds=stale_ttl)
+            # Invalidate first so a failed write never leaves a stale L1 entry
+            self.l1.delete(key)
             await db.cache.update_one(
                 {"_id": key},
-                {"$set": {"value": value, "expires_at": expires_at}},
+                {"$set": {"value": value, "expires_at": expires_at, "stale_at": stale_at}},
                 upsert=True
             )
+            self.l1.set(key, value, self._l1_ttl(ttl))
             return True
         except Exception as e:
             logger.error(f"Cache set error for key {key}: {str(e)}")
@@ -42,6 +169,7 @@ class CacheService:
     
     async def delete(self, key: str) -> bool:
         """Delete value from cache."""
+        self.l1.delete(key)
         try:
             db = get_async_mongo()
             await db.cache.delete_one({"_id": key})
@@ -52,6 +180,8 @@ class CacheService:
     
     async def exists(self, key: str) -> bool:
         """Check if key exists in cache."""
+        if key in self.l1:
+            return True
         try:
             db = get_async_mongo()
             doc = await db.cache.find_one({"_id": key})
@@ -60,23 +190,71 @@ class CacheService:
             logger.error(f"Cache exists error for key {key}: {str(e)}")
             return False
     
-    async def get_or_set(self, key: str, func, ttl: Optional[int] = None, *args, **kwargs) -> Any:
-        """Get value from cache or set it using provided function."""
-        cached_value = await self.get(key)
-        if cached_value is not None:
-            return cached_value
+    async def get_or_set(self, key: str, func, ttl: Optional[int] = None, *args, stale_ttl: int = 0, **kwargs) -> Any:
+        """Get value from cache or set it using provided function.
+        
+        Concurrent misses for the same key share a single call to ``func``.
+        With ``stale_ttl``, an expired value is returned immediately while one
+        background refresh runs.
+        """
+        value, _ = await self.get_or_set_with_source(key, func, ttl, *args, stale_ttl=stale_ttl, **kwargs)
+        return value
+    
+    async def get_or_set_with_source(
+        self, key: str, func, ttl: Optional[int] = None, *args, stale_ttl: int = 0, **kwargs
+    ) -> Tuple[Any, str]:
+        """Like ``get_or_set``, also returning where the value came from.
         
-        # Generate new value
-        new_value = await func(*args, **kwargs) if callable(func) else func
+        The source is ``hit`` (fresh in L1 or L2), ``stale`` (expired value
+        served while refreshing), ``coalesced`` (result of another caller's
+        computation) or ``computed`` (this call ran ``func``).
+        """
+        cached_value, is_stale = await self._lookup(key)
+        if cached_value is not None and not is_stale:
+            return cached_value, "hit"
         
-        # Cache the new value
-        await self.set(key, new_value, ttl)
-        return new_value
+        async def compute():
+            # Generate new value
+            new_value = await func(*args, **kwargs) if callable(func) else func
+            
+            # Cache the new value
+            await self.set(key, new_value, ttl, stale_ttl=stale_ttl)
+            return new_value
+        
+        if cached_value is not None:
+            self.stale_hits += 1
+            if not self.flights.in_flight(key):
+                task = asyncio.ensure_future(self.flights.do(key, compute))
+                self._refresh_tasks.add(task)
+                task.add_done_callback(self._on_refresh_done)
+            return cached_value, "stale"
+        
+        # Checked right before do() joins or starts the call, with no await in between
+        source = "coalesced" if self.flights.in_flight(key) else "computed"
+        return await self.flights.do(key, compute), source
+    
+    def _on_refresh_done(self, task: asyncio.Task):
+        self._refresh_tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.error(f"Cache refresh error: {str(task.exception())}")
     
     def generate_key(self, prefix: str, *args) -> str:
         """Generate a cache key from prefix and arguments."""
         key_parts = [prefix] + [str(arg) for arg in args]
         return ":".join(key_parts)
+    
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss/eviction counters for both cache tiers."""
+        return {
+            "l1_size": len(self.l1),
+            "l1_hits": self.l1.hits,
+            "l1_misses": self.l1.misses,
+            "l1_evictions": self.l1.evictions,
+            "l2_hits": self.l2_hits,
+            "l2_misses": self.l2_misses,
+            "stale_hits": self.stale_hits,
+            "coalesced": self.flights.coalesced,
+        }
 
 
 # Global cache service instance
@@ -1,20 +1,37 @@
-import google.generativeai as genai
 from typing import List, Dict, Any, Optional
 from app.config import settings
 from app.schemas.chat import SymptomAnalysisResponse, Condition, TriageAdvice
+from app.utils.metrics import observe_llm
+from app.utils.micro_batcher import MicroBatcher
+from app.services.symptom_cache import normalize_terms
+from app.services.prompts import (
+    DEFAULT_DISCLAIMER, SYMPTOM_ANALYSIS, SYMPTOM_ANALYSIS_BATCH, RenderedPrompt,
+    format_patient_information, gemini_context_cache
+)
+from pydantic import ValidationError
+import asyncio
 import json
 import logging
+import secrets
 
 logger = logging.getLogger(__name__)
 
-# Initialize Gemini client
-genai.configure(api_key=settings.gemini_api_key)
-
 
 class GeminiAIService:
     def __init__(self):
+        # Imported here so the SDK is only loaded when the service is first used
+        import google.generativeai as genai
+        genai.configure(api_key=settings.gemini_api_key)
         self.model = genai.GenerativeModel(settings.gemini_model)
+        self._concurrency = asyncio.Semaphore(settings.gemini_max_concurrency)
         self._init_safety_settings()
+        self.batcher = MicroBatcher(
+            self._analyze_batch,
+            self._analyze_one,
+            max_batch_size=settings.symptom_batch_max_size,
+            window=settings.symptom_batch_window,
+            fallback=settings.symptom_batch_fallback
+        )
 
     def _init_safety_settings(self):
         """Initialize safety settings for the Gemini model."""
@@ -38,112 +55,158 @@ class GeminiAIService:
         ]
     
     async def analyze_symptoms(self, request_data: dict) -> SymptomAnalysisResponse:
-        """Analyze symptoms and provide medical insights using Gemini."""
+        """Analyze symptoms and provide medical insights using Gemini.
+        
+        Concurrent requests are sent together in micro-batches when
+        ``symptom_batch_max_size`` is above 1.
+        """
         try:
-            # Prepare the prompt for symptom analysis
-            prompt = self._create_symptom_analysis_prompt(request_data)
-            
-            # Generate response from Gemini
-            response = await self._generate_response(prompt)
-            
-            # Parse and structure the response
-            return self._parse_symptom_response(response, request_data)
-            
+            return await self.batcher.submit(request_data)
         except Exception as e:
             logger.error(f"Error in symptom analysis: {str(e)}")
             raise Exception(f"AI service error: {str(e)}")
     
-    def _create_symptom_analysis_prompt(self, request_data: dict) -> str:
-        """Create a structured prompt for symptom analysis."""
-        symptoms = request_data.get("symptoms", [])
-        age = request_data.get("age")
-        gender = request_data.get("gender")
-        medical_history = request_data.get("medical_history", [])
-        medications = request_data.get("current_medications", [])
-        additional_info = request_data.get("additional_info", "")
+    async def _analyze_one(self, request_data: dict) -> SymptomAnalysisResponse:
+        """Analyze one request with its own Gemini call."""
+        # Prepare the prompt for symptom analysis
+        prompt = self._create_symptom_analysis_prompt(request_data)
         
-        prompt = f"""
-You are a medical AI assistant. Analyze the following symptoms and provide a structured response.
-
-Patient Information:
-- Age: {age}
-- Gender: {gender}
-- Symptoms: {', '.join(symptoms)}
-- Medical History: {', '.join(medical_history)}
-- Current Medications: {', '.join(medications)}
-- Additional Information: {additional_info}
+        # Generate response from Gemini
+        response = await self._generate_response(prompt)
+        
+        # Parse and structure the response
+        return self._parse_symptom_response(response, request_data)
+    
+    async def _analyze_batch(self, batch: List[dict]) -> List[Any]:
+        """Analyze several requests with one Gemini call.
+        
+        Returns a response per request, or the exception for a request whose
+        result was missing, duplicated, invalid or not tied to it. Each
+        patient gets a random reference code that its result must echo along
+        with its symptoms, so a misnumbered result is rejected rather than
+        handed to another patient.
+        """
+        if len(batch) == 1:
+            return [await self._analyze_one(batch[0])]
+        
+        refs = [secrets.token_hex(4) for _ in batch]
+        prompt = self._create_batch_symptom_analysis_prompt(batch, refs)
+        response = await self._generate_response(prompt, operation="symptom_analysis_batch")
+        items = json.loads(self._extract_json(response, "[", "]"))
+        if not isinstance(items, list):
+            raise ValueError("Batch response is not a JSON array")
+        
+        by_id = {}
+        duplicates = set()
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            if item.get("id") in by_id:
+                duplicates.add(item.get("id"))
+            by_id[item.get("id")] = item
+        
+        results = []
+        for index, request_data in enumerate(batch):
+            item = by_id.get(index)
+            if index in duplicates:
+                results.append(ValueError(f"Several results for batch item {index}"))
+                continue
+            if item is None:
+                results.append(KeyError(f"No result for batch item {index}"))
+                continue
+            if not self._result_matches(item, refs[index], request_data):
+                results.append(ValueError(f"Result for batch item {index} does not match its request"))
+                continue
+            try:
+                results.append(self._symptom_response_from_data(item))
+            except Exception as e:
+                results.append(e)
+        return results
+    
+    def _create_symptom_analysis_prompt(self, request_data: dict) -> RenderedPrompt:
+        """Create a structured prompt for symptom analysis."""
+        return SYMPTOM_ANALYSIS.render(patient=format_patient_information(request_data))
+    
+    def _create_batch_symptom_analysis_prompt(self, batch: List[dict], refs: List[str]) -> RenderedPrompt:
+        """Create one prompt asking for an independent analysis of each patient."""
+        patients = "\n\n".join(
+            f"Patient {index} (reference code {ref}):\n{format_patient_information(request_data)}"
+            for index, (request_data, ref) in enumerate(zip(batch, refs))
+        )
+        return SYMPTOM_ANALYSIS_BATCH.render(patients=patients, count=len(batch))
 
-Please provide a detailed analysis in the following JSON structure:
-{{
-    "possible_conditions": [
-        {{
-            "name": "condition name",
-            "confidence": "probability percentage",
-            "description": "brief description",
-            "common_symptoms": ["symptom1", "symptom2"]
-        }}
-    ],
-    "triage_level": "EMERGENCY|URGENT|NON_URGENT",
-    "triage_advice": {{
-        "recommendation": "what the patient should do",
-        "timeframe": "when they should seek care",
-        "care_level": "what type of care they need"
-    }},
-    "lifestyle_recommendations": ["recommendation1", "recommendation2"],
-    "warning_signs": ["sign1", "sign2"]
-}}
-"""
-        return prompt
+    @staticmethod
+    def _result_matches(item: dict, ref: str, request_data: dict) -> bool:
+        """Check that a batch result echoes the reference code and symptoms of its request."""
+        symptoms = item.get("symptoms")
+        return (
+            item.get("ref") == ref
+            and isinstance(symptoms, list)
+            and normalize_terms(map(str, symptoms)) == normalize_terms(request_data.get("symptoms"))
+        )
 
-    async def _generate_response(self, prompt: str) -> str:
-        """Generate response from Gemini model."""
+    async def _generate_response(self, prompt: RenderedPrompt, operation: str = "symptom_analysis") -> str:
+        """Generate response from Gemini model, reusing a cached prompt prefix when there is one."""
         try:
-            response = await self.model.generate_content_async(
-                prompt,
-                safety_settings=self.safety_settings,
-                generation_config={
-                    "temperature": 0.3,
-                    "top_p": 0.8,
-                    "top_k": 40
-                }
-            )
+            model, contents = await gemini_context_cache.contents(prompt, self.model)
+            async with self._concurrency:
+                with observe_llm("gemini", operation):
+                    response = await model.generate_content_async(
+                        contents,
+                        safety_settings=self.safety_settings,
+                        generation_config={
+                            "temperature": 0.3,
+                            "top_p": 0.8,
+                            "top_k": 40
+                        }
+                    )
             return response.text
         except Exception as e:
             logger.error(f"Gemini API error: {str(e)}")
             raise
 
+    @staticmethod
+    def _extract_json(response: str, opening: str = "{", closing: str = "}") -> str:
+        """Strip any text or code fences around the JSON payload."""
+        start = response.find(opening)
+        end = response.rfind(closing) + 1
+        return response[start:end] if start != -1 and end > start else response
+
+    @staticmethod
+    def _symptom_response_from_data(data: dict) -> SymptomAnalysisResponse:
+        """Validate one parsed analysis against the response schema."""
+        return SymptomAnalysisResponse(
+            conditions=[Condition(**cond) for cond in data["conditions"]],
+            triage_advice=TriageAdvice(**data["triage_advice"]),
+            disclaimer=data.get("disclaimer", DEFAULT_DISCLAIMER),
+            confidence_score=data["confidence_score"],
+            follow_up_recommendations=data.get("follow_up_recommendations", [])
+        )
+
     def _parse_symptom_response(self, response: str, request_data: dict) -> SymptomAnalysisResponse:
         """Parse and structure the Gemini response."""
         try:
-            response_data = json.loads(response)
-            
-            conditions = [
-                Condition(
-                    name=cond["name"],
-                    confidence=cond["confidence"],
-                    description=cond["description"],
-                    common_symptoms=cond["common_symptoms"]
-                )
-                for cond in response_data["possible_conditions"]
-            ]
-            
-            triage_advice = TriageAdvice(
-                recommendation=response_data["triage_advice"]["recommendation"],
-                timeframe=response_data["triage_advice"]["timeframe"],
-                care_level=response_data["triage_advice"]["care_level"]
-            )
-            
-            return SymptomAnalysisResponse(
-                possible_conditions=conditions,
-                triage_level=response_data["triage_level"],
-                triage_advice=triage_advice,
-                lifestyle_recommendations=response_data["lifestyle_recommendations"],
-                warning_signs=response_data["warning_signs"]
-            )
-            
+            return self._symptom_response_from_data(json.loads(self._extract_json(response)))
         except json.JSONDecodeError as e:
             logger.error(f"Error parsing Gemini response: {str(e)}")
             raise Exception("Invalid response format from AI service")
-        except KeyError as e:
+        except (KeyError, TypeError, ValidationError) as e:
             logger.error(f"Missing key in response: {str(e)}")
-            raise Exception("Incomplete response from AI service")
\ No newline at end of file
+            raise Exception("Incomplete response from AI service")
+
+
+# Global Gemini service instance, created on first use
+_gemini_service: Optional[GeminiAIService] = None
+
+
+def get_gemini_service() -> GeminiAIService:
+    """Get the shared Gemini service, creating it on first use."""
+    global _gemini_service
+    if _gemini_service is None:
+        _gemini_service = GeminiAIService()
+    return _gemini_service
+
+
+def symptom_batcher_stats() -> Dict[str, float]:
+    """Batcher stats for metrics; empty until the service has been created, so scraping never builds it."""
+    return _gemini_service.batcher.stats() if _gemini_service is not None else {}
@@ -0,0 +1,137 @@
+from typing import Any, Awaitable, Callable, Dict, Optional
+from app.config import settings
+from app.database import get_async_mongo
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+HealthCheck = Callable[[], Awaitable[Any]]
+
+
+class HealthMonitor:
+    """Run dependency health checks in the background and serve probes from memory.
+
+    Every ``interval`` seconds all registered checks run concurrently, each
+    bounded by ``timeout``. Results are cached with the time they were taken;
+    a result older than ``stale_after`` seconds counts as unhealthy.
+    Only ``critical`` checks decide readiness.
+    """
+
+    def __init__(self, interval: float = 30.0, timeout: float = 5.0, stale_after: Optional[float] = None):
+        self.interval = interval
+        self.timeout = timeout
+        self.stale_after = stale_after or interval * 3
+        self._checks: Dict[str, HealthCheck] = {}
+        self._critical: Dict[str, bool] = {}
+        self._results: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, name: str, check: HealthCheck, critical: bool = False):
+        """Register a check; it is healthy if it returns without raising."""
+        self._checks[name] = check
+        self._critical[name] = critical
+
+    async def _run_check(self, name: str, check: HealthCheck) -> Dict[str, Any]:
+        started = time.perf_counter()
+        result = {"status": "healthy", "critical": self._critical[name]}
+        try:
+            await asyncio.wait_for(check(), self.timeout)
+        except asyncio.TimeoutError:
+            result.update(status="unhealthy", error=f"timed out after {self.timeout}s")
+        except Exception as e:
+            result.update(status="unhealthy", error=str(e))
+        result["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        result["checked_at"] = time.time()
+        if result["status"] != "healthy":
+            logger.warning(f"Health check {name} failed: {result['error']}")
+        return result
+
+    async def run_checks(self) -> Dict[str, Dict[str, Any]]:
+        """Run every check concurrently and cache the results."""
+        names = list(self._checks)
+        results = await asyncio.gather(*(self._run_check(name, self._checks[name]) for name in names))
+        self._results.update(zip(names, results))
+        return self._results
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.run_checks()
+            except Exception as e:
+                logger.error(f"Health monitor error: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """Start checking in the background."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        """Stop the background checks."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def results(self) -> Dict[str, Dict[str, Any]]:
+        """Return the cached results, marking ones that are missing or stale."""
+        now = time.time()
+        results = {}
+        for name in self._checks:
+            result = self._results.get(name)
+            if result is None:
+                result = {"status": "unknown", "critical": self._critical[name]}
+            elif now - result["checked_at"] > self.stale_after:
+                result = {**result, "status": "stale"}
+            results[name] = result
+        return results
+
+    def is_ready(self) -> bool:
+        """True when every critical check has a fresh healthy result."""
+        return all(
+            result["status"] == "healthy"
+            for result in self.results().values()
+            if result["critical"]
+        )
+
+    def status(self) -> str:
+        """Overall status: healthy, degraded (non-critical failures) or unhealthy."""
+        if not self.is_ready():
+            return "unhealthy"
+        if all(result["status"] == "healthy" for result in self.results().values()):
+            return "healthy"
+        return "degraded"
+
+
+async def check_mongo():
+    """Ping MongoDB."""
+    await get_async_mongo().command("ping")
+
+
+async def check_celery():
+    """Ping Celery workers; healthy if at least one replies."""
+    from app.celery_app import celery_app
+
+    replies = await asyncio.to_thread(celery_app.control.ping, timeout=settings.health_check_timeout / 2)
+    if not replies:
+        raise RuntimeError("no Celery workers replied")
+
+
+def register_default_checks(monitor: HealthMonitor):
+    """Register checks for MongoDB, each configured LLM provider and Celery."""
+    from app.services.mcp_chatbot import get_mcp_chatbot
+
+    monitor.register("database", check_mongo, critical=True)
+    for provider, check in get_mcp_chatbot().provider_health_checks().items():
+        monitor.register(f"llm_{provider}", check)
+    if settings.health_check_celery:
+        monitor.register("celery", check_celery)
+
+
+# Shared monitor; checks are registered and started from the app lifespan
+health_monitor = HealthMonitor(interval=settings.health_check_interval, timeout=settings.health_check_timeout)
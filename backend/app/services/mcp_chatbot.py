@@ -1,19 +1,53 @@
-import sys
-print(sys.path)
 import asyncio
+import functools
 import json
 import logging
-from typing import Dict, List, Optional, Any
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, List, Optional, Any, Tuple
 from datetime import datetime
 from app.config import settings
 from app.database import get_async_mongo_collection
 from app.schemas.chat import ChatMessage, ChatResponse, SymptomAnalysisResponse, Condition, TriageAdvice
-import google.generativeai as genai
-import anthropic
-import openai
+from app.services.prompts import (
+    ANALYZE_AND_RESPOND, MEDICAL_ANALYSIS, MEDICAL_RESPONSE, SYMPTOM_ANALYSIS, RenderedPrompt,
+    anthropic_system, format_patient_information, gemini_context_cache, openai_messages
+)
+from app.services.provider_router import ProviderRouter
+from app.utils.metrics import observe_llm
+from app.utils.write_behind import write_behind_queue
 
 logger = logging.getLogger(__name__)
 
+# Bounded pool for provider SDK calls that have no async variant
+_provider_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_provider_executor() -> ThreadPoolExecutor:
+    global _provider_executor
+    if _provider_executor is None:
+        _provider_executor = ThreadPoolExecutor(
+            max_workers=settings.llm_thread_pool_size,
+            thread_name_prefix="llm-provider"
+        )
+    return _provider_executor
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking provider call in the bounded provider thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_provider_executor(), functools.partial(func, *args, **kwargs))
+
+
+async def _timed(timings: Dict[str, float], stage: str, awaitable):
+    """Await and record the elapsed milliseconds under ``stage``."""
+    started = time.perf_counter()
+    try:
+        return await awaitable
+    finally:
+        timings[stage] = round((time.perf_counter() - started) * 1000, 2)
+
 
 class MCPChatbotService:
     """MCP-powered medical chatbot for symptom detection and medical assistance."""
@@ -24,47 +58,84 @@ class MCPChatbotService:
         self.anthropic_client = None
         self.openai_client = None
         
+        # Provider SDKs are slow to import; only load the ones that are configured
         if settings.gemini_api_key:
+            import google.generativeai as genai
             genai.configure(api_key=settings.gemini_api_key)
             self.gemini_client = genai.GenerativeModel(settings.gemini_model)
         
         if settings.anthropic_api_key:
-            self.anthropic_client = anthropic.Anthropic(api_key=settings.anthropic_api_key)
+            import anthropic
+            self.anthropic_client = anthropic.AsyncAnthropic(api_key=settings.anthropic_api_key)
         
         if settings.openai_api_key:
-            self.openai_client = openai.OpenAI(api_key=settings.openai_api_key)
+            import openai
+            self.openai_client = openai.AsyncOpenAI(api_key=settings.openai_api_key)
+        
+        self._router: Optional[ProviderRouter] = None
         
-        self.chat_collection = get_async_mongo_collection("chat_sessions")
-        self.symptom_collection = get_async_mongo_collection("symptom_analyses")
+        # Per-provider caps on concurrent in-flight requests
+        self.provider_limits = {
+            "gemini": asyncio.Semaphore(settings.gemini_max_concurrency),
+            "anthropic": asyncio.Semaphore(settings.anthropic_max_concurrency),
+            "openai": asyncio.Semaphore(settings.openai_max_concurrency),
+        }
+    
+    # Collections are resolved per use so a forked worker never reuses the parent's client
+    @property
+    def chat_collection(self):
+        return get_async_mongo_collection("chat_sessions")
+    
+    @property
+    def message_collection(self):
+        return get_async_mongo_collection("chat_messages")
+    
+    @property
+    def symptom_collection(self):
+        return get_async_mongo_collection("symptom_analyses")
     
     async def process_chat_message(self, message: str, user_id: str, session_id: Optional[str] = None) -> ChatResponse:
         """Process a chat message and return a response."""
+        timings: Dict[str, float] = {}
         try:
             # Get or create session
             if not session_id:
-                session_id = await self._create_chat_session(user_id)
-            
-            # Store user message
-            await self._store_message(session_id, "user", message, user_id)
+                session_id = await _timed(timings, "create_session", self._create_chat_session(user_id))
             
-            # Analyze message for medical content
-            medical_analysis = await self._analyze_medical_content(message, user_id)
+            # Store user message while the message is analyzed
+            if settings.chat_fused_llm_call:
+                _, medical_analysis = await asyncio.gather(
+                    _timed(timings, "store_user_message", self._store_message(session_id, "user", message, user_id)),
+                    _timed(timings, "analyze_and_respond", self._analyze_and_respond(message, user_id))
+                )
+                response = medical_analysis.pop("response", None)
+            else:
+                _, medical_analysis = await asyncio.gather(
+                    _timed(timings, "store_user_message", self._store_message(session_id, "user", message, user_id)),
+                    _timed(timings, "analyze", self._analyze_medical_content(message, user_id))
+                )
+                response = None
             
             # Generate response based on analysis
-            if medical_analysis.get("is_medical"):
-                response = await self._generate_medical_response(message, medical_analysis, user_id)
-            else:
+            if not medical_analysis.get("is_medical"):
                 response = await self._generate_general_response(message, user_id)
+            elif not response:
+                response = await _timed(
+                    timings, "generate_response",
+                    self._generate_medical_response(message, medical_analysis, user_id)
+                )
             
-            # Store bot response
-            await self._store_message(session_id, "assistant", response, user_id)
+            # Store bot response after the reply has been returned
+            await write_behind_queue.submit(self._store_message, session_id, "assistant", response, user_id)
             
+            logger.info(f"Chat message stage timings (ms): {timings}")
             return ChatResponse(
                 message=response,
                 session_id=session_id,
                 timestamp=datetime.utcnow(),
                 is_medical=medical_analysis.get("is_medical", False),
-                confidence=medical_analysis.get("confidence", 0.0)
+                confidence=medical_analysis.get("confidence", 0.0),
+                stage_timings=timings
             )
             
         except Exception as e:
@@ -74,8 +145,135 @@ class MCPChatbotService:
                 session_id=session_id or "error",
                 timestamp=datetime.utcnow(),
                 is_medical=False,
-                confidence=0.0
+                confidence=0.0,
+                stage_timings=timings
+            )
+    
+    async def stream_chat_message(self, message: str, user_id: str, session_id: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Process a chat message and yield the reply as it is generated.
+        
+        Yields ``{"type": "token", "text": ...}`` events followed by a single
+        ``{"type": "done", ...}`` event. The assistant message is persisted
+        once the stream finishes.
+        """
+        chunks: List[str] = []
+        try:
+            # Get or create session
+            if not session_id:
+                session_id = await self._create_chat_session(user_id)
+            
+            # Store user message while the message is analyzed
+            _, medical_analysis = await asyncio.gather(
+                self._store_message(session_id, "user", message, user_id),
+                self._analyze_medical_content(message, user_id)
             )
+            
+            if medical_analysis.get("is_medical"):
+                tokens = self._stream_medical_response(message, medical_analysis)
+            else:
+                tokens = self._single_token(await self._generate_general_response(message, user_id))
+            
+            async for text in tokens:
+                chunks.append(text)
+                yield {"type": "token", "text": text}
+            
+            yield {
+                "type": "done",
+                "session_id": session_id,
+                "timestamp": datetime.utcnow().isoformat(),
+                "is_medical": medical_analysis.get("is_medical", False),
+                "confidence": medical_analysis.get("confidence", 0.0)
+            }
+        
+        except Exception as e:
+            logger.error(f"Error streaming chat message: {str(e)}")
+            yield {
+                "type": "error",
+                "session_id": session_id or "error",
+                "message": "I'm sorry, I'm having trouble processing your request. Please try again later."
+            }
+        
+        finally:
+            # Store bot response, including partial replies from dropped streams
+            if chunks and session_id:
+                await write_behind_queue.submit(self._store_message, session_id, "assistant", "".join(chunks), user_id)
+    
+    async def _single_token(self, text: str) -> AsyncIterator[str]:
+        yield text
+    
+    async def _stream_medical_response(self, message: str, analysis: Dict[str, Any]) -> AsyncIterator[str]:
+        """Stream a medical response, failing over between providers until one produces output."""
+        prompt = self._build_medical_response_prompt(message, analysis)
+        
+        for provider in self.router.ranked():
+            # Another stream may have taken a half-open provider's trial since ranking
+            if not self.router.start_stream(provider):
+                continue
+            stream = self._provider_stream(provider, prompt)
+            started = time.perf_counter()
+            try:
+                first = await stream.__anext__()
+            except StopAsyncIteration:
+                self.router.record_stream(provider, time.perf_counter() - started, True)
+                return
+            except asyncio.CancelledError:
+                self.router.release(provider)
+                await stream.aclose()
+                raise
+            except Exception as e:
+                self.router.record_stream(provider, time.perf_counter() - started, False)
+                logger.warning(f"Streaming from {provider} failed: {str(e)}")
+                await stream.aclose()
+                continue
+            
+            self.router.record_stream(provider, time.perf_counter() - started, True)
+            try:
+                yield first
+                async for text in stream:
+                    yield text
+            finally:
+                await stream.aclose()
+            return
+        
+        yield self._get_default_medical_response()
+    
+    async def _provider_stream(self, provider: str, prompt: RenderedPrompt) -> AsyncIterator[str]:
+        """Stream response text from one provider."""
+        if provider == "gemini":
+            model, contents = await gemini_context_cache.contents(prompt, self.gemini_client)
+            async with self.provider_limits["gemini"]:
+                # Stream metrics cover time to first response, not the consumer
+                with observe_llm("gemini", "stream"):
+                    response = await model.generate_content_async(contents, stream=True)
+                async for chunk in response:
+                    if chunk.text:
+                        yield chunk.text
+        elif provider == "anthropic":
+            async with self.provider_limits["anthropic"]:
+                with observe_llm("anthropic", "stream"):
+                    stream = await self.anthropic_client.messages.create(
+                        model=settings.mcp_model,
+                        max_tokens=300,
+                        system=anthropic_system(prompt),
+                        messages=[{"role": "user", "content": prompt.suffix}],
+                        stream=True
+                    )
+                async for event in stream:
+                    if event.type == "content_block_delta" and getattr(event.delta, "text", None):
+                        yield event.delta.text
+        elif provider == "openai":
+            async with self.provider_limits["openai"]:
+                with observe_llm("openai", "stream"):
+                    stream = await self.openai_client.chat.completions.create(
+                        model=settings.openai_model,
+                        messages=openai_messages(prompt),
+                        max_tokens=300,
+                        temperature=0.7,
+                        stream=True
+                    )
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
     
     async def analyze_symptoms(self, symptoms_data: Dict[str, Any], user_id: str) -> SymptomAnalysisResponse:
         """Analyze symptoms using MCP and medical knowledge."""
@@ -97,231 +295,190 @@ class MCPChatbotService:
     
     async def _create_chat_session(self, user_id: str) -> str:
         """Create a new chat session."""
+        session_id = str(uuid.uuid4())
         session_data = {
+            "session_id": session_id,
             "user_id": user_id,
             "created_at": datetime.utcnow(),
             "updated_at": datetime.utcnow(),
-            "messages": [],
+            "message_count": 0,
             "is_active": True
         }
-        result = await self.chat_collection.insert_one(session_data)
-        return str(result.inserted_id)
+        await self.chat_collection.insert_one(session_data)
+        return session_id
     
     async def _store_message(self, session_id: str, role: str, content: str, user_id: str):
-        """Store a message in the chat session."""
+        """Store a message in the chat_messages collection."""
+        now = datetime.utcnow()
         message_data = {
+            "session_id": session_id,
             "role": role,
             "content": content,
-            "timestamp": datetime.utcnow(),
+            "created_at": now,
             "user_id": user_id
         }
         
+        await self.message_collection.insert_one(message_data)
         await self.chat_collection.update_one(
-            {"_id": session_id},
-            {"$push": {"messages": message_data}, "$set": {"updated_at": datetime.utcnow()}}
+            {"session_id": session_id},
+            {"$inc": {"message_count": 1}, "$set": {"updated_at": now}}
         )
     
-    async def _analyze_medical_content(self, message: str, user_id: str) -> Dict[str, Any]:
-        """Analyze if the message contains medical content."""
-        try:
-            if self.gemini_client:
-                response = await self._call_gemini_medical_analysis(message)
-            elif self.anthropic_client:
-                response = await self._call_anthropic_medical_analysis(message)
-            elif self.openai_client:
-                response = await self._call_openai_medical_analysis(message)
-            else:
-                return {"is_medical": False, "confidence": 0.0}
-            
-            return response
-        except Exception as e:
-            logger.error(f"Error analyzing medical content: {str(e)}")
-            return {"is_medical": False, "confidence": 0.0}
-    
-    async def _call_gemini_medical_analysis(self, message: str) -> Dict[str, Any]:
-        """Use Google Gemini for medical content analysis."""
-        prompt = f"""
-        Analyze the following message to determine if it contains medical content, symptoms, or health-related questions.
-        
-        Message: "{message}"
+    async def get_session_messages(
+        self, session_id: str, limit: int = 50, before: Optional[Tuple[datetime, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Get the most recent messages of a session in chronological order.
         
-        Respond with a JSON object containing:
-        - is_medical: boolean (true if medical content detected)
-        - confidence: float (0.0 to 1.0)
-        - detected_symptoms: array of strings (if any symptoms detected)
-        - urgency_level: string (low, medium, high, emergency)
-        - medical_categories: array of strings (e.g., ["symptoms", "medication", "diagnosis"])
+        ``before`` is a (created_at, _id) position; only older messages are returned.
         """
-        
-        try:
-            response = self.gemini_client.generate_content(prompt)
-            return json.loads(response.text)
-        except json.JSONDecodeError:
-            return {"is_medical": False, "confidence": 0.0}
-        except Exception as e:
-            logger.error(f"Gemini API error: {str(e)}")
-            return {"is_medical": False, "confidence": 0.0}
+        query: Dict[str, Any] = {"session_id": session_id}
+        if before is not None:
+            created_at, message_id = before
+            query["$or"] = [
+                {"created_at": {"$lt": created_at}},
+                {"created_at": created_at, "_id": {"$lt": message_id}}
+            ]
+        messages = await self.message_collection.find(query).sort(
+            [("created_at", -1), ("_id", -1)]
+        ).limit(limit).to_list(length=limit)
+        return list(reversed(messages))
     
-    async def _call_anthropic_medical_analysis(self, message: str) -> Dict[str, Any]:
-        """Use Anthropic Claude for medical content analysis."""
-        prompt = f"""
-        Analyze the following message to determine if it contains medical content, symptoms, or health-related questions.
-        
-        Message: "{message}"
-        
-        Respond with a JSON object containing:
-        - is_medical: boolean (true if medical content detected)
-        - confidence: float (0.0 to 1.0)
-        - detected_symptoms: array of strings (if any symptoms detected)
-        - urgency_level: string (low, medium, high, emergency)
-        - medical_categories: array of strings (e.g., ["symptoms", "medication", "diagnosis"])
-        """
-        
-        response = self.anthropic_client.messages.create(
+    async def _gemini_generate(self, prompt: RenderedPrompt, **kwargs):
+        """Call Gemini without blocking the event loop, reusing a cached prompt prefix when there is one."""
+        model, contents = await gemini_context_cache.contents(prompt, self.gemini_client)
+        async with self.provider_limits["gemini"]:
+            with observe_llm("gemini", "generate"):
+                if hasattr(model, "generate_content_async"):
+                    return await model.generate_content_async(contents, **kwargs)
+                return await run_blocking(model.generate_content, contents, **kwargs)
+    
+    async def _anthropic_create(self, **kwargs):
+        """Call the Anthropic messages API without blocking the event loop."""
+        async with self.provider_limits["anthropic"]:
+            with observe_llm("anthropic", "generate"):
+                return await self.anthropic_client.messages.create(**kwargs)
+    
+    async def _openai_create(self, **kwargs):
+        """Call the OpenAI chat completions API without blocking the event loop."""
+        async with self.provider_limits["openai"]:
+            with observe_llm("openai", "generate"):
+                return await self.openai_client.chat.completions.create(**kwargs)
+    
+    def provider_health_checks(self) -> Dict[str, Any]:
+        """Return a cheap metadata probe per configured provider; none of them generate tokens."""
+        checks = {}
+        if self.gemini_client:
+            import google.generativeai as genai
+            checks["gemini"] = lambda: run_blocking(genai.get_model, f"models/{settings.gemini_model}")
+        if self.anthropic_client:
+            checks["anthropic"] = lambda: self.anthropic_client.models.list(limit=1)
+        if self.openai_client:
+            checks["openai"] = lambda: self.openai_client.models.retrieve(settings.openai_model)
+        return checks
+    
+    async def _gemini_complete(self, prompt: RenderedPrompt, max_tokens: int, temperature: float) -> str:
+        response = await self._gemini_generate(
+            prompt,
+            generation_config={"max_output_tokens": max_tokens, "temperature": temperature}
+        )
+        return response.text
+    
+    async def _anthropic_complete(self, prompt: RenderedPrompt, max_tokens: int, temperature: float) -> str:
+        response = await self._anthropic_create(
             model=settings.mcp_model,
-            max_tokens=500,
-            messages=[{"role": "user", "content": prompt}]
+            max_tokens=max_tokens,
+            temperature=temperature,
+            system=anthropic_system(prompt),
+            messages=[{"role": "user", "content": prompt.suffix}]
         )
+        return response.content[0].text
+    
+    async def _openai_complete(self, prompt: RenderedPrompt, max_tokens: int, temperature: float) -> str:
+        response = await self._openai_create(
+            model=settings.openai_model,
+            messages=openai_messages(prompt),
+            max_tokens=max_tokens,
+            temperature=temperature
+        )
+        return response.choices[0].message.content
+    
+    @property
+    def router(self) -> ProviderRouter:
+        """Router over the configured providers, built on first use."""
+        if self._router is None:
+            providers = {}
+            if self.gemini_client:
+                providers["gemini"] = self._gemini_complete
+            if self.anthropic_client:
+                providers["anthropic"] = self._anthropic_complete
+            if self.openai_client:
+                providers["openai"] = self._openai_complete
+            self._router = ProviderRouter(
+                providers,
+                hedge_after=settings.llm_hedge_after,
+                window=settings.llm_latency_window,
+                min_samples=settings.llm_min_samples,
+                failure_threshold=settings.llm_breaker_failure_threshold,
+                reset_timeout=settings.llm_breaker_reset_timeout
+            )
+        return self._router
+    
+    async def _complete(self, prompt: RenderedPrompt, max_tokens: int, temperature: float) -> Optional[str]:
+        """Send a single-turn prompt through the provider router and return its text."""
+        if not self.router.providers:
+            return None
+        return await self.router.complete(prompt, max_tokens, temperature)
+    
+    async def _analyze_and_respond(self, message: str, user_id: str) -> Dict[str, Any]:
+        """Classify the message and draft the reply with a single structured LLM call."""
+        prompt = ANALYZE_AND_RESPOND.render(message=message)
         
         try:
-            return json.loads(response.content[0].text)
+            text = await self._complete(prompt, max_tokens=700, temperature=0.3)
+            if text is None:
+                return {"is_medical": False, "confidence": 0.0}
+            return json.loads(text)
         except json.JSONDecodeError:
             return {"is_medical": False, "confidence": 0.0}
+        except Exception as e:
+            logger.error(f"Error analyzing and responding to message: {str(e)}")
+            return {"is_medical": False, "confidence": 0.0}
     
-    async def _call_openai_medical_analysis(self, message: str) -> Dict[str, Any]:
-        """Use OpenAI for medical content analysis."""
-        prompt = f"""
-        Analyze the following message to determine if it contains medical content, symptoms, or health-related questions.
-        
-        Message: "{message}"
-        
-        Respond with a JSON object containing:
-        - is_medical: boolean (true if medical content detected)
-        - confidence: float (0.0 to 1.0)
-        - detected_symptoms: array of strings (if any symptoms detected)
-        - urgency_level: string (low, medium, high, emergency)
-        - medical_categories: array of strings (e.g., ["symptoms", "medication", "diagnosis"])
-        """
-        
-        response = self.openai_client.chat.completions.create(
-            model=settings.openai_model,
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=500,
-            temperature=0.1
-        )
-        
+    async def _analyze_medical_content(self, message: str, user_id: str) -> Dict[str, Any]:
+        """Analyze if the message contains medical content."""
         try:
-            return json.loads(response.choices[0].message.content)
+            text = await self._complete(self._build_medical_analysis_prompt(message), max_tokens=500, temperature=0.1)
+            if text is None:
+                return {"is_medical": False, "confidence": 0.0}
+            return json.loads(text)
         except json.JSONDecodeError:
             return {"is_medical": False, "confidence": 0.0}
+        except Exception as e:
+            logger.error(f"Error analyzing medical content: {str(e)}")
+            return {"is_medical": False, "confidence": 0.0}
+    
+    def _build_medical_analysis_prompt(self, message: str) -> RenderedPrompt:
+        """Build the prompt used to classify a message."""
+        return MEDICAL_ANALYSIS.render(message=message)
     
     async def _generate_medical_response(self, message: str, analysis: Dict[str, Any], user_id: str) -> str:
         """Generate a medical response using MCP."""
         try:
-            if self.gemini_client:
-                return await self._call_gemini_medical_response(message, analysis)
-            elif self.anthropic_client:
-                return await self._call_anthropic_medical_response(message, analysis)
-            elif self.openai_client:
-                return await self._call_openai_medical_response(message, analysis)
-            else:
-                return self._get_default_medical_response()
+            prompt = self._build_medical_response_prompt(message, analysis)
+            text = await self._complete(prompt, max_tokens=300, temperature=0.7)
+            return text if text is not None else self._get_default_medical_response()
         except Exception as e:
             logger.error(f"Error generating medical response: {str(e)}")
             return self._get_default_medical_response()
     
-    async def _call_gemini_medical_response(self, message: str, analysis: Dict[str, Any]) -> str:
-        """Generate medical response using Google Gemini."""
-        symptoms = analysis.get("detected_symptoms", [])
-        urgency = analysis.get("urgency_level", "medium")
-        
-        prompt = f"""
-        You are a medical AI assistant. Respond to the following health-related message with empathy and helpful guidance.
-        
-        Message: "{message}"
-        Detected symptoms: {', '.join(symptoms) if symptoms else 'None'}
-        Urgency level: {urgency}
-        
-        Guidelines:
-        1. Be empathetic and understanding
-        2. Provide helpful general health information
-        3. Always recommend consulting healthcare professionals for serious concerns
-        4. If urgency is high or emergency, emphasize seeking immediate medical attention
-        5. Keep response concise but informative
-        6. Include appropriate disclaimers about not replacing professional medical advice
-        
-        Response should be 2-3 sentences maximum.
-        """
-        
-        try:
-            response = self.gemini_client.generate_content(prompt)
-            return response.text
-        except Exception as e:
-            logger.error(f"Gemini API error: {str(e)}")
-            return self._get_default_medical_response()
-    
-    async def _call_anthropic_medical_response(self, message: str, analysis: Dict[str, Any]) -> str:
-        """Generate medical response using Anthropic Claude."""
+    def _build_medical_response_prompt(self, message: str, analysis: Dict[str, Any]) -> RenderedPrompt:
+        """Build the prompt used to answer a health-related message."""
         symptoms = analysis.get("detected_symptoms", [])
-        urgency = analysis.get("urgency_level", "medium")
-        
-        prompt = f"""
-        You are a medical AI assistant. Respond to the following health-related message with empathy and helpful guidance.
-        
-        Message: "{message}"
-        Detected symptoms: {', '.join(symptoms) if symptoms else 'None'}
-        Urgency level: {urgency}
-        
-        Guidelines:
-        1. Be empathetic and understanding
-        2. Provide helpful general health information
-        3. Always recommend consulting healthcare professionals for serious concerns
-        4. If urgency is high or emergency, emphasize seeking immediate medical attention
-        5. Keep response concise but informative
-        6. Include appropriate disclaimers about not replacing professional medical advice
-        
-        Response should be 2-3 sentences maximum.
-        """
-        
-        response = self.anthropic_client.messages.create(
-            model=settings.mcp_model,
-            max_tokens=300,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        
-        return response.content[0].text
-    
-    async def _call_openai_medical_response(self, message: str, analysis: Dict[str, Any]) -> str:
-        """Generate medical response using OpenAI."""
-        symptoms = analysis.get("detected_symptoms", [])
-        urgency = analysis.get("urgency_level", "medium")
-        
-        prompt = f"""
-        You are a medical AI assistant. Respond to the following health-related message with empathy and helpful guidance.
-        
-        Message: "{message}"
-        Detected symptoms: {', '.join(symptoms) if symptoms else 'None'}
-        Urgency level: {urgency}
-        
-        Guidelines:
-        1. Be empathetic and understanding
-        2. Provide helpful general health information
-        3. Always recommend consulting healthcare professionals for serious concerns
-        4. If urgency is high or emergency, emphasize seeking immediate medical attention
-        5. Keep response concise but informative
-        6. Include appropriate disclaimers about not replacing professional medical advice
-        
-        Response should be 2-3 sentences maximum.
-        """
-        
-        response = self.openai_client.chat.completions.create(
-            model=settings.openai_model,
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=300,
-            temperature=0.7
+        return MEDICAL_RESPONSE.render(
+            message=message,
+            symptoms=', '.join(symptoms) if symptoms else 'None',
+            urgency=analysis.get("urgency_level", "medium")
         )
-        
-        return response.choices[0].message.content
     
     async def _generate_general_response(self, message: str, user_id: str) -> str:
         """Generate a general non-medical response."""
@@ -330,169 +487,20 @@ class MCPChatbotService:
     async def _generate_symptom_analysis(self, symptoms_data: Dict[str, Any]) -> SymptomAnalysisResponse:
         """Generate comprehensive symptom analysis using MCP."""
         try:
-            if self.gemini_client:
-                return await self._call_gemini_symptom_analysis(symptoms_data)
-            elif self.anthropic_client:
-                return await self._call_anthropic_symptom_analysis(symptoms_data)
-            elif self.openai_client:
-                return await self._call_openai_symptom_analysis(symptoms_data)
-            else:
+            prompt = self._build_symptom_analysis_prompt(symptoms_data)
+            text = await self._complete(prompt, max_tokens=1000, temperature=0.3)
+            if text is None:
                 return self._get_default_symptom_response()
-        except Exception as e:
-            logger.error(f"Error generating symptom analysis: {str(e)}")
-            return self._get_default_symptom_response()
-    
-    async def _call_gemini_symptom_analysis(self, symptoms_data: Dict[str, Any]) -> SymptomAnalysisResponse:
-        """Generate symptom analysis using Google Gemini."""
-        symptoms = symptoms_data.get("symptoms", [])
-        age = symptoms_data.get("age")
-        gender = symptoms_data.get("gender")
-        medical_history = symptoms_data.get("medical_history", [])
-        
-        prompt = f"""
-        Analyze the following symptoms and provide a structured medical assessment.
-        
-        Patient Information:
-        - Age: {age if age else 'Not specified'}
-        - Gender: {gender if gender else 'Not specified'}
-        - Symptoms: {', '.join(symptoms)}
-        - Medical History: {', '.join(medical_history) if medical_history else 'None'}
-        
-        Provide a JSON response with this structure:
-        {{
-            "conditions": [
-                {{
-                    "name": "Condition Name",
-                    "probability": 0.85,
-                    "description": "Brief description",
-                    "severity": "mild|moderate|severe"
-                }}
-            ],
-            "triage_advice": {{
-                "urgency": "low|medium|high|emergency",
-                "recommendation": "Specific recommendation",
-                "timeframe": "When to seek care"
-            }},
-            "disclaimer": "Medical disclaimer",
-            "confidence_score": 0.75,
-            "follow_up_recommendations": ["Action 1", "Action 2"]
-        }}
-        
-        Be conservative and always recommend professional medical consultation.
-        """
-        
-        try:
-            response = self.gemini_client.generate_content(prompt)
-            data = json.loads(response.text)
-            return self._parse_symptom_response(data)
+            return self._parse_symptom_response(json.loads(text))
         except json.JSONDecodeError:
             return self._get_default_symptom_response()
         except Exception as e:
-            logger.error(f"Gemini API error: {str(e)}")
-            return self._get_default_symptom_response()
-    
-    async def _call_anthropic_symptom_analysis(self, symptoms_data: Dict[str, Any]) -> SymptomAnalysisResponse:
-        """Generate symptom analysis using Anthropic Claude."""
-        symptoms = symptoms_data.get("symptoms", [])
-        age = symptoms_data.get("age")
-        gender = symptoms_data.get("gender")
-        medical_history = symptoms_data.get("medical_history", [])
-        
-        prompt = f"""
-        Analyze the following symptoms and provide a structured medical assessment.
-        
-        Patient Information:
-        - Age: {age if age else 'Not specified'}
-        - Gender: {gender if gender else 'Not specified'}
-        - Symptoms: {', '.join(symptoms)}
-        - Medical History: {', '.join(medical_history) if medical_history else 'None'}
-        
-        Provide a JSON response with this structure:
-        {{
-            "conditions": [
-                {{
-                    "name": "Condition Name",
-                    "probability": 0.85,
-                    "description": "Brief description",
-                    "severity": "mild|moderate|severe"
-                }}
-            ],
-            "triage_advice": {{
-                "urgency": "low|medium|high|emergency",
-                "recommendation": "Specific recommendation",
-                "timeframe": "When to seek care"
-            }},
-            "disclaimer": "Medical disclaimer",
-            "confidence_score": 0.75,
-            "follow_up_recommendations": ["Action 1", "Action 2"]
-        }}
-        
-        Be conservative and always recommend professional medical consultation.
-        """
-        
-        response = self.anthropic_client.messages.create(
-            model=settings.mcp_model,
-            max_tokens=1000,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        
-        try:
-            data = json.loads(response.content[0].text)
-            return self._parse_symptom_response(data)
-        except json.JSONDecodeError:
+            logger.error(f"Error generating symptom analysis: {str(e)}")
             return self._get_default_symptom_response()
     
-    async def _call_openai_symptom_analysis(self, symptoms_data: Dict[str, Any]) -> SymptomAnalysisResponse:
-        """Generate symptom analysis using OpenAI."""
-        symptoms = symptoms_data.get("symptoms", [])
-        age = symptoms_data.get("age")
-        gender = symptoms_data.get("gender")
-        medical_history = symptoms_data.get("medical_history", [])
-        
-        prompt = f"""
-        Analyze the following symptoms and provide a structured medical assessment.
-        
-        Patient Information:
-        - Age: {age if age else 'Not specified'}
-        - Gender: {gender if gender else 'Not specified'}
-        - Symptoms: {', '.join(symptoms)}
-        - Medical History: {', '.join(medical_history) if medical_history else 'None'}
-        
-        Provide a JSON response with this structure:
-        {{
-            "conditions": [
-                {{
-                    "name": "Condition Name",
-                    "probability": 0.85,
-                    "description": "Brief description",
-                    "severity": "mild|moderate|severe"
-                }}
-            ],
-            "triage_advice": {{
-                "urgency": "low|medium|high|emergency",
-                "recommendation": "Specific recommendation",
-                "timeframe": "When to seek care"
-            }},
-            "disclaimer": "Medical disclaimer",
-            "confidence_score": 0.75,
-            "follow_up_recommendations": ["Action 1", "Action 2"]
-        }}
-        
-        Be conservative and always recommend professional medical consultation.
-        """
-        
-        response = self.openai_client.chat.completions.create(
-            model=settings.openai_model,
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=1000,
-            temperature=0.3
-        )
-        
-        try:
-            data = json.loads(response.choices[0].message.content)
-            return self._parse_symptom_response(data)
-        except json.JSONDecodeError:
-            return self._get_default_symptom_response()
+    def _build_symptom_analysis_prompt(self, symptoms_data: Dict[str, Any]) -> RenderedPrompt:
+        """Build the prompt used for structured symptom analysis."""
+        return SYMPTOM_ANALYSIS.render(patient=format_patient_information(symptoms_data))
     
     def _parse_symptom_response(self, data: Dict[str, Any]) -> SymptomAnalysisResponse:
         """Parse AI response into SymptomAnalysisResponse."""
@@ -575,5 +583,18 @@ class MCPChatbotService:
         )
 
 
-# Global MCP chatbot service instance
-mcp_chatbot = MCPChatbotService()
+# Global MCP chatbot service instance, created on first use
+_mcp_chatbot: Optional[MCPChatbotService] = None
+
+
+def get_mcp_chatbot() -> MCPChatbotService:
+    """Get the shared MCP chatbot service, creating it on first use."""
+    global _mcp_chatbot
+    if _mcp_chatbot is None:
+        _mcp_chatbot = MCPChatbotService()
+    return _mcp_chatbot
+
+
+def llm_router_stats() -> Dict[str, float]:
+    """Router stats for metrics; empty until the chatbot has been created, so scraping never builds it."""
+    return _mcp_chatbot.router.stats() if _mcp_chatbot is not None else {}
@@ -0,0 +1,354 @@
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from app.config import settings
+from app.services.cache_service import SingleFlight
+import asyncio
+import hashlib
+import logging
+import math
+import textwrap
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token) used for sizing and metrics."""
+    return math.ceil(len(text) / 4)
+
+
+class PromptTemplate:
+    """A prompt split into a static prefix and a per-call suffix.
+
+    The prefix holds instructions and output formats and is identical on
+    every call, so providers can cache it; only the suffix is formatted.
+    """
+
+    def __init__(self, name: str, prefix: str, suffix: str):
+        self.name = name
+        self.prefix = textwrap.dedent(prefix).strip()
+        self.suffix = textwrap.dedent(suffix).strip()
+        self.prefix_tokens = estimate_tokens(self.prefix)
+        self.prefix_digest = hashlib.sha256(self.prefix.encode()).hexdigest()[:16]
+        self.renders = 0
+        self.suffix_tokens = 0
+
+    def render(self, **values: Any) -> "RenderedPrompt":
+        suffix = self.suffix.format(**values)
+        self.renders += 1
+        self.suffix_tokens += estimate_tokens(suffix)
+        return RenderedPrompt(self, suffix)
+
+
+class RenderedPrompt:
+    """A template's prefix with a formatted suffix."""
+
+    __slots__ = ("template", "suffix")
+
+    def __init__(self, template: PromptTemplate, suffix: str):
+        self.template = template
+        self.suffix = suffix
+
+    @property
+    def prefix(self) -> str:
+        return self.template.prefix
+
+    @property
+    def text(self) -> str:
+        """Prefix and suffix as one prompt, for providers without a separate system prompt."""
+        return f"{self.template.prefix}\n\n{self.suffix}"
+
+    def __str__(self) -> str:
+        return self.text
+
+
+class PromptRegistry:
+    """Every LLM prompt template, defined once and shared by all services."""
+
+    def __init__(self):
+        self._templates: Dict[str, PromptTemplate] = {}
+
+    def register(self, name: str, prefix: str, suffix: str) -> PromptTemplate:
+        if name in self._templates:
+            raise ValueError(f"Prompt template {name} is already registered")
+        template = PromptTemplate(name, prefix, suffix)
+        self._templates[name] = template
+        return template
+
+    def get(self, name: str) -> PromptTemplate:
+        return self._templates[name]
+
+    def render(self, name: str, **values: Any) -> RenderedPrompt:
+        return self._templates[name].render(**values)
+
+    def counters(self) -> List[str]:
+        """Names of the cumulative values in ``stats``."""
+        return [key for name in self._templates for key in (f"{name}_renders", f"{name}_suffix_tokens")]
+
+    def stats(self) -> Dict[str, int]:
+        """Estimated prefix tokens, renders and suffix tokens per template."""
+        values = {}
+        for name, template in self._templates.items():
+            values[f"{name}_prefix_tokens"] = template.prefix_tokens
+            values[f"{name}_renders"] = template.renders
+            values[f"{name}_suffix_tokens"] = template.suffix_tokens
+        return values
+
+
+def anthropic_system(prompt: RenderedPrompt):
+    """System prompt for Anthropic, marked for prompt caching when the prefix is long enough to be cached."""
+    if settings.llm_prompt_caching and prompt.template.prefix_tokens >= settings.anthropic_cache_min_tokens:
+        return [{"type": "text", "text": prompt.prefix, "cache_control": {"type": "ephemeral"}}]
+    return prompt.prefix
+
+
+def openai_messages(prompt: RenderedPrompt) -> List[Dict[str, str]]:
+    """OpenAI caches repeated prompt prefixes automatically; keep the static part first."""
+    return [
+        {"role": "system", "content": prompt.prefix},
+        {"role": "user", "content": prompt.suffix}
+    ]
+
+
+class GeminiContextCache:
+    """Gemini cached contents holding template prefixes, created on first use.
+
+    Templates whose prefix is shorter than ``min_tokens`` (Gemini's minimum
+    for cached content) are sent whole instead. Each template has at most
+    one cached content: concurrent callers share its creation, and before
+    it expires its TTL is extended rather than a new one created. A
+    template whose cache cannot be created, e.g. with an SDK that has no
+    caching support, is not retried.
+    """
+
+    def __init__(self, model_name: str, min_tokens: int = 32768, ttl: int = 3600):
+        self.model_name = model_name
+        self.min_tokens = min_tokens
+        self.ttl = ttl
+        # template name -> (model bound to the cached prefix, cached content, refresh at)
+        self._models: Dict[str, Tuple[Any, Any, float]] = {}
+        self._unavailable = set()
+        self._flights = SingleFlight()
+        self.created = 0
+        self.extended = 0
+
+    def applies(self, template: PromptTemplate) -> bool:
+        return (
+            settings.llm_prompt_caching
+            and template.prefix_tokens >= self.min_tokens
+            and template.name not in self._unavailable
+        )
+
+    async def model_for(self, template: PromptTemplate) -> Optional[Any]:
+        """Model that already holds the template's prefix, or None to send the full prompt."""
+        if not self.applies(template):
+            return None
+        entry = self._models.get(template.name)
+        if entry is not None and entry[2] > time.monotonic():
+            return entry[0]
+        return await self._flights.do(template.name, self._create_or_extend, template)
+
+    async def _create_or_extend(self, template: PromptTemplate) -> Optional[Any]:
+        ttl = timedelta(seconds=self.ttl)
+        entry = self._models.pop(template.name, None)
+        if entry is not None:
+            model, cached, _ = entry
+            try:
+                await asyncio.to_thread(cached.update, ttl=ttl)
+                self.extended += 1
+                self._store(template, model, cached)
+                return model
+            except Exception as e:
+                logger.warning(f"Could not extend Gemini context cache for {template.name}, recreating it: {str(e)}")
+                try:
+                    await asyncio.to_thread(cached.delete)
+                except Exception:
+                    pass
+
+        try:
+            import google.generativeai as genai
+            from google.generativeai import caching
+
+            cached = await asyncio.to_thread(
+                caching.CachedContent.create,
+                model=self.model_name,
+                display_name=f"healthify-{template.name}-{template.prefix_digest}",
+                system_instruction=template.prefix,
+                ttl=ttl
+            )
+            model = genai.GenerativeModel.from_cached_content(cached_content=cached)
+        except Exception as e:
+            logger.warning(f"Gemini context cache unavailable for {template.name}: {str(e)}")
+            self._unavailable.add(template.name)
+            return None
+
+        self.created += 1
+        self._store(template, model, cached)
+        return model
+
+    def _store(self, template: PromptTemplate, model: Any, cached: Any):
+        # Extend before the server-side cache expires
+        self._models[template.name] = (model, cached, time.monotonic() + self.ttl * 0.9)
+
+    async def contents(self, prompt: RenderedPrompt, default_model: Any) -> Tuple[Any, str]:
+        """Model and contents to send for ``prompt``."""
+        model = await self.model_for(prompt.template)
+        if model is None:
+            return default_model, prompt.text
+        return model, prompt.suffix
+
+
+def format_patient_information(request_data: dict) -> str:
+    symptoms = request_data.get("symptoms") or []
+    medical_history = request_data.get("medical_history") or []
+    medications = request_data.get("current_medications") or []
+    return "\n".join([
+        f"- Age: {request_data.get('age') or 'Not specified'}",
+        f"- Gender: {request_data.get('gender') or 'Not specified'}",
+        f"- Symptoms: {', '.join(symptoms)}",
+        f"- Medical History: {', '.join(medical_history) if medical_history else 'None provided'}",
+        f"- Current Medications: {', '.join(medications) if medications else 'None'}",
+        f"- Additional Information: {request_data.get('additional_info') or 'None'}",
+    ])
+
+
+DEFAULT_DISCLAIMER = "This is not a substitute for professional medical advice. Always consult a healthcare provider."
+
+SYMPTOM_RESPONSE_FORMAT = f"""{{
+    "conditions": [
+        {{
+            "name": "Condition Name",
+            "probability": 0.85,
+            "description": "Brief description of the condition",
+            "severity": "mild|moderate|severe"
+        }}
+    ],
+    "triage_advice": {{
+        "urgency": "low|medium|high|emergency",
+        "recommendation": "Specific recommendation for care",
+        "timeframe": "When to seek care (e.g., 'within 24 hours')"
+    }},
+    "disclaimer": "{DEFAULT_DISCLAIMER}",
+    "confidence_score": 0.75,
+    "follow_up_recommendations": ["Specific follow-up action 1", "Specific follow-up action 2"]
+}}"""
+
+SYMPTOM_GUIDELINES = """IMPORTANT GUIDELINES:
+1. Be conservative in your assessments
+2. Always recommend consulting a healthcare provider for serious symptoms
+3. If symptoms suggest emergency conditions, mark urgency as "emergency"
+4. Provide probabilities as decimal numbers (0.0 to 1.0)
+5. Include appropriate disclaimers
+6. Focus on the most likely 3-5 conditions
+7. Be specific about timeframes for seeking care"""
+
+MESSAGE_ANALYSIS_FIELDS = """- is_medical: boolean (true if medical content detected)
+- confidence: float (0.0 to 1.0)
+- detected_symptoms: array of strings (if any symptoms detected)
+- urgency_level: string (low, medium, high, emergency)
+- medical_categories: array of strings (e.g., ["symptoms", "medication", "diagnosis"])"""
+
+REPLY_GUIDELINES = """1. Be empathetic and understanding
+2. Provide helpful general health information
+3. Always recommend consulting healthcare professionals for serious concerns
+4. If urgency is high or emergency, emphasize seeking immediate medical attention
+5. Include appropriate disclaimers about not replacing professional medical advice
+6. Keep the reply to 2-3 sentences maximum"""
+
+
+# Shared registry
+prompt_registry = PromptRegistry()
+
+MEDICAL_ANALYSIS = prompt_registry.register(
+    "medical_analysis",
+    prefix=f"""
+Analyze the user's message to determine if it contains medical content, symptoms, or health-related questions.
+
+Respond with a JSON object containing:
+{MESSAGE_ANALYSIS_FIELDS}
+""",
+    suffix='Message: "{message}"'
+)
+
+ANALYZE_AND_RESPOND = prompt_registry.register(
+    "analyze_and_respond",
+    prefix=f"""
+You are a medical AI assistant. First decide whether the user's message contains medical content,
+symptoms, or health-related questions, then reply to it.
+
+Respond with a JSON object containing:
+{MESSAGE_ANALYSIS_FIELDS}
+- response: string, your reply when is_medical is true, otherwise an empty string
+
+Reply guidelines:
+{REPLY_GUIDELINES}
+""",
+    suffix='Message: "{message}"'
+)
+
+MEDICAL_RESPONSE = prompt_registry.register(
+    "medical_response",
+    prefix=f"""
+You are a medical AI assistant. Respond to the user's health-related message with empathy and helpful guidance.
+
+Guidelines:
+{REPLY_GUIDELINES}
+""",
+    suffix='''
+Message: "{message}"
+Detected symptoms: {symptoms}
+Urgency level: {urgency}
+'''
+)
+
+SYMPTOM_ANALYSIS = prompt_registry.register(
+    "symptom_analysis",
+    prefix=f"""
+You are a medical AI assistant. Analyze the patient's symptoms and provide a structured response.
+
+Please provide a JSON response with the following structure:
+{SYMPTOM_RESPONSE_FORMAT}
+
+{SYMPTOM_GUIDELINES}
+""",
+    suffix="""
+PATIENT INFORMATION:
+{patient}
+"""
+)
+
+SYMPTOM_ANALYSIS_BATCH = prompt_registry.register(
+    "symptom_analysis_batch",
+    prefix=f"""
+You are a medical AI assistant. Analyze the symptoms of each of the numbered patients independently.
+Do not let one patient's information influence another patient's analysis.
+
+Respond with a JSON array containing one object per patient.
+Each object must have an "id" field with the patient number, a "ref" field with the patient's reference code,
+and a "symptoms" field listing that patient's symptoms exactly as given, and otherwise follow this JSON structure:
+{SYMPTOM_RESPONSE_FORMAT}
+
+{SYMPTOM_GUIDELINES}
+""",
+    suffix="""
+{patients}
+
+Respond with exactly {count} objects.
+"""
+)
+
+CHAT_ASSISTANT = prompt_registry.register(
+    "chat_assistant",
+    prefix="""
+You are a helpful medical assistant chatbot. Provide general health information and guidance, but always recommend
+consulting healthcare professionals for medical concerns. Be empathetic, clear, and helpful.
+""",
+    suffix="{message}"
+)
+
+# Shared by every service that calls the configured Gemini model
+gemini_context_cache = GeminiContextCache(
+    settings.gemini_model,
+    min_tokens=settings.gemini_cache_min_tokens,
+    ttl=settings.gemini_cache_ttl
+)
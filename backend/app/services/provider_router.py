@@ -0,0 +1,229 @@
+from collections import deque
+from typing import Awaitable, Callable, Dict, List, Optional
+from app.services.prompts import RenderedPrompt
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# async (prompt, max_tokens, temperature) -> text
+Completion = Callable[[RenderedPrompt, int, float], Awaitable[str]]
+
+
+class NoProviderAvailable(Exception):
+    """Raised when every provider is unconfigured or has an open circuit."""
+
+
+class ProviderStats:
+    """Rolling latency percentiles and error rate over the last ``window`` calls."""
+
+    def __init__(self, window: int = 200):
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)
+
+    def record(self, latency: float, ok: bool):
+        self.outcomes.append(ok)
+        if ok:
+            self.latencies.append(latency)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    @property
+    def samples(self) -> int:
+        return len(self.outcomes)
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return 1 - sum(self.outcomes) / len(self.outcomes)
+
+
+class CircuitBreaker:
+    """Open after ``failure_threshold`` consecutive failures; allow one trial call after ``reset_timeout``."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        return state == "half_open" and not self.trial_in_flight
+
+    def on_start(self):
+        if self.state == "half_open":
+            self.trial_in_flight = True
+
+    def on_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def on_failure(self):
+        self.failures += 1
+        self.trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+class ProviderRouter:
+    """Route completions across LLM providers.
+
+    Providers are ranked by rolling p50 latency, inflated by their error rate;
+    providers without ``min_samples`` calls keep their configured order ahead
+    of measured ones so they get measured. A provider whose circuit is open
+    is skipped. A failed call fails over to the next provider. When
+    ``hedge_after`` is set and the current call has not answered within that
+    many seconds, the next provider is raced against it and the first
+    answer wins.
+    """
+
+    def __init__(
+        self,
+        providers: Dict[str, Completion],
+        hedge_after: float = 0.0,
+        window: int = 200,
+        min_samples: int = 20,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0
+    ):
+        self.providers = providers
+        self.hedge_after = hedge_after
+        self.min_samples = min_samples
+        self.stats_by_provider = {name: ProviderStats(window) for name in providers}
+        # Time to first chunk of streams, kept out of the completion latencies used for ranking
+        self.stream_stats_by_provider = {name: ProviderStats(window) for name in providers}
+        self.breakers = {name: CircuitBreaker(failure_threshold, reset_timeout) for name in providers}
+        self.hedges = 0
+        self.failovers = 0
+
+    def ranked(self) -> List[str]:
+        """Providers that may be called, best first."""
+        order = list(self.providers)
+
+        def expected_latency(name: str) -> float:
+            stats = self.stats_by_provider[name]
+            if stats.samples < self.min_samples:
+                return 0.0
+            p50 = stats.percentile(0.5)
+            if p50 is None:
+                return float("inf")
+            return p50 / max(1 - stats.error_rate, 0.05)
+
+        allowed = [name for name in order if self.breakers[name].allow()]
+        return sorted(allowed, key=lambda name: (expected_latency(name), order.index(name)))
+
+    def record(self, name: str, latency: float, ok: bool):
+        """Record the outcome of a full completion."""
+        self.stats_by_provider[name].record(latency, ok)
+        self._settle(name, ok)
+
+    def start_stream(self, name: str) -> bool:
+        """Claim a provider for a stream; False while its circuit is open or its half-open trial is taken."""
+        if not self.breakers[name].allow():
+            return False
+        self.breakers[name].on_start()
+        return True
+
+    def record_stream(self, name: str, latency: float, ok: bool):
+        """Record whether a stream produced its first chunk, and how long that took."""
+        self.stream_stats_by_provider[name].record(latency, ok)
+        self._settle(name, ok)
+
+    def release(self, name: str):
+        """Forget a cancelled call; it says nothing about the provider's health."""
+        self.breakers[name].trial_in_flight = False
+
+    def _settle(self, name: str, ok: bool):
+        if ok:
+            self.breakers[name].on_success()
+        else:
+            self.breakers[name].on_failure()
+
+    async def _call(self, name: str, prompt: RenderedPrompt, max_tokens: int, temperature: float) -> str:
+        self.breakers[name].on_start()
+        started = time.perf_counter()
+        try:
+            result = await self.providers[name](prompt, max_tokens, temperature)
+        except asyncio.CancelledError:
+            # A cancelled hedge
+            self.release(name)
+            raise
+        except Exception:
+            self.record(name, time.perf_counter() - started, False)
+            raise
+        self.record(name, time.perf_counter() - started, True)
+        return result
+
+    async def complete(self, prompt: RenderedPrompt, max_tokens: int, temperature: float) -> str:
+        """Return the first successful completion, failing over and hedging as needed."""
+        candidates = self.ranked()
+        if not candidates:
+            raise NoProviderAvailable("No LLM provider available")
+
+        pending: Dict[asyncio.Task, str] = {}
+        last_error: Optional[BaseException] = None
+
+        def launch():
+            name = candidates.pop(0)
+            pending[asyncio.create_task(self._call(name, prompt, max_tokens, temperature))] = name
+
+        launch()
+        try:
+            while pending:
+                timeout = self.hedge_after if self.hedge_after > 0 and candidates else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    self.hedges += 1
+                    launch()
+                    continue
+
+                for task in done:
+                    name = pending.pop(task)
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+                    logger.warning(f"LLM provider {name} failed: {str(last_error)}")
+
+                if not pending and candidates:
+                    self.failovers += 1
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        raise last_error
+
+    def stats(self) -> Dict[str, float]:
+        """Per-provider completion and stream latency, error rates and circuit state, plus hedge and failover counts."""
+        values = {"hedges": self.hedges, "failovers": self.failovers}
+        for name, stats in self.stats_by_provider.items():
+            p50 = stats.percentile(0.5)
+            p95 = stats.percentile(0.95)
+            values[f"{name}_p50_ms"] = round(p50 * 1000, 2) if p50 is not None else 0.0
+            values[f"{name}_p95_ms"] = round(p95 * 1000, 2) if p95 is not None else 0.0
+            values[f"{name}_error_rate"] = round(stats.error_rate, 4)
+            values[f"{name}_circuit_open"] = int(self.breakers[name].state != "closed")
+            stream_p50 = self.stream_stats_by_provider[name].percentile(0.5)
+            values[f"{name}_stream_first_chunk_p50_ms"] = round(stream_p50 * 1000, 2) if stream_p50 is not None else 0.0
+            values[f"{name}_stream_error_rate"] = round(self.stream_stats_by_provider[name].error_rate, 4)
+        return values
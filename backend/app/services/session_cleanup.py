@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from app.config import settings
+from app.database import get_async_mongo
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+async def expire_in_batches(
+    db,
+    name: str,
+    collection,
+    query: Dict[str, Any],
+    field: str,
+    batch_size: int = 1000,
+    max_batches: int = 0
+) -> int:
+    """Mark documents matching ``query`` inactive, ``batch_size`` at a time.
+
+    Each batch reads only the ids of the oldest matches by ``field`` (served
+    by an ``is_active``/``field`` index) and ends them with one
+    ``update_many``, so memory stays bounded by the batch size. Progress is
+    checkpointed in ``maintenance_checkpoints``; a run stopped early by
+    ``max_batches`` or a failure resumes from the last checkpoint.
+    Returns the number of documents ended by this run.
+    """
+    checkpoints = db.maintenance_checkpoints
+    checkpoint = await checkpoints.find_one({"_id": name})
+    start: Optional[datetime] = None
+    if checkpoint and not checkpoint.get("finished"):
+        start = checkpoint.get("last_value")
+
+    ended = 0
+    batches = 0
+    finished = False
+    while not max_batches or batches < max_batches:
+        batch_query = dict(query)
+        if start is not None:
+            batch_query[field] = {**query[field], "$gte": start}
+        docs = await collection.find(batch_query, {"_id": 1, field: 1}).sort(field, 1).limit(batch_size).to_list(batch_size)
+        if not docs:
+            finished = True
+            break
+
+        result = await collection.update_many(
+            {"_id": {"$in": [doc["_id"] for doc in docs]}, "is_active": True},
+            {"$set": {"is_active": False, "ended_at": datetime.utcnow()}}
+        )
+        ended += result.modified_count
+        batches += 1
+        start = docs[-1][field]
+        await checkpoints.update_one(
+            {"_id": name},
+            {
+                "$set": {"last_value": start, "finished": False, "updated_at": datetime.utcnow()},
+                "$inc": {"processed": result.modified_count}
+            },
+            upsert=True
+        )
+        if len(docs) < batch_size:
+            finished = True
+            break
+
+    if finished:
+        await checkpoints.update_one(
+            {"_id": name},
+            {"$set": {"last_value": None, "finished": True, "updated_at": datetime.utcnow()}},
+            upsert=True
+        )
+    logger.info(f"Session cleanup {name}: ended {ended} in {batches} batches, finished={finished}")
+    return ended
+
+
+async def cleanup_expired_sessions(db=None) -> Dict[str, int]:
+    """End chat sessions older than ``chat_session_max_age_hours`` and expired user sessions.
+
+    With ``user_session_ttl_index`` MongoDB removes expired user sessions
+    itself and they are skipped here.
+    """
+    db = db if db is not None else get_async_mongo()
+    now = datetime.utcnow()
+    counts = {
+        "chat_sessions": await expire_in_batches(
+            db,
+            "session_cleanup:chat_sessions",
+            db.chat_sessions,
+            {"is_active": True, "created_at": {"$lt": now - timedelta(hours=settings.chat_session_max_age_hours)}},
+            "created_at",
+            settings.session_cleanup_batch_size,
+            settings.session_cleanup_max_batches
+        )
+    }
+    if not settings.user_session_ttl_index:
+        counts["user_sessions"] = await expire_in_batches(
+            db,
+            "session_cleanup:user_sessions",
+            db.user_sessions,
+            {"is_active": True, "expires_at": {"$lt": now}},
+            "expires_at",
+            settings.session_cleanup_batch_size,
+            settings.session_cleanup_max_batches
+        )
+    return counts
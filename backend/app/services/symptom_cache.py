@@ -0,0 +1,201 @@
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+from app.config import settings
+from app.services.cache_service import cache_service
+import hashlib
+import json
+import re
+import unicodedata
+
+KEY_PREFIX = "symptom_analysis:v1"
+
+# (upper bound exclusive, label)
+AGE_BANDS = [(2, "0-1"), (13, "2-12"), (18, "13-17"), (30, "18-29"), (45, "30-44"), (65, "45-64")]
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_term(term: str) -> str:
+    """Lowercase, unicode-normalize and collapse whitespace; drop trailing punctuation."""
+    term = unicodedata.normalize("NFKC", term or "").lower()
+    return _WHITESPACE.sub(" ", term).strip(" .,;:!?")
+
+
+def normalize_terms(terms: Optional[Iterable[str]]) -> List[str]:
+    """Normalized, de-duplicated and sorted terms."""
+    return sorted({normalize_term(term) for term in terms or []} - {""})
+
+
+def age_band(age: Optional[int]) -> str:
+    if age is None:
+        return "unknown"
+    for upper, label in AGE_BANDS:
+        if age < upper:
+            return label
+    return "65+"
+
+
+def canonical_request(request_data: dict) -> Dict[str, Any]:
+    """The parts of a symptom analysis request that decide its answer, canonicalized."""
+    return {
+        "symptoms": normalize_terms(request_data.get("symptoms")),
+        "age_band": age_band(request_data.get("age")),
+        "gender": normalize_term(request_data.get("gender") or "") or "unknown",
+        "medical_history": normalize_terms(request_data.get("medical_history")),
+        "current_medications": normalize_terms(request_data.get("current_medications")),
+        "additional_info": normalize_term(request_data.get("additional_info") or ""),
+    }
+
+
+def _digest(value: Any) -> str:
+    payload = json.dumps(value, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def symptom_cache_key(request_data: dict) -> str:
+    """Stable cache key shared by every worker for equivalent requests."""
+    return f"{KEY_PREFIX}:{_digest(canonical_request(request_data))}"
+
+
+def symptom_ngrams(symptoms: Iterable[str], n: int = 3) -> FrozenSet[str]:
+    """Character n-grams of each symptom, padded so short terms still match."""
+    grams = set()
+    for symptom in symptoms:
+        padded = f" {symptom} "
+        grams.update(padded[i:i + n] for i in range(max(len(padded) - n + 1, 1)))
+    return frozenset(grams)
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class SimilarityIndex:
+    """Bounded local index of recent symptom sets for near-duplicate lookups.
+
+    Only requests with identical demographics, history, medications and
+    additional information are compared; among those the symptom sets are
+    matched by n-gram Jaccard similarity.
+    """
+
+    def __init__(self, max_size: int = 2048):
+        self.max_size = max_size
+        # key -> (context digest, n-grams)
+        self._entries: "OrderedDict[str, Tuple[str, FrozenSet[str]]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, key: str, context: str, ngrams: FrozenSet[str]):
+        self._entries[key] = (context, ngrams)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def discard(self, key: str):
+        self._entries.pop(key, None)
+
+    def most_similar(self, key: str, context: str, ngrams: FrozenSet[str], threshold: float) -> Optional[str]:
+        """Key of the most similar other entry scoring at least ``threshold``."""
+        best_key, best_score = None, threshold
+        for other_key, (other_context, other_ngrams) in self._entries.items():
+            if other_key == key or other_context != context:
+                continue
+            score = jaccard(ngrams, other_ngrams)
+            if score >= best_score:
+                best_key, best_score = other_key, score
+        return best_key
+
+
+class SymptomCache:
+    """Cache symptom analyses under a canonical content digest.
+
+    Equivalent requests share one entry across users and workers: symptoms
+    and history are normalized and sorted, and age is reduced to a band.
+    When ``similarity_threshold`` is above 0, a miss may reuse the cached
+    analysis of a near-identical symptom set seen by this worker.
+    Stale and coalesced results are counted apart from hits and misses and
+    are left out of the hit rate.
+    """
+
+    def __init__(self, similarity_threshold: float = 0.0, index_size: int = 2048):
+        self.similarity_threshold = similarity_threshold
+        self.index = SimilarityIndex(index_size)
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.coalesced = 0
+
+    async def get_or_analyze(
+        self,
+        request_data: dict,
+        analyze: Callable[[], Awaitable[Any]],
+        ttl: int = 3600,
+        stale_ttl: int = 0
+    ) -> Any:
+        """Return the cached analysis for ``request_data`` or compute it with ``analyze``."""
+        canonical = canonical_request(request_data)
+        key = f"{KEY_PREFIX}:{_digest(canonical)}"
+        reused_similar = False
+
+        async def compute():
+            nonlocal reused_similar
+            if self.similarity_threshold > 0:
+                similar = await self._similar_result(key, canonical)
+                if similar is not None:
+                    reused_similar = True
+                    return similar
+            return await analyze()
+
+        result, source = await cache_service.get_or_set_with_source(key, compute, ttl, stale_ttl=stale_ttl)
+        if source == "hit":
+            self.exact_hits += 1
+        elif source == "stale":
+            self.stale += 1
+        elif source == "coalesced":
+            self.coalesced += 1
+        elif reused_similar:
+            self.similar_hits += 1
+        else:
+            self.misses += 1
+        if self.similarity_threshold > 0:
+            self.index.add(key, self._context(canonical), symptom_ngrams(canonical["symptoms"]))
+        return result
+
+    async def _similar_result(self, key: str, canonical: Dict[str, Any]) -> Optional[Any]:
+        similar_key = self.index.most_similar(
+            key, self._context(canonical), symptom_ngrams(canonical["symptoms"]), self.similarity_threshold
+        )
+        if similar_key is None:
+            return None
+        value = await cache_service.get(similar_key)
+        if value is None:
+            self.index.discard(similar_key)
+        return value
+
+    @staticmethod
+    def _context(canonical: Dict[str, Any]) -> str:
+        return _digest({name: value for name, value in canonical.items() if name != "symptoms"})
+
+    def stats(self) -> Dict[str, float]:
+        """Exact, similar and missed lookups, stale and coalesced results, and the hit rate."""
+        lookups = self.exact_hits + self.similar_hits + self.misses
+        return {
+            "exact_hits": self.exact_hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "coalesced": self.coalesced,
+            "hit_rate": round((self.exact_hits + self.similar_hits) / lookups, 4) if lookups else 0.0,
+            "index_size": len(self.index),
+        }
+
+
+# Global symptom analysis cache
+symptom_cache = SymptomCache(
+    similarity_threshold=settings.symptom_cache_similarity_threshold,
+    index_size=settings.symptom_cache_index_size
+)
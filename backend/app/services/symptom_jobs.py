@@ -0,0 +1,102 @@
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Optional
+from app.config import settings
+from app.database import get_async_mongo_collection
+import asyncio
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+FINAL_STATUSES = ("completed", "failed")
+
+
+def jobs_collection():
+    return get_async_mongo_collection("symptom_analyses")
+
+
+async def create_job(user_id: str, symptoms_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Record a pending analysis and hand it to a Celery worker."""
+    from app.tasks import analyze_symptoms_job
+
+    now = datetime.utcnow()
+    job = {
+        "_id": str(uuid.uuid4()),
+        "user_id": user_id,
+        "symptoms_data": symptoms_data,
+        "status": "pending",
+        "created_at": now,
+        "updated_at": now
+    }
+    await jobs_collection().insert_one(job)
+    try:
+        # Publishing talks to the broker synchronously
+        await asyncio.to_thread(analyze_symptoms_job.apply_async, (job["_id"],), task_id=job["_id"])
+    except Exception as e:
+        await _finish(job["_id"], "failed", error=f"Could not queue analysis: {str(e)}")
+        raise
+    return job
+
+
+async def get_job(job_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+    """Return the user's job, or None if it does not exist or belongs to someone else."""
+    return await jobs_collection().find_one({"_id": job_id, "user_id": user_id})
+
+
+async def _analyze(symptoms_data: Dict[str, Any]) -> Dict[str, Any]:
+    from app.services.gemini_service import get_gemini_service
+    from app.services.symptom_cache import symptom_cache
+
+    async def run_analysis():
+        result = await get_gemini_service().analyze_symptoms(symptoms_data)
+        return result.dict()
+
+    return await symptom_cache.get_or_analyze(
+        symptoms_data,
+        run_analysis,
+        3600,
+        stale_ttl=settings.symptom_cache_stale_ttl
+    )
+
+
+async def _finish(job_id: str, status: str, **fields):
+    await jobs_collection().update_one(
+        {"_id": job_id},
+        {"$set": {"status": status, "updated_at": datetime.utcnow(), **fields}}
+    )
+
+
+async def run_job(job_id: str):
+    """Run a queued analysis and store its result on the job document (worker side)."""
+    job = await jobs_collection().find_one({"_id": job_id})
+    if job is None:
+        logger.warning(f"Symptom analysis job {job_id} not found")
+        return
+    if job["status"] in FINAL_STATUSES:
+        # Redelivered after it already finished
+        return
+
+    await _finish(job_id, "running", started_at=datetime.utcnow())
+    try:
+        analysis = await _analyze(job["symptoms_data"])
+    except Exception as e:
+        logger.error(f"Symptom analysis job {job_id} failed: {str(e)}")
+        await _finish(job_id, "failed", error=str(e))
+        raise
+    await _finish(job_id, "completed", analysis=analysis, completed_at=datetime.utcnow())
+
+
+async def job_events(job_id: str, user_id: str) -> AsyncIterator[Dict[str, Any]]:
+    """Yield the job each time its status changes, until it finishes or the stream times out."""
+    deadline = asyncio.get_running_loop().time() + settings.symptom_job_stream_timeout
+    last_status = None
+    while True:
+        job = await get_job(job_id, user_id)
+        if job is None:
+            return
+        if job["status"] != last_status:
+            last_status = job["status"]
+            yield job
+        if last_status in FINAL_STATUSES or asyncio.get_running_loop().time() >= deadline:
+            return
+        await asyncio.sleep(settings.symptom_job_poll_interval)
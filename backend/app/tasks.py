@@ -1,48 +1,36 @@
-from celery import current_task
-from sqlalchemy.orm import sessionmaker
-from app.database import engine
-from app.models.chat import ChatSession
-from app.models.user import User
-from app.config import settings
-from datetime import datetime, timedelta
+from app.celery_app import celery_app
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
-# Create database session
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# One event loop per worker process, so async clients bound to it stay usable across tasks
+_loop = None
 
 
-@current_task.task
+def run_async(coro):
+    """Run a coroutine to completion on the worker's event loop."""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+    return _loop.run_until_complete(coro)
+
+
+@celery_app.task
 def cleanup_expired_sessions():
-    """Clean up expired chat sessions."""
-    db = SessionLocal()
+    """End expired chat and user sessions in bounded batches."""
+    from app.services.session_cleanup import cleanup_expired_sessions as cleanup
+    
     try:
-        # Find sessions older than 24 hours
-        cutoff_time = datetime.utcnow() - timedelta(hours=24)
-        expired_sessions = db.query(ChatSession).filter(
-            ChatSession.created_at < cutoff_time,
-            ChatSession.is_active == True
-        ).all()
-        
-        for session in expired_sessions:
-            session.is_active = False
-            session.ended_at = datetime.utcnow()
-        
-        db.commit()
-        
-        logger.info(f"Cleaned up {len(expired_sessions)} expired sessions")
-        return f"Cleaned up {len(expired_sessions)} expired sessions"
-        
+        counts = run_async(cleanup())
+        logger.info(f"Cleaned up expired sessions: {counts}")
+        return f"Cleaned up expired sessions: {counts}"
     except Exception as e:
         logger.error(f"Error cleaning up sessions: {str(e)}")
-        db.rollback()
         raise
-    finally:
-        db.close()
 
 
-@current_task.task
+@celery_app.task
 def send_reminder_emails():
     """Send reminder emails to users."""
     # This would integrate with your email service
@@ -51,21 +39,10 @@ def send_reminder_emails():
     return "Reminder emails sent"
 
 
-@current_task.task
-def process_ai_request_async(user_id: int, request_data: dict):
-    """Process AI request asynchronously."""
-    from app.services.ai_service import ai_service
-    
-    try:
-        # Process the AI request
-        result = ai_service.analyze_symptoms(request_data)
-        
-        # Store result in cache or database
-        # This is a placeholder - implement based on your needs
-        
-        logger.info(f"Processed AI request for user {user_id}")
-        return "AI request processed successfully"
-        
-    except Exception as e:
-        logger.error(f"Error processing AI request: {str(e)}")
-        raise
+@celery_app.task(ignore_result=True, acks_late=True)
+def analyze_symptoms_job(job_id: str):
+    """Run a queued symptom analysis; the result is stored in ``symptom_analyses``."""
+    from app.services.symptom_jobs import run_job
+
+    run_async(run_job(job_id))
+    logger.info(f"Processed symptom analysis job {job_id}")
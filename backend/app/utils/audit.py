@@ -1,12 +1,13 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.audit import AuditLog
 from app.models.user import User
+from app.utils.audit_sink import sql_audit_sink
+from datetime import datetime
 from typing import Optional
-import json
 
 
-def log_audit_event(
-    db: Session,
+async def log_audit_event(
+    db: AsyncSession,
     user: Optional[User],
     action: str,
     resource: str,
@@ -15,19 +16,28 @@ def log_audit_event(
     ip_address: Optional[str] = None,
     user_agent: Optional[str] = None
 ):
-    """Log an audit event to the database."""
-    audit_log = AuditLog(
-        user_id=user.id if user else None,
-        action=action,
-        resource=resource,
-        resource_id=resource_id,
-        details=details,
-        ip_address=ip_address,
-        user_agent=user_agent
-    )
+    """Log an audit event to the database.
+
+    With ``sync`` durability the event is committed on the caller's session;
+    otherwise it is queued and written in batches by the audit sink.
+    """
+    event = {
+        "user_id": user.id if user else None,
+        "action": action,
+        "resource": resource,
+        "resource_id": resource_id,
+        "details": details,
+        "ip_address": ip_address,
+        "user_agent": user_agent
+    }
+    
+    if sql_audit_sink.durability == "sync":
+        db.add(AuditLog(**event))
+        await db.commit()
+        return
     
-    db.add(audit_log)
-    db.commit()
+    event["created_at"] = datetime.utcnow()
+    await sql_audit_sink.submit(event)
 
 
 def get_client_ip(request) -> str:
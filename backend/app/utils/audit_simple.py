@@ -1,7 +1,9 @@
 from fastapi import Request
+from app.utils.audit_sink import mongo_audit_sink
+from datetime import datetime
 from typing import Optional
 
-def log_audit_event(
+async def log_audit_event(
     db=None,
     user=None,
     action: str = "",
@@ -11,8 +13,17 @@ def log_audit_event(
     ip_address: Optional[str] = None,
     user_agent: Optional[str] = None
 ):
-    """Log audit event (simplified - just print for now)."""
-    print(f"Audit: {action} on {resource} by {user.get('id', 'unknown') if user else 'unknown'}")
+    """Queue an audit event for the audit_logs collection."""
+    await mongo_audit_sink.submit({
+        "user_id": user.get("id") if user else None,
+        "action": action,
+        "resource": resource,
+        "resource_id": resource_id,
+        "details": details,
+        "ip_address": ip_address,
+        "user_agent": user_agent,
+        "created_at": datetime.utcnow()
+    })
 
 
 def get_client_ip(request: Request) -> str:
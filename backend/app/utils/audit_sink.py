@@ -0,0 +1,187 @@
+from typing import Awaitable, Callable, Dict, List, Optional
+from sqlalchemy import insert
+from app.config import settings
+from app.database import get_async_mongo, get_async_session_factory
+from app.models.audit import AuditLog
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+AuditWriter = Callable[[List[dict]], Awaitable[None]]
+
+
+async def write_mongo_audit_batch(events: List[dict]):
+    """Insert a batch of audit events into the audit_logs collection."""
+    db = get_async_mongo()
+    await db.audit_logs.insert_many(events, ordered=False)
+
+
+async def write_sql_audit_batch(events: List[dict]):
+    """Insert a batch of audit events into the audit_logs table."""
+    async with get_async_session_factory()() as session:
+        await session.execute(insert(AuditLog), events)
+        await session.commit()
+
+
+class AuditSink:
+    """Buffer audit events in memory and write them in batches.
+
+    A batch is written once ``batch_size`` events are queued or
+    ``flush_interval`` seconds after its first event, whichever comes first.
+    ``durability`` controls what happens on the request path:
+
+    - ``sync``: write the event before returning (no batching)
+    - ``buffered``: queue the event; when the queue is full the caller waits
+      for space, and a failed batch is retried up to ``write_retries`` times
+      with exponential backoff before it is dropped
+    - ``best_effort``: queue the event; when the queue is full or its batch
+      fails it is dropped
+    """
+
+    def __init__(
+        self,
+        writer: AuditWriter,
+        max_size: int = 10000,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        durability: str = "buffered",
+        write_retries: int = 3,
+        retry_backoff: float = 0.5
+    ):
+        self.writer = writer
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.durability = durability
+        self.write_retries = write_retries
+        self.retry_backoff = retry_backoff
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        self.blocked = 0
+        self.failed = 0
+        self.retried = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._loop is not loop:
+            # Queues are bound to the loop that created them
+            self._queue = asyncio.Queue(maxsize=self.max_size)
+            self._worker = None
+            self._loop = loop
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._work())
+
+    async def submit(self, event: dict):
+        """Record an audit event according to the configured durability."""
+        if self.durability == "sync":
+            await self._write([event])
+            return
+
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            if self.durability == "best_effort":
+                self.dropped += 1
+                return
+            self.blocked += 1
+            await self._queue.put(event)
+
+    async def _work(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                # The worker holds a failing batch until it is written or given up,
+                # so buffered callers keep waiting for space meanwhile
+                retries = self.write_retries if self.durability == "buffered" else 0
+                await self._write(batch, retries)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _write(self, batch: List[dict], retries: int = 0):
+        for attempt in range(retries + 1):
+            try:
+                await self.writer(batch)
+            except Exception as e:
+                if attempt < retries:
+                    delay = self.retry_backoff * 2 ** attempt
+                    self.retried += 1
+                    logger.warning(f"Audit write error ({len(batch)} events), retrying in {delay:.2f}s: {str(e)}")
+                    await asyncio.sleep(delay)
+                    continue
+                # Counted once, when the batch is given up; retried attempts are in ``retried``
+                self.failed += len(batch)
+                self.dropped += len(batch)
+                logger.error(f"Audit write error ({len(batch)} events), dropping them: {str(e)}")
+                return
+            self.written += len(batch)
+            self.batches += 1
+            return
+
+    def pending(self) -> int:
+        """Number of events waiting to be written."""
+        return self._queue.qsize() if self._queue else 0
+
+    async def flush(self):
+        """Wait until every queued event has been written."""
+        if self._loop is not asyncio.get_running_loop():
+            return
+        if self._queue is not None and self._worker is not None and not self._worker.done():
+            await self._queue.join()
+
+    async def close(self):
+        """Flush pending events, including retries of failed batches, and stop the worker."""
+        await self.flush()
+        if self._worker is not None and self._loop is asyncio.get_running_loop():
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    def stats(self) -> Dict[str, int]:
+        """Return queue depth, overflow and write failure counters."""
+        return {
+            "pending": self.pending(),
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "blocked": self.blocked,
+            "failed": self.failed,
+            "retried": self.retried,
+        }
+
+
+def _create_sink(writer: AuditWriter) -> AuditSink:
+    return AuditSink(
+        writer,
+        max_size=settings.audit_queue_size,
+        batch_size=settings.audit_batch_size,
+        flush_interval=settings.audit_flush_interval,
+        durability=settings.audit_durability,
+        write_retries=settings.audit_write_retries,
+        retry_backoff=settings.audit_retry_backoff
+    )
+
+
+# Shared sinks for the Mongo-backed and SQL-backed routers
+mongo_audit_sink = _create_sink(write_mongo_audit_batch)
+sql_audit_sink = _create_sink(write_sql_audit_batch)
@@ -0,0 +1,109 @@
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+from app.config import settings
+import logging
+import queue
+import random
+import sys
+import structlog
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Queue log records without formatting them; drop records when full.
+
+    ``QueueHandler.prepare`` would render the message on the calling thread.
+    structlog event dicts are built fresh per call, so the record can be
+    queued as is and rendered by the listener thread.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[DroppingQueueHandler] = None
+
+
+def configure_logging():
+    """Configure structlog to render and write log lines on a background thread."""
+    global _listener, _queue_handler
+
+    structlog.configure(
+        processors=[
+            structlog.stdlib.filter_by_level,
+            structlog.stdlib.add_logger_name,
+            structlog.stdlib.add_log_level,
+            structlog.stdlib.PositionalArgumentsFormatter(),
+            structlog.processors.TimeStamper(fmt="iso"),
+            structlog.processors.StackInfoRenderer(),
+            structlog.processors.format_exc_info,
+            structlog.processors.UnicodeDecoder(),
+            structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
+        ],
+        context_class=dict,
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        wrapper_class=structlog.stdlib.BoundLogger,
+        cache_logger_on_first_use=True,
+    )
+
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(structlog.stdlib.ProcessorFormatter(
+        processors=[
+            structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+            structlog.processors.JSONRenderer(),
+        ],
+        foreign_pre_chain=[
+            structlog.stdlib.add_logger_name,
+            structlog.stdlib.add_log_level,
+            structlog.processors.TimeStamper(fmt="iso"),
+        ],
+    ))
+
+    _queue_handler = DroppingQueueHandler(queue.Queue(maxsize=settings.log_queue_size))
+    root = logging.getLogger()
+    root.addHandler(_queue_handler)
+    root.setLevel(settings.log_level)
+
+    _listener = QueueListener(_queue_handler.queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_logging():
+    """Write out queued log records and stop the background thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def dropped_log_records() -> int:
+    """Number of log records dropped because the queue was full."""
+    return _queue_handler.dropped if _queue_handler else 0
+
+
+def should_log_request(path: str, status_code: int, sample_rates: Optional[Dict[str, float]] = None) -> Optional[float]:
+    """Decide whether to log a request; return the sample rate used, or None to skip.
+
+    Errors are always logged. Successful requests are sampled at the rate
+    configured for their path, falling back to the default rate.
+    """
+    if status_code >= 400:
+        return 1.0
+    rates = settings.request_log_sample_rates if sample_rates is None else sample_rates
+    rate = rates.get(path, settings.request_log_sample_rate)
+    if rate >= 1.0 or random.random() < rate:
+        return rate
+    return None
@@ -0,0 +1,216 @@
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from pymongo import monitoring
+from typing import Callable, Dict, Iterable
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# HTTP
+HTTP_REQUEST_DURATION = Histogram(
+    "healthify_http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route"]
+)
+HTTP_REQUESTS = Counter(
+    "healthify_http_requests_total",
+    "HTTP requests by route template and status code",
+    ["method", "route", "status"]
+)
+HTTP_IN_FLIGHT = Gauge(
+    "healthify_http_requests_in_flight",
+    "HTTP requests currently being served"
+)
+
+# LLM providers
+LLM_REQUEST_DURATION = Histogram(
+    "healthify_llm_request_duration_seconds",
+    "LLM provider call latency",
+    ["provider", "operation"],
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+)
+LLM_ERRORS = Counter(
+    "healthify_llm_errors_total",
+    "LLM provider calls that raised",
+    ["provider", "operation"]
+)
+
+# MongoDB connection pool
+MONGO_POOL_CHECKED_OUT = Gauge(
+    "healthify_mongo_pool_checked_out_connections",
+    "MongoDB connections currently checked out",
+    ["address"]
+)
+MONGO_POOL_CONNECTIONS = Gauge(
+    "healthify_mongo_pool_open_connections",
+    "MongoDB connections currently open",
+    ["address"]
+)
+MONGO_POOL_CHECKOUT_FAILURES = Counter(
+    "healthify_mongo_pool_checkout_failures_total",
+    "MongoDB connection checkouts that failed",
+    ["address", "reason"]
+)
+
+
+class observe_llm:
+    """Context manager recording latency and errors of one LLM provider call."""
+
+    __slots__ = ("provider", "operation", "started")
+
+    def __init__(self, provider: str, operation: str):
+        self.provider = provider
+        self.operation = operation
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        LLM_REQUEST_DURATION.labels(self.provider, self.operation).observe(time.perf_counter() - self.started)
+        if exc_type is not None:
+            LLM_ERRORS.labels(self.provider, self.operation).inc()
+        return False
+
+
+class PrometheusMiddleware:
+    """ASGI middleware recording latency, status and in-flight requests per route template.
+
+    Requests that match no route are labelled ``unmatched`` so that scanners
+    cannot create unbounded label values.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            route = scope.get("route")
+            template = getattr(route, "path", "unmatched")
+            method = scope["method"]
+            HTTP_REQUEST_DURATION.labels(method, template).observe(time.perf_counter() - started)
+            HTTP_REQUESTS.labels(method, template, str(status_code)).inc()
+
+
+class MongoPoolListener(monitoring.ConnectionPoolListener):
+    """Track pymongo/Motor connection pool usage."""
+
+    def __init__(self):
+        # address -> {"open": n, "checked_out": n}
+        self._usage: Dict[str, Dict[str, int]] = {}
+
+    def _adjust(self, address: str, key: str, delta: int):
+        usage = self._usage.setdefault(address, {"open": 0, "checked_out": 0})
+        usage[key] += delta
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Open and checked-out connections per server."""
+        return {address: dict(usage) for address, usage in self._usage.items()}
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        address = self._address(event)
+        self._adjust(address, "open", 1)
+        MONGO_POOL_CONNECTIONS.labels(address).inc()
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        address = self._address(event)
+        self._adjust(address, "open", -1)
+        MONGO_POOL_CONNECTIONS.labels(address).dec()
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        MONGO_POOL_CHECKOUT_FAILURES.labels(self._address(event), str(event.reason)).inc()
+
+    def connection_checked_out(self, event):
+        address = self._address(event)
+        self._adjust(address, "checked_out", 1)
+        MONGO_POOL_CHECKED_OUT.labels(address).inc()
+
+    def connection_checked_in(self, event):
+        address = self._address(event)
+        self._adjust(address, "checked_out", -1)
+        MONGO_POOL_CHECKED_OUT.labels(address).dec()
+
+    @staticmethod
+    def _address(event) -> str:
+        host, port = event.address
+        return f"{host}:{port}"
+
+
+class StatsCollector:
+    """Expose a component's ``stats()`` dict as Prometheus metrics.
+
+    Keys listed in ``counters`` become ``<prefix>_<key>_total`` counters; every
+    other numeric value becomes a ``<prefix>_<key>`` gauge. Values are read at
+    scrape time, so the component pays nothing per request.
+    """
+
+    def __init__(self, prefix: str, stats: Callable[[], Dict[str, float]], counters: Iterable[str] = ()):
+        self.prefix = prefix
+        self.stats = stats
+        self.counters = set(counters)
+
+    def collect(self):
+        try:
+            values = self.stats()
+        except Exception as e:
+            logger.error(f"Metrics collection error for {self.prefix}: {str(e)}")
+            return
+
+        for key, value in values.items():
+            if not isinstance(value, (int, float)):
+                continue
+            name = f"{self.prefix}_{key}"
+            if key in self.counters:
+                yield CounterMetricFamily(name, f"{self.prefix} {key}", value=value)
+            else:
+                yield GaugeMetricFamily(name, f"{self.prefix} {key}", value=value)
+
+
+def register_stats(prefix: str, stats: Callable[[], Dict[str, float]], counters: Iterable[str] = ()):
+    """Register a ``stats()`` callable with the default registry."""
+    REGISTRY.register(StatsCollector(prefix, stats, counters))
+
+
+def render_metrics():
+    """Return the metrics payload and its content type."""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+# Shared listener passed to every MongoDB client
+mongo_pool_listener = MongoPoolListener()
@@ -0,0 +1,109 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# async (items) -> one result or exception per item, in order
+BatchFunc = Callable[[List[Any]], Awaitable[List[Any]]]
+# async (item) -> result
+SingleFunc = Callable[[Any], Awaitable[Any]]
+
+
+class MicroBatcher:
+    """Collect concurrent submissions into batches.
+
+    A batch is sent when ``max_batch_size`` items are waiting or ``window``
+    seconds after its first item arrived, whichever comes first.
+    ``process_batch`` returns one result per item; an item whose result is an
+    exception fails on its own. With ``fallback`` set, a failed batch or
+    failed item is retried through ``process_one``.
+    """
+
+    def __init__(
+        self,
+        process_batch: BatchFunc,
+        process_one: SingleFunc,
+        max_batch_size: int = 8,
+        window: float = 0.05,
+        fallback: bool = True
+    ):
+        self.process_batch = process_batch
+        self.process_one = process_one
+        self.max_batch_size = max_batch_size
+        self.window = window
+        self.fallback = fallback
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+        self.batches = 0
+        self.items = 0
+        self.fallbacks = 0
+        self.failed = 0
+
+    async def submit(self, item: Any) -> Any:
+        """Queue ``item`` for the next batch and wait for its result."""
+        if self.max_batch_size <= 1:
+            return await self.process_one(item)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]):
+        items = [item for item, _ in batch]
+        self.batches += 1
+        self.items += len(items)
+        try:
+            results = await self.process_batch(items)
+            if len(results) != len(items):
+                raise ValueError(f"expected {len(items)} results, got {len(results)}")
+        except Exception as e:
+            logger.warning(f"Batch of {len(items)} failed: {str(e)}")
+            results = [e] * len(items)
+
+        await asyncio.gather(*(
+            self._settle(item, future, result)
+            for (item, future), result in zip(batch, results)
+        ))
+
+    async def _settle(self, item: Any, future: asyncio.Future, result: Any):
+        if isinstance(result, Exception) and self.fallback:
+            self.fallbacks += 1
+            try:
+                result = await self.process_one(item)
+            except Exception as e:
+                result = e
+        if future.done():
+            return
+        if isinstance(result, Exception):
+            self.failed += 1
+            future.set_exception(result)
+        else:
+            future.set_result(result)
+
+    def stats(self) -> Dict[str, float]:
+        """Batch and item counts, fallbacks and the average batch size."""
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "fallbacks": self.fallbacks,
+            "failed": self.failed,
+            "pending": len(self._pending),
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+        }
@@ -0,0 +1,87 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from fastapi import HTTPException, status
+from app.config import settings
+from app.utils.auth_simple import get_password_hash, verify_password
+from typing import Dict, Optional
+import asyncio
+import time
+
+
+class PasswordHasher:
+    """Run bcrypt hashing and verification in a bounded executor.
+
+    bcrypt costs 100-300 ms of CPU per call, so it must not run on the event
+    loop. Jobs beyond ``max_pending`` are shed with a 503 instead of queueing
+    without limit.
+    """
+
+    def __init__(self, mode: str = "thread", workers: int = 4, max_pending: int = 64):
+        self.mode = mode
+        self.workers = workers
+        self.max_pending = max_pending
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_seconds = 0.0
+        self._executor: Optional[Executor] = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.mode == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    async def _submit(self, func, *args):
+        if self.in_flight >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication is busy, please retry shortly",
+                headers={"Retry-After": "1"}
+            )
+
+        self.in_flight += 1
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self.total_seconds += time.perf_counter() - started
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password against its hash."""
+        return await self._submit(verify_password, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        """Hash a password."""
+        return await self._submit(get_password_hash, password)
+
+    def stats(self) -> Dict[str, float]:
+        """Return queue depth and throughput counters."""
+        return {
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "queued": max(0, self.in_flight - self.workers),
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_ms": round(self.total_seconds / self.completed * 1000, 2) if self.completed else 0.0,
+        }
+
+    def shutdown(self):
+        """Stop the executor."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Shared hasher for the auth routers
+password_hasher = PasswordHasher(
+    mode=settings.password_hash_executor,
+    workers=settings.password_hash_workers,
+    max_pending=settings.password_hash_max_pending
+)
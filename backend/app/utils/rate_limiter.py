@@ -1,33 +1,181 @@
 from fastapi import HTTPException, Request, status
+from pymongo import UpdateOne
 from app.database import get_async_mongo
+from app.config import settings
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional, Tuple
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class InMemoryRateLimitBackend:
+    """Per-process token bucket store with LRU eviction of idle client keys."""
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        # key -> (tokens, last_refill)
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def hit(self, key: str, requests: int, window: int) -> bool:
+        """Consume one token for key; return False when the bucket is empty."""
+        now = time.monotonic()
+        refill_rate = requests / window
+        tokens, last_refill = self._buckets.pop(key, (float(requests), now))
+        tokens = min(float(requests), tokens + (now - last_refill) * refill_rate)
+
+        allowed = tokens >= 1.0
+        if allowed:
+            tokens -= 1.0
+
+        self._buckets[key] = (tokens, now)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return allowed
+
+    async def close(self):
+        pass
+
+
+class MongoSyncRateLimitBackend:
+    """Shared limiter that batches per-window counters to Mongo periodically.
+
+    Requests are counted locally and admitted against the last known shared
+    count plus local hits. Pending increments are flushed with a single
+    ``bulk_write`` every ``sync_interval`` seconds instead of per request.
+    Hits being flushed stay counted until the shared counts are reloaded.
+    """
+
+    def __init__(self, max_keys: int = 10000, sync_interval: float = 5.0):
+        self.max_keys = max_keys
+        self.sync_interval = sync_interval
+        # (key, window, window_index) -> hits not yet written to Mongo
+        self._pending: Dict[Tuple[str, int, int], int] = {}
+        # (key, window, window_index) -> hits being written by a running sync
+        self._in_flight: Dict[Tuple[str, int, int], int] = {}
+        # (key, window, window_index) -> shared count as of the last sync
+        self._shared: "OrderedDict[Tuple[str, int, int], int]" = OrderedDict()
+        self._last_sync = time.monotonic()
+        self._sync_task: Optional[asyncio.Task] = None
+
+    async def hit(self, key: str, requests: int, window: int) -> bool:
+        """Count a hit for key and check it against the shared window count."""
+        slot = (key, window, int(time.time() // window))
+
+        count = self._shared.get(slot, 0) + self._in_flight.get(slot, 0) + self._pending.get(slot, 0)
+        if count >= requests:
+            allowed = False
+        else:
+            self._pending[slot] = self._pending.get(slot, 0) + 1
+            allowed = True
+
+        self._maybe_schedule_sync()
+        return allowed
+
+    def _maybe_schedule_sync(self):
+        if time.monotonic() - self._last_sync < self.sync_interval:
+            return
+        if self._sync_task and not self._sync_task.done():
+            return
+        self._last_sync = time.monotonic()
+        self._sync_task = asyncio.create_task(self.sync())
+
+    async def sync(self):
+        """Flush pending counters to Mongo and refresh shared counts."""
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        self._add(self._in_flight, pending, 1)
+
+        db = get_async_mongo()
+        operations = []
+        for (key, window, window_index), hits in pending.items():
+            expires_at = datetime.utcfromtimestamp((window_index + 1) * window) + timedelta(seconds=window)
+            operations.append(UpdateOne(
+                {"_id": f"{key}:{window_index}"},
+                {"$inc": {"count": hits}, "$setOnInsert": {"key": key, "expires_at": expires_at}},
+                upsert=True
+            ))
+
+        try:
+            await db.rate_limits.bulk_write(operations, ordered=False)
+        except Exception as e:
+            logger.error(f"Rate limit sync error: {str(e)}")
+            # Keep the hits so the next sync retries them
+            self._add(self._in_flight, pending, -1)
+            self._add(self._pending, pending, 1)
+            return
+
+        ids = {f"{key}:{window_index}": (key, window, window_index) for key, window, window_index in pending}
+        try:
+            shared = {}
+            async for doc in db.rate_limits.find({"_id": {"$in": list(ids)}}, {"count": 1}):
+                shared[ids[doc["_id"]]] = doc["count"]
+        except Exception as e:
+            logger.error(f"Rate limit refresh error: {str(e)}")
+            # The hits are written; count them locally until the next refresh
+            shared = {slot: self._shared.get(slot, 0) + hits for slot, hits in pending.items()}
+        for slot, count in shared.items():
+            self._shared.pop(slot, None)
+            self._shared[slot] = count
+        self._add(self._in_flight, pending, -1)
+
+        # Drop counters for windows that have already closed
+        now = time.time()
+        for slot in [s for s in self._shared if s[2] < int(now // s[1])]:
+            del self._shared[slot]
+        while len(self._shared) > self.max_keys:
+            self._shared.popitem(last=False)
+
+    async def close(self):
+        """Wait for a running sync, then flush the remaining hits."""
+        if self._sync_task and not self._sync_task.done():
+            await self._sync_task
+        await self.sync()
+
+    @staticmethod
+    def _add(counts: Dict[Tuple[str, int, int], int], hits: Dict[Tuple[str, int, int], int], sign: int):
+        for slot, value in hits.items():
+            total = counts.get(slot, 0) + sign * value
+            if total > 0:
+                counts[slot] = total
+            else:
+                counts.pop(slot, None)
+
+
+def create_backend(name: Optional[str] = None):
+    """Create a rate limit backend from settings."""
+    name = name or settings.rate_limit_backend
+    if name == "mongo":
+        return MongoSyncRateLimitBackend(
+            max_keys=settings.rate_limit_max_keys,
+            sync_interval=settings.rate_limit_sync_interval
+        )
+    return InMemoryRateLimitBackend(max_keys=settings.rate_limit_max_keys)
 
 
 class RateLimiter:
-    def __init__(self, requests: int = 100, window: int = 60):
+    def __init__(self, requests: int = 100, window: int = 60, backend=None):
         self.requests = requests
         self.window = window
-    
+        self.backend = backend or create_backend()
+
     async def __call__(self, request: Request):
-        db = get_async_mongo()
-        client_ip = request.client.host
-        key = f"rate_limit:{client_ip}"
-        now = datetime.utcnow()
-        window_start = now - timedelta(seconds=self.window)
-        # Remove old entries
-        await db.rate_limits.delete_many({"key": key, "timestamp": {"$lt": window_start}})
-        # Count requests in window
-        count = await db.rate_limits.count_documents({"key": key, "timestamp": {"$gte": window_start}})
-        if count >= self.requests:
+        client_ip = request.client.host if request.client else "unknown"
+        key = f"rate_limit:{self.requests}:{self.window}:{client_ip}"
+        if not await self.backend.hit(key, self.requests, self.window):
             raise HTTPException(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                 detail="Rate limit exceeded"
             )
-        # Insert new request
-        await db.rate_limits.insert_one({"key": key, "timestamp": now})
         return True
 
+    async def close(self):
+        await self.backend.close()
+
 
 # Rate limiter instances
 rate_limiter = RateLimiter(requests=100, window=60)
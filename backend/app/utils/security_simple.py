@@ -1,14 +1,15 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.utils.auth_simple import verify_token
+from app.utils.token_cache import token_cache
 
 security = HTTPBearer()
 
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Get current user from token (simplified)."""
+def authenticate_token(token: str):
+    """Resolve a bearer token to the current user (simplified)."""
     try:
-        payload = verify_token(credentials.credentials)
+        payload = token_cache.get_claims(token, verify_token)
         user_id = payload.get("sub")
         if user_id is None:
             raise HTTPException(
@@ -25,6 +26,11 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
         )
 
 
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Get current user from token (simplified)."""
+    return authenticate_token(credentials.credentials)
+
+
 def get_current_active_user(current_user = Depends(get_current_user)):
     """Get current active user (simplified)."""
     return current_user
@@ -1,15 +1,50 @@
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional, Dict
+from typing import Optional, Dict, Tuple
+from pymongo import UpdateOne
+from app.config import settings
 from app.database_manager import db_manager
+import asyncio
+import time
 import uuid
 import structlog
 
 logger = structlog.get_logger()
 
 class SessionManager:
-    def __init__(self):
+    """User sessions in MongoDB.
+    
+    Validated sessions are cached for ``cache_ttl`` seconds, so another
+    worker may accept a session for up to that long after it was ended.
+    ``last_active`` is only advanced when it is ``activity_granularity``
+    seconds old; these touches are buffered and written with one
+    ``bulk_write`` every ``flush_interval`` seconds.
+    """
+    
+    def __init__(
+        self,
+        cache_ttl: float = 30.0,
+        cache_max_size: int = 10000,
+        activity_granularity: float = 60.0,
+        flush_interval: float = 5.0
+    ):
         self.collection_name = "user_sessions"
-        self.db = db_manager.get_async_db()
+        self.cache_ttl = cache_ttl
+        self.cache_max_size = cache_max_size
+        self.activity_granularity = activity_granularity
+        self.flush_interval = flush_interval
+        # session_id -> (session, cached at)
+        self._cache: "OrderedDict[str, Tuple[Dict, float]]" = OrderedDict()
+        # session_id -> last_active to write
+        self._pending_touches: Dict[str, datetime] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.touches_written = 0
+    
+    @property
+    def db(self):
+        return db_manager.get_async_db()
         
     async def create_session(self, user_id: str, device_info: Dict) -> str:
         """Create a new session for a user."""
@@ -28,31 +63,95 @@ class SessionManager:
         return session_id
     
     async def validate_session(self, session_id: str) -> Optional[Dict]:
-        """Validate and update a session."""
-        session = await self.db[self.collection_name].find_one({
-            "_id": session_id,
-            "is_active": True,
-            "expires_at": {"$gt": datetime.utcnow()}
-        })
+        """Validate a session and record activity on it."""
+        now = datetime.utcnow()
+        entry = self._cache.get(session_id)
+        if entry is not None and time.monotonic() - entry[1] < self.cache_ttl and entry[0]["expires_at"] > now:
+            self._cache.move_to_end(session_id)
+            self.cache_hits += 1
+            session = entry[0]
+        else:
+            self.cache_misses += 1
+            self._cache.pop(session_id, None)
+            session = await self.db[self.collection_name].find_one({
+                "_id": session_id,
+                "is_active": True,
+                "expires_at": {"$gt": now}
+            })
+            if not session:
+                return None
+            self._cache_session(session)
         
-        if session:
-            await self.update_last_active(session_id)
-            return session
-        return None
+        self._touch(session, now)
+        return dict(session)
+    
+    def _cache_session(self, session: Dict):
+        if self.cache_ttl <= 0 or self.cache_max_size <= 0:
+            return
+        self._cache[session["_id"]] = (session, time.monotonic())
+        self._cache.move_to_end(session["_id"])
+        while len(self._cache) > self.cache_max_size:
+            self._cache.popitem(last=False)
+    
+    def _touch(self, session: Dict, now: datetime):
+        """Queue a ``last_active`` write if the stored value is older than the granularity."""
+        last_active = session.get("last_active")
+        if last_active is not None and (now - last_active).total_seconds() < self.activity_granularity:
+            return
+        session["last_active"] = now
+        self._pending_touches[session["_id"]] = now
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+    
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        await self.flush_activity()
+    
+    async def flush_activity(self):
+        """Write buffered ``last_active`` updates in one bulk write."""
+        touches, self._pending_touches = self._pending_touches, {}
+        if not touches:
+            return
+        try:
+            await self.db[self.collection_name].bulk_write(
+                [UpdateOne({"_id": session_id}, {"$max": {"last_active": last_active}})
+                 for session_id, last_active in touches.items()],
+                ordered=False
+            )
+            self.touches_written += len(touches)
+        except Exception as e:
+            logger.error("Session activity flush failed", error=str(e), sessions=len(touches))
+    
+    async def close(self):
+        """Write pending activity and stop the flush timer."""
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+        self._flush_task = None
+        await self.flush_activity()
+    
+    def _invalidate(self, session_id: str):
+        self._cache.pop(session_id, None)
+        self._pending_touches.pop(session_id, None)
     
     async def update_last_active(self, session_id: str):
         """Update the last active timestamp of a session."""
+        now = datetime.utcnow()
+        entry = self._cache.get(session_id)
+        if entry is not None:
+            entry[0]["last_active"] = now
+        self._pending_touches.pop(session_id, None)
         await self.db[self.collection_name].update_one(
             {"_id": session_id},
             {
                 "$set": {
-                    "last_active": datetime.utcnow()
+                    "last_active": now
                 }
             }
         )
     
     async def end_session(self, session_id: str):
         """End a user session."""
+        self._invalidate(session_id)
         await self.db[self.collection_name].update_one(
             {"_id": session_id},
             {
@@ -71,6 +170,10 @@ class SessionManager:
         }
         if except_session_id:
             query["_id"] = {"$ne": except_session_id}
+        
+        for session_id, (session, _) in list(self._cache.items()):
+            if session["user_id"] == user_id and session_id != except_session_id:
+                self._invalidate(session_id)
             
         await self.db[self.collection_name].update_many(
             query,
@@ -90,5 +193,20 @@ class SessionManager:
             "expires_at": {"$gt": datetime.utcnow()}
         }).to_list(None)
 
+    def stats(self) -> Dict[str, int]:
+        """Cache hit/miss counts and buffered activity writes."""
+        return {
+            "cache_size": len(self._cache),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "pending_touches": len(self._pending_touches),
+            "touches_written": self.touches_written
+        }
+
 # Create global instance
-session_manager = SessionManager()
\ No newline at end of file
+session_manager = SessionManager(
+    cache_ttl=settings.session_cache_ttl,
+    cache_max_size=settings.session_cache_max_size,
+    activity_granularity=settings.session_activity_granularity,
+    flush_interval=settings.session_activity_flush_interval
+)
\ No newline at end of file
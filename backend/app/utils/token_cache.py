@@ -0,0 +1,148 @@
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from app.config import settings
+from app.database import get_async_mongo
+import asyncio
+import hashlib
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def token_digest(token: str) -> str:
+    """Digest used to key tokens without keeping the raw token in memory."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class TokenCache:
+    """Bounded cache of verified JWT claims, keyed by token digest.
+
+    Entries expire at the token's ``exp`` claim. Revoked tokens are recorded
+    locally and in the ``revoked_tokens`` collection; other workers pick up
+    revocations every ``sync_interval`` seconds.
+    """
+
+    def __init__(self, max_size: int = 10000, sync_interval: float = 10.0):
+        self.max_size = max_size
+        self.sync_interval = sync_interval
+        # digest -> (claims, exp timestamp)
+        self._entries: "OrderedDict[str, Tuple[dict, float]]" = OrderedDict()
+        # digest -> exp timestamp
+        self._revoked: Dict[str, float] = {}
+        self._last_sync: Optional[datetime] = None
+        self._last_sync_check = 0.0
+        self._sync_task: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+        self.decodes = 0
+        self.decode_seconds = 0.0
+
+    def get_claims(self, token: str, decode) -> dict:
+        """Return verified claims for token, calling ``decode`` on a cache miss.
+
+        Raises ValueError for revoked tokens; errors from ``decode`` propagate.
+        """
+        self._maybe_schedule_sync()
+        digest = token_digest(token)
+        now = time.time()
+
+        revoked_until = self._revoked.get(digest)
+        if revoked_until is not None:
+            if revoked_until > now:
+                raise ValueError("Token revoked")
+            del self._revoked[digest]
+
+        entry = self._entries.get(digest)
+        if entry is not None and entry[1] > now:
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        started = time.perf_counter()
+        try:
+            claims = decode(token)
+        finally:
+            self.decodes += 1
+            self.decode_seconds += time.perf_counter() - started
+
+        exp = claims.get("exp")
+        if exp is not None and self.max_size > 0:
+            self._entries[digest] = (claims, float(exp))
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return claims
+
+    async def revoke(self, token: str, exp: Optional[float] = None):
+        """Revoke a token until it expires, in this worker and for the others."""
+        digest = token_digest(token)
+        expires = exp or time.time() + settings.access_token_expire_minutes * 60
+        self._revoked[digest] = expires
+        self._entries.pop(digest, None)
+
+        try:
+            db = get_async_mongo()
+            await db.revoked_tokens.update_one(
+                {"_id": digest},
+                {"$set": {"expires_at": datetime.utcfromtimestamp(expires), "revoked_at": datetime.utcnow()}},
+                upsert=True
+            )
+        except Exception as e:
+            logger.error(f"Token revocation persist error: {str(e)}")
+
+    def _maybe_schedule_sync(self):
+        now = time.monotonic()
+        if now - self._last_sync_check < self.sync_interval:
+            return
+        if self._sync_task and not self._sync_task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._last_sync_check = now
+        self._sync_task = loop.create_task(self.sync_revocations())
+
+    async def sync_revocations(self):
+        """Load revocations recorded by other workers since the last sync."""
+        query = {"expires_at": {"$gt": datetime.utcnow()}}
+        if self._last_sync is not None:
+            query["revoked_at"] = {"$gte": self._last_sync}
+        synced_at = datetime.utcnow()
+
+        try:
+            db = get_async_mongo()
+            async for doc in db.revoked_tokens.find(query, {"expires_at": 1}):
+                self._revoked[doc["_id"]] = (doc["expires_at"] - datetime(1970, 1, 1)).total_seconds()
+                self._entries.pop(doc["_id"], None)
+            self._last_sync = synced_at
+        except Exception as e:
+            logger.error(f"Token revocation sync error: {str(e)}")
+            return
+
+        now = time.time()
+        for digest in [d for d, exp in self._revoked.items() if exp <= now]:
+            del self._revoked[digest]
+
+    def stats(self) -> Dict[str, float]:
+        """Return cache hit rate and decode time metrics."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "decodes": self.decodes,
+            "avg_decode_ms": round(self.decode_seconds / self.decodes * 1000, 3) if self.decodes else 0.0,
+            "revoked": len(self._revoked),
+        }
+
+
+# Shared cache for request authentication
+token_cache = TokenCache(
+    max_size=settings.token_cache_max_size,
+    sync_interval=settings.token_revocation_sync_interval
+)
@@ -0,0 +1,75 @@
+from typing import Optional
+from app.config import settings
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindQueue:
+    """Run non-critical writes on a background worker, off the request path.
+
+    Writes are executed one at a time in submission order. When the queue is
+    full the write runs inline, so callers slow down instead of losing data.
+    """
+
+    def __init__(self, max_size: int = 1000):
+        self.max_size = max_size
+        self.inline_writes = 0
+        self.failed_writes = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    def _ensure_worker(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_size)
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._work())
+
+    async def submit(self, func, *args, **kwargs):
+        """Schedule ``await func(*args, **kwargs)`` to run in the background."""
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait((func, args, kwargs))
+        except asyncio.QueueFull:
+            self.inline_writes += 1
+            await self._run(func, args, kwargs)
+
+    async def _work(self):
+        while True:
+            func, args, kwargs = await self._queue.get()
+            try:
+                await self._run(func, args, kwargs)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, func, args, kwargs):
+        try:
+            await func(*args, **kwargs)
+        except Exception as e:
+            self.failed_writes += 1
+            logger.error(f"Write-behind error in {getattr(func, '__name__', func)}: {str(e)}")
+
+    def pending(self) -> int:
+        """Number of writes waiting to run."""
+        return self._queue.qsize() if self._queue else 0
+
+    async def flush(self):
+        """Wait until every queued write has run."""
+        if self._queue is not None and self._worker is not None and not self._worker.done():
+            await self._queue.join()
+
+    async def close(self):
+        """Flush pending writes and stop the worker."""
+        await self.flush()
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+
+# Shared queue for chat message persistence
+write_behind_queue = WriteBehindQueue(max_size=settings.chat_write_behind_queue_size)
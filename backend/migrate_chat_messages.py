@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Chat history migration script for Healthify backend.
+This script moves messages embedded in chat_sessions documents into the
+chat_messages collection, one document per message.
+
+The migration is idempotent: message documents get deterministic ObjectIds,
+so an interrupted run can simply be started again.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import logging
+from bson import ObjectId
+from pymongo import ReplaceOne
+from app.database import close_mongo_clients, get_async_mongo
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def message_object_id(session_id: str, index: int, created_at) -> ObjectId:
+    """Deterministic ObjectId for an embedded message.
+
+    Like a generated id it starts with the creation time, so it sorts
+    alongside new messages; the session hash and message index that follow
+    keep messages with the same timestamp in their original order.
+    """
+    timestamp = ObjectId.from_datetime(created_at).binary[:4] if created_at else bytes(4)
+    session_hash = hashlib.sha1(session_id.encode()).digest()[:5]
+    return ObjectId(timestamp + session_hash + index.to_bytes(3, "big"))
+
+
+async def migrate_chat_messages(batch_size: int = 100):
+    """Move embedded session messages into the chat_messages collection."""
+    try:
+        db = get_async_mongo()
+        await db.chat_messages.create_index([("session_id", 1), ("created_at", 1)])
+
+        migrated_sessions = 0
+        migrated_messages = 0
+        query = {"messages.0": {"$exists": True}}
+
+        while True:
+            sessions = await db.chat_sessions.find(query).limit(batch_size).to_list(length=batch_size)
+            if not sessions:
+                break
+
+            for session in sessions:
+                session_id = session.get("session_id") or str(session["_id"])
+                operations = []
+                for index, message in enumerate(session["messages"]):
+                    created_at = message.get("timestamp") or session.get("created_at")
+                    doc = {
+                        "_id": message_object_id(session_id, index, created_at),
+                        "session_id": session_id,
+                        "role": message.get("role"),
+                        "content": message.get("content"),
+                        "created_at": created_at,
+                        "user_id": message.get("user_id", session.get("user_id"))
+                    }
+                    operations.append(ReplaceOne({"_id": doc["_id"]}, doc, upsert=True))
+
+                await db.chat_messages.bulk_write(operations, ordered=False)
+                # $inc keeps messages counted by the live app since the session was created
+                await db.chat_sessions.update_one(
+                    {"_id": session["_id"]},
+                    {
+                        "$set": {"session_id": session_id},
+                        "$inc": {"message_count": len(operations)},
+                        "$unset": {"messages": ""}
+                    }
+                )
+                migrated_sessions += 1
+                migrated_messages += len(operations)
+
+            logger.info(f"Migrated {migrated_sessions} sessions ({migrated_messages} messages) so far")
+
+        # Drop empty embedded arrays left by sessions that never had messages
+        await db.chat_sessions.update_many({"messages": {"$size": 0}}, {"$unset": {"messages": ""}})
+
+        logger.info(f"Migration completed: {migrated_sessions} sessions, {migrated_messages} messages")
+    finally:
+        close_mongo_clients()
+
+
+async def main():
+    """Main function to run the migration."""
+    parser = argparse.ArgumentParser(description="Move embedded chat messages into chat_messages")
+    parser.add_argument("--batch-size", type=int, default=100, help="Sessions processed per batch")
+    args = parser.parse_args()
+    await migrate_chat_messages(batch_size=args.batch_size)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
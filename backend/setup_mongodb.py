@@ -6,8 +6,8 @@ This script creates the necessary collections and indexes for the application.
 
 import asyncio
 import logging
-from motor.motor_asyncio import AsyncIOMotorClient
 from app.config import settings
+from app.database import close_mongo_clients, get_async_mongo_client
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -17,7 +17,7 @@ async def setup_mongodb():
     """Set up MongoDB collections and indexes."""
     try:
         # Connect to MongoDB
-        client = AsyncIOMotorClient(settings.mongo_url)
+        client = get_async_mongo_client()
         db = client[settings.mongo_database]
         
         # Test connection
@@ -101,7 +101,11 @@ async def setup_mongodb():
         
         # Create compound indexes for better query performance
         compound_indexes = [
+            ("chat_messages", [("session_id", 1), ("created_at", 1)]),
+            ("chat_sessions", [("user_id", 1), ("created_at", -1), ("_id", -1)]),
             ("chat_sessions", [("user_id", 1), ("is_active", 1)]),
+            ("chat_sessions", [("is_active", 1), ("created_at", 1)]),
+            ("user_sessions", [("is_active", 1), ("expires_at", 1)]),
             ("symptom_analyses", [("user_id", 1), ("status", 1)]),
             ("audit_logs", [("user_id", 1), ("action", 1), ("created_at", -1)]),
             ("appointments", [("patient_id", 1), ("appointment_date", 1)]),
@@ -120,7 +124,7 @@ async def setup_mongodb():
         logger.error(f"MongoDB setup failed: {str(e)}")
         raise
     finally:
-        client.close()
+        close_mongo_clients()
 
 
 async def main():
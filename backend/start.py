@@ -4,6 +4,7 @@ Startup script for Healthify backend with MongoDB.
 This script sets up MongoDB and starts the FastAPI server.
 """
 
+import argparse
 import asyncio
 import subprocess
 import sys
@@ -23,12 +24,38 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def report_import_times(module: str = "app.main", limit: int = 25):
+    """Print the slowest imports of a module, as measured by python -X importtime."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=str(backend_dir),
+        capture_output=True,
+        text=True
+    )
+    
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        timings.append((int(cumulative_us), int(self_us), name.strip()))
+    
+    if result.returncode != 0:
+        logger.error(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    
+    timings.sort(reverse=True)
+    total_ms = sum(self_us for _, self_us, _ in timings) / 1000
+    print(f"Importing {module} took {total_ms:.1f} ms across {len(timings)} modules")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for cumulative_us, self_us, name in timings[:limit]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {name}")
+
+
 async def check_mongodb_connection():
     """Check if MongoDB is running and accessible."""
     try:
-        from motor.motor_asyncio import AsyncIOMotorClient
-        client = AsyncIOMotorClient(settings.mongo_url)
-        await client.admin.command('ping')
+        from app.database import get_async_mongo_client
+        await get_async_mongo_client().admin.command('ping')
         logger.info("MongoDB connection successful")
         return True
     except Exception as e:
@@ -89,4 +116,18 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Set up MongoDB and start the Healthify API")
+    parser.add_argument(
+        "--import-times",
+        nargs="?",
+        const=25,
+        type=int,
+        metavar="N",
+        help="Report the N slowest imports of app.main and exit"
+    )
+    args = parser.parse_args()
+    
+    if args.import_times is not None:
+        report_import_times(limit=args.import_times)
+    else:
+        asyncio.run(main())
@@ -25,7 +25,8 @@ def test_imports():
         from app.main import app
         print("+ App imported successfully")
         
-        from app.services.mcp_chatbot import mcp_chatbot
+        from app.services.mcp_chatbot import get_mcp_chatbot
+        get_mcp_chatbot()
         print("+ MCP chatbot imported successfully")
         
         from app.config import settings
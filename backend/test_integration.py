@@ -14,7 +14,7 @@ backend_dir = Path(__file__).parent
 sys.path.insert(0, str(backend_dir))
 
 from app.database import get_async_mongo, get_async_mongo_collection
-from app.services.mcp_chatbot import mcp_chatbot
+from app.services.mcp_chatbot import get_mcp_chatbot
 from app.services.cache_service import cache_service
 from app.config import settings
 
@@ -83,7 +83,7 @@ async def test_mcp_chatbot():
         test_message = "I have a headache and feel dizzy"
         user_id = "test_user_123"
         
-        response = await mcp_chatbot.process_chat_message(
+        response = await get_mcp_chatbot().process_chat_message(
             message=test_message,
             user_id=user_id
         )
@@ -110,7 +110,7 @@ async def test_symptom_analysis():
             "current_medications": []
         }
         
-        analysis = await mcp_chatbot.analyze_symptoms(symptoms_data, "test_user_123")
+        analysis = await get_mcp_chatbot().analyze_symptoms(symptoms_data, "test_user_123")
         
         print(f"✅ Symptom analysis completed")
         print(f"   - Conditions found: {len(analysis.conditions)}")
@@ -1,49 +1,51 @@
+import asyncio
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
 from app.main import app
-from app.database import get_db, Base
+from app.database import get_db, get_async_database_url, Base
 from app.config import settings
 from app.utils.auth import create_tokens
+from app.utils.audit_sink import sql_audit_sink
 
 # Create test database
-SQLALCHEMY_DATABASE_URL = settings.test_database_url
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SQLALCHEMY_DATABASE_URL = get_async_database_url(settings.test_database_url)
+engine = create_async_engine(SQLALCHEMY_DATABASE_URL, poolclass=NullPool)
+TestingSessionLocal = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
 
+# Commit audit events on the request session so they land in the test database
+sql_audit_sink.durability = "sync"
 
-@pytest.fixture(scope="session")
+
+@pytest.fixture(scope="function")
 def db_engine():
-    """Create test database engine."""
-    engine = create_engine(SQLALCHEMY_DATABASE_URL)
-    Base.metadata.create_all(bind=engine)
+    """Create test database tables for one test."""
+    async def create_all():
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+    
+    async def drop_all():
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.drop_all)
+    
+    asyncio.run(create_all())
     yield engine
-    Base.metadata.drop_all(bind=engine)
+    asyncio.run(drop_all())
 
 
 @pytest.fixture(scope="function")
 def db_session(db_engine):
-    """Create test database session."""
-    connection = db_engine.connect()
-    transaction = connection.begin()
-    session = TestingSessionLocal(bind=connection)
-    
-    yield session
-    
-    session.close()
-    transaction.rollback()
-    connection.close()
+    """Create test database session factory."""
+    yield TestingSessionLocal
 
 
 @pytest.fixture(scope="function")
 def client(db_session):
     """Create test client."""
-    def override_get_db():
-        try:
-            yield db_session
-        finally:
-            pass
+    async def override_get_db():
+        async with db_session() as session:
+            yield session
     
     app.dependency_overrides[get_db] = override_get_db
     yield TestClient(app)
@@ -0,0 +1,109 @@
+import asyncio
+import pytest
+from app.utils.audit_sink import AuditSink
+
+
+class RecordingWriter:
+    def __init__(self):
+        self.batches = []
+
+    async def __call__(self, events):
+        self.batches.append(list(events))
+
+
+@pytest.mark.asyncio
+async def test_events_are_written_in_batches():
+    """Test that queued events are flushed once batch_size is reached."""
+    writer = RecordingWriter()
+    sink = AuditSink(writer, batch_size=3, flush_interval=10)
+
+    for i in range(6):
+        await sink.submit({"action": f"event-{i}"})
+    await sink.flush()
+
+    assert [len(batch) for batch in writer.batches] == [3, 3]
+    assert sink.stats()["written"] == 6
+    await sink.close()
+
+
+@pytest.mark.asyncio
+async def test_partial_batch_is_flushed_on_interval():
+    """Test that a partial batch is written after flush_interval."""
+    writer = RecordingWriter()
+    sink = AuditSink(writer, batch_size=100, flush_interval=0.05)
+
+    await sink.submit({"action": "login"})
+    await asyncio.sleep(0.2)
+
+    assert writer.batches == [[{"action": "login"}]]
+    await sink.close()
+
+
+@pytest.mark.asyncio
+async def test_best_effort_sink_drops_on_overflow():
+    """Test that a full best-effort queue drops events and counts them."""
+    writer = RecordingWriter()
+    sink = AuditSink(writer, max_size=2, batch_size=10, flush_interval=10, durability="best_effort")
+
+    for i in range(5):
+        await sink.submit({"action": f"event-{i}"})
+
+    assert sink.stats()["dropped"] == 3
+    await sink.close()
+    assert sum(len(batch) for batch in writer.batches) == 2
+
+
+@pytest.mark.asyncio
+async def test_sync_sink_writes_inline():
+    """Test that sync durability writes before submit returns."""
+    writer = RecordingWriter()
+    sink = AuditSink(writer, durability="sync")
+
+    await sink.submit({"action": "delete"})
+    assert writer.batches == [[{"action": "delete"}]]
+
+
+class FlakyWriter(RecordingWriter):
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+
+    async def __call__(self, events):
+        if self.failures > 0:
+            self.failures -= 1
+            raise RuntimeError("database unavailable")
+        await super().__call__(events)
+
+
+@pytest.mark.asyncio
+async def test_buffered_sink_retries_failed_batch():
+    """Test that a failed batch is retried with backoff instead of being dropped."""
+    writer = FlakyWriter(failures=2)
+    sink = AuditSink(writer, batch_size=2, flush_interval=10, write_retries=3, retry_backoff=0.01)
+
+    await sink.submit({"action": "a"})
+    await sink.submit({"action": "b"})
+    await sink.close()
+
+    assert writer.batches == [[{"action": "a"}, {"action": "b"}]]
+    stats = sink.stats()
+    assert stats["retried"] == 2
+    assert stats["written"] == 2
+    assert stats["failed"] == 0
+    assert stats["dropped"] == 0
+
+
+@pytest.mark.asyncio
+async def test_buffered_sink_drops_batch_after_retries():
+    """Test that a batch is only counted as dropped once its retries are exhausted."""
+    writer = FlakyWriter(failures=10)
+    sink = AuditSink(writer, batch_size=100, flush_interval=0.01, write_retries=2, retry_backoff=0.01)
+
+    await sink.submit({"action": "a"})
+    await sink.close()
+
+    stats = sink.stats()
+    assert stats["retried"] == 2
+    assert stats["failed"] == 1
+    assert stats["dropped"] == 1
+    assert writer.batches == []
@@ -1,5 +1,12 @@
 import pytest
+from types import SimpleNamespace
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
+from app.api import auth_simple
+from app.utils import security_simple
+from app.utils import token_cache as token_cache_module
+from app.utils.auth_simple import create_tokens
+from app.utils.token_cache import TokenCache
 
 
 def test_register_user(client, test_user_data):
@@ -94,3 +101,71 @@ def test_logout(client, auth_headers):
     response = client.post("/auth/logout", headers=auth_headers)
     assert response.status_code == 200
     assert "Successfully logged out" in response.json()["message"]
+
+
+class FakeCollection:
+    def __init__(self, docs=()):
+        self.docs = {doc["_id"]: doc for doc in docs}
+
+    async def find_one(self, query):
+        return self.docs.get(query["_id"])
+
+    async def update_one(self, query, update, upsert=False):
+        self.docs[query["_id"]] = update["$set"]
+
+
+@pytest.fixture
+def auth_client(monkeypatch):
+    """Client for the auth router alone, with a fresh token cache and in-memory collections."""
+    users = FakeCollection([
+        {"_id": "user-1", "email": "test@example.com", "is_active": True},
+        {"_id": "user-2", "email": "other@example.com", "is_active": True}
+    ])
+    revoked_tokens = FakeCollection()
+    cache = TokenCache(max_size=10, sync_interval=3600)
+    monkeypatch.setattr(auth_simple, "get_async_mongo_collection", lambda name: users)
+    monkeypatch.setattr(token_cache_module, "get_async_mongo", lambda: SimpleNamespace(revoked_tokens=revoked_tokens))
+    monkeypatch.setattr(auth_simple, "token_cache", cache)
+    monkeypatch.setattr(security_simple, "token_cache", cache)
+
+    app = FastAPI()
+    app.include_router(auth_simple.router)
+    return TestClient(app)
+
+
+def test_logout_revokes_refresh_token(auth_client):
+    """Test that a refresh token passed to logout can no longer be used."""
+    access_token, refresh_token = create_tokens("user-1", "test@example.com")
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    response = auth_client.post("/auth/logout", json={"refresh_token": refresh_token}, headers=headers)
+    assert response.status_code == 200
+
+    response = auth_client.post("/auth/refresh", params={"refresh_token": refresh_token})
+    assert response.status_code == 401
+    response = auth_client.post("/auth/logout", headers=headers)
+    assert response.status_code == 401
+
+
+def test_logout_rejects_foreign_refresh_token(auth_client):
+    """Test that logout only revokes the caller's own refresh token."""
+    access_token, _ = create_tokens("user-1", "test@example.com")
+    _, other_refresh_token = create_tokens("user-2", "other@example.com")
+
+    response = auth_client.post(
+        "/auth/logout",
+        json={"refresh_token": other_refresh_token},
+        headers={"Authorization": f"Bearer {access_token}"}
+    )
+    assert response.status_code == 400
+
+    response = auth_client.post("/auth/refresh", params={"refresh_token": other_refresh_token})
+    assert response.status_code == 200
+
+
+def test_refresh_rejects_access_token(auth_client):
+    """Test that only refresh tokens are accepted by the refresh endpoint."""
+    access_token, refresh_token = create_tokens("user-1", "test@example.com")
+
+    assert auth_client.post("/auth/refresh", params={"refresh_token": access_token}).status_code == 401
+    assert auth_client.post("/auth/refresh", params={"refresh_token": refresh_token}).status_code == 200
@@ -0,0 +1,96 @@
+import asyncio
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.services.cache_service import CacheService, LocalCache
+
+
+def test_local_cache_lru_eviction():
+    """Test that the least recently used entry is evicted first."""
+    cache = LocalCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_local_cache_ttl_expiry():
+    """Test that expired entries are treated as misses."""
+    cache = LocalCache(max_size=2)
+    with patch("app.services.cache_service.time.monotonic", return_value=100.0):
+        cache.set("a", 1, ttl=10)
+    with patch("app.services.cache_service.time.monotonic", return_value=111.0):
+        assert cache.get("a") is None
+    assert cache.misses == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_service_serves_repeat_reads_from_l1():
+    """Test that a second get does not hit Mongo."""
+    db = MagicMock()
+    db.cache.update_one = AsyncMock()
+    db.cache.find_one = AsyncMock(return_value=None)
+    db.cache.delete_one = AsyncMock()
+    service = CacheService(l1_max_size=8)
+
+    with patch("app.services.cache_service.get_async_mongo", return_value=db):
+        await service.set("services:active", [{"id": 1}], ttl=3600)
+        assert await service.get("services:active") == [{"id": 1}]
+        db.cache.find_one.assert_not_called()
+
+        await service.delete("services:active")
+        assert await service.get("services:active") is None
+        db.cache.find_one.assert_awaited_once()
+
+    assert service.stats()["l1_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_get_or_set_coalesces_concurrent_misses():
+    """Test that concurrent misses for one key compute the value once."""
+    db = MagicMock()
+    db.cache.update_one = AsyncMock()
+    db.cache.find_one = AsyncMock(return_value=None)
+    service = CacheService(l1_max_size=8)
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"result": calls}
+
+    with patch("app.services.cache_service.get_async_mongo", return_value=db):
+        results = await asyncio.gather(*[service.get_or_set("k", compute, 60) for _ in range(5)])
+
+    assert calls == 1
+    assert results == [{"result": 1}] * 5
+    assert service.stats()["coalesced"] == 4
+
+
+@pytest.mark.asyncio
+async def test_get_or_set_serves_stale_value_while_refreshing():
+    """Test stale-while-revalidate returns the old value and refreshes once."""
+    now = datetime.utcnow()
+    db = MagicMock()
+    db.cache.update_one = AsyncMock()
+    db.cache.find_one = AsyncMock(return_value={
+        "_id": "k",
+        "value": "old",
+        "stale_at": now - timedelta(seconds=5),
+        "expires_at": now + timedelta(seconds=60),
+    })
+    service = CacheService(l1_max_size=8)
+    compute = AsyncMock(return_value="new")
+
+    with patch("app.services.cache_service.get_async_mongo", return_value=db):
+        assert await service.get_or_set("k", compute, 60, stale_ttl=60) == "old"
+        await asyncio.gather(*service._refresh_tasks)
+
+    compute.assert_awaited_once()
+    assert service.l1.get("k") == "new"
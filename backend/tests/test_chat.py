@@ -1,5 +1,12 @@
 import pytest
 from unittest.mock import patch, AsyncMock
+from bson import ObjectId
+from datetime import datetime, timedelta
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+from app.api import chat
+from app.utils.security_simple import get_current_active_user
 
 
 def test_create_chat_session(client, auth_headers):
@@ -107,3 +114,183 @@ def test_end_chat_session(client, auth_headers):
     response = client.delete(f"/chat/sessions/{session_id}", headers=auth_headers)
     assert response.status_code == 200
     assert "Chat session ended successfully" in response.json()["message"]
+
+
+def test_session_cursor_round_trip():
+    """Test that session cursors decode to the position they encode."""
+    session = {"_id": ObjectId(), "created_at": datetime(2025, 1, 2, 3, 4, 5)}
+    assert chat._decode_cursor(chat._encode_cursor(session)) == (session["created_at"], session["_id"])
+
+
+class FakeSessions:
+    """In-memory stand-in for the chat_sessions and chat_messages collections."""
+
+    def __init__(self, sessions=()):
+        self.sessions = list(sessions)
+
+    @classmethod
+    def matches(cls, session, query):
+        for field, value in query.items():
+            if field == "$or":
+                if not any(cls.matches(session, clause) for clause in value):
+                    return False
+            elif isinstance(value, dict):
+                if not session.get(field) < value["$lt"]:
+                    return False
+            elif session.get(field) != value:
+                return False
+        return True
+
+    async def find_one(self, query, projection=None):
+        for session in self.sessions:
+            if self.matches(session, query):
+                return session
+        return None
+
+    def find(self, query, projection=None):
+        return FakeCursor([session for session in self.sessions if self.matches(session, query)])
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, keys):
+        for field, direction in reversed(keys):
+            self.docs.sort(key=lambda doc: doc[field], reverse=direction < 0)
+        return self
+
+    def limit(self, count):
+        self.docs = self.docs[:count]
+        return self
+
+    async def to_list(self, length=None):
+        return self.docs[:length]
+
+
+class FakeChatbot:
+    async def stream_chat_message(self, message, user_id, session_id=None):
+        yield {"type": "token", "content": message}
+        yield {"type": "done"}
+
+
+@pytest.fixture
+def chat_client(monkeypatch):
+    """Client for the chat router alone, authenticated as user-1."""
+    sessions = FakeSessions([{"_id": "s1", "session_id": "mine", "user_id": "user-1"}])
+    monkeypatch.setattr(chat, "get_async_mongo_collection", lambda name: sessions)
+    monkeypatch.setattr(chat, "get_mcp_chatbot", lambda: FakeChatbot())
+    monkeypatch.setattr(chat, "authenticate_token", lambda token: {"id": "user-1", "email": ""})
+
+    app = FastAPI()
+    app.include_router(chat.router)
+    app.dependency_overrides[get_current_active_user] = lambda: {"id": "user-1", "email": ""}
+    client = TestClient(app)
+    client.sessions = sessions
+    return client
+
+
+def test_stream_message_requires_session_owner(chat_client):
+    """Test that streaming into another user's session is refused."""
+    chat_client.sessions.sessions.append({"_id": "s2", "session_id": "theirs", "user_id": "user-2"})
+
+    response = chat_client.post("/chat/sessions/theirs/messages/stream", json={"content": "hi"})
+    assert response.status_code == 404
+
+    response = chat_client.post("/chat/sessions/mine/messages/stream", json={"content": "hi"})
+    assert response.status_code == 200
+    assert "event: done" in response.text
+
+
+def test_chat_websocket_rejects_foreign_session(chat_client):
+    """Test that the WebSocket closes for a session the user does not own."""
+    with pytest.raises(WebSocketDisconnect) as exc_info:
+        with chat_client.websocket_connect("/chat/sessions/theirs/ws?token=t") as websocket:
+            websocket.receive_json()
+    assert exc_info.value.code == 1008
+
+
+def test_chat_websocket_survives_invalid_frames(chat_client):
+    """Test that a non-JSON frame gets an error event and the socket stays open."""
+    with chat_client.websocket_connect("/chat/sessions/mine/ws?token=t") as websocket:
+        websocket.send_text("not json")
+        assert websocket.receive_json()["type"] == "error"
+
+        websocket.send_json({"content": "hello"})
+        assert websocket.receive_json() == {"type": "token", "content": "hello"}
+        assert websocket.receive_json() == {"type": "done"}
+
+
+def make_session(session_id, user_id, created_at):
+    return {
+        "_id": ObjectId(),
+        "session_id": session_id,
+        "user_id": user_id,
+        "is_active": True,
+        "created_at": created_at,
+        "updated_at": created_at
+    }
+
+
+def test_get_chat_sessions_pagination(chat_client):
+    """Test paging through chat sessions with a cursor."""
+    start = datetime(2025, 1, 1)
+    # Two sessions share a timestamp so the _id tiebreak is exercised
+    created = [start, start + timedelta(minutes=1), start + timedelta(minutes=1), start + timedelta(minutes=2)]
+    chat_client.sessions.sessions = [make_session(f"s{i}", "user-1", at) for i, at in enumerate(created)]
+    chat_client.sessions.sessions.append(make_session("other", "user-2", start + timedelta(minutes=3)))
+
+    response = chat_client.get("/chat/sessions?limit=2")
+    assert response.status_code == 200
+    first_page = [session["session_id"] for session in response.json()]
+    cursor = response.headers["X-Next-Cursor"]
+    assert len(first_page) == 2
+    assert "other" not in first_page
+
+    response = chat_client.get(f"/chat/sessions?limit=2&cursor={cursor}")
+    assert response.status_code == 200
+    second_page = [session["session_id"] for session in response.json()]
+    assert "X-Next-Cursor" not in response.headers
+
+    expected = sorted(
+        (session for session in chat_client.sessions.sessions if session["user_id"] == "user-1"),
+        key=lambda session: (session["created_at"], session["_id"]),
+        reverse=True
+    )
+    assert first_page + second_page == [session["session_id"] for session in expected]
+
+
+def test_get_chat_sessions_invalid_cursor(chat_client):
+    """Test that a malformed cursor is rejected."""
+    response = chat_client.get("/chat/sessions?cursor=not-a-cursor")
+    assert response.status_code == 400
+
+    with pytest.raises(chat.HTTPException):
+        chat._decode_cursor("not-a-cursor")
+
+
+def test_get_session_messages_pages_backwards(chat_client, monkeypatch):
+    """Test that session messages are keyset-paginated from the newest, each page in chronological order."""
+    from app.services import mcp_chatbot
+
+    start = datetime(2025, 1, 1)
+    messages = FakeSessions([
+        {"_id": ObjectId(), "session_id": "mine", "role": "user" if i % 2 == 0 else "assistant",
+         "content": f"message {i}", "created_at": start + timedelta(seconds=i // 2)}
+        for i in range(5)
+    ])
+    messages.sessions.append({"_id": ObjectId(), "session_id": "theirs", "role": "user", "content": "x", "created_at": start})
+    monkeypatch.setattr(mcp_chatbot, "get_async_mongo_collection", lambda name: messages)
+    monkeypatch.setattr(chat, "get_mcp_chatbot", lambda: mcp_chatbot.MCPChatbotService())
+
+    response = chat_client.get("/chat/sessions/mine/messages?limit=3")
+    assert response.status_code == 200
+    assert [message["content"] for message in response.json()] == ["message 2", "message 3", "message 4"]
+    assert response.json()[-1]["is_ai_generated"] is False
+
+    cursor = response.headers["X-Next-Cursor"]
+    response = chat_client.get(f"/chat/sessions/mine/messages?limit=3&cursor={cursor}")
+    assert [message["content"] for message in response.json()] == ["message 0", "message 1"]
+    assert "X-Next-Cursor" not in response.headers
+
+    assert chat_client.get("/chat/sessions/theirs/messages").status_code == 404
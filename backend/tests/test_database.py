@@ -0,0 +1,36 @@
+from unittest.mock import patch
+from app import database
+from app.database import get_async_database_url, get_mongo_client_options
+
+
+def test_async_database_url_mapping():
+    """Test that sync URLs are mapped onto async drivers."""
+    assert get_async_database_url("sqlite:///./x.db") == "sqlite+aiosqlite:///./x.db"
+    assert get_async_database_url("postgresql://u:p@h/db") == "postgresql+asyncpg://u:p@h/db"
+
+
+def test_mongo_client_options_follow_settings():
+    """Test that pool, compression and consistency options come from Settings."""
+    with patch.object(database.settings, "mongo_max_pool_size", 25), \
+            patch.object(database.settings, "mongo_compressors", "zstd,snappy"), \
+            patch.object(database.settings, "mongo_write_concern", "1"):
+        options = get_mongo_client_options()
+
+    assert options["maxPoolSize"] == 25
+    assert options["compressors"] == "zstd,snappy"
+    assert options["w"] == 1
+    assert "socketTimeoutMS" not in options
+
+
+def test_mongo_clients_are_shared_and_recreated_after_fork():
+    """Test that one client is shared per process and replaced in a new process."""
+    database.close_mongo_clients()
+    client = database.get_async_mongo_client()
+    assert database.get_async_mongo_client() is client
+    assert database.get_async_mongo().client is client
+
+    # Simulate running in a forked child
+    with patch.object(database.os, "getpid", return_value=-1):
+        assert database.get_async_mongo_client() is not client
+
+    database.close_mongo_clients()
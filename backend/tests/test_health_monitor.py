@@ -0,0 +1,80 @@
+import asyncio
+import time
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.api import health
+from app.services.health_monitor import HealthMonitor
+
+
+async def healthy():
+    await asyncio.sleep(0.1)
+
+
+async def failing():
+    raise RuntimeError("connection refused")
+
+
+async def hanging():
+    await asyncio.sleep(10)
+
+
+@pytest.mark.asyncio
+async def test_checks_run_concurrently():
+    """Test that checks run in parallel rather than one after another."""
+    monitor = HealthMonitor(interval=30, timeout=1)
+    for name in ("a", "b", "c"):
+        monitor.register(name, healthy)
+
+    started = time.perf_counter()
+    await monitor.run_checks()
+
+    assert time.perf_counter() - started < 0.25
+    assert all(result["status"] == "healthy" for result in monitor.results().values())
+
+
+@pytest.mark.asyncio
+async def test_only_critical_checks_decide_readiness():
+    """Test readiness and degraded status."""
+    monitor = HealthMonitor(interval=30, timeout=0.3)
+    monitor.register("database", healthy, critical=True)
+    monitor.register("llm_gemini", failing)
+    monitor.register("celery", hanging)
+
+    assert monitor.is_ready() is False  # no results yet
+    await monitor.run_checks()
+
+    results = monitor.results()
+    assert results["llm_gemini"]["error"] == "connection refused"
+    assert "timed out" in results["celery"]["error"]
+    assert monitor.is_ready() is True
+    assert monitor.status() == "degraded"
+
+
+@pytest.mark.asyncio
+async def test_stale_results_are_not_ready():
+    """Test that an old result no longer counts as healthy."""
+    monitor = HealthMonitor(interval=30, timeout=1, stale_after=60)
+    monitor.register("database", healthy, critical=True)
+    await monitor.run_checks()
+    assert monitor.is_ready() is True
+
+    monitor._results["database"]["checked_at"] -= 120
+    assert monitor.results()["database"]["status"] == "stale"
+    assert monitor.is_ready() is False
+
+
+@pytest.mark.asyncio
+async def test_ai_health_without_providers_is_not_configured(monkeypatch):
+    """Test that /health/ai does not report unhealthy when no LLM provider is configured."""
+    monitor = HealthMonitor(interval=30, timeout=1)
+    monkeypatch.setattr(health, "health_monitor", monitor)
+    app = FastAPI()
+    app.include_router(health.router)
+    client = TestClient(app)
+
+    assert client.get("/health/ai").json()["status"] == "not_configured"
+
+    monitor.register("llm_gemini", failing)
+    await monitor.run_checks()
+    assert client.get("/health/ai").json()["status"] == "unhealthy"
@@ -0,0 +1,36 @@
+import logging
+import queue
+from app.utils.log_queue import DroppingQueueHandler, should_log_request
+
+
+def test_errors_are_always_logged():
+    """Test that error responses bypass sampling."""
+    assert should_log_request("/health", 500, {"/health": 0.0}) == 1.0
+    assert should_log_request("/health", 404, {"/health": 0.0}) == 1.0
+
+
+def test_successful_requests_are_sampled_per_path():
+    """Test that successful requests follow the per-path sample rate."""
+    assert should_log_request("/health", 200, {"/health": 0.0}) is None
+    assert should_log_request("/health", 200, {"/health": 1.0}) == 1.0
+
+    logged = sum(
+        should_log_request("/health", 200, {"/health": 0.5}) is not None
+        for _ in range(1000)
+    )
+    assert 350 < logged < 650
+
+
+def test_full_queue_drops_records():
+    """Test that the handler drops records instead of blocking."""
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+    logger = logging.getLogger("test_log_queue")
+    logger.propagate = False
+    logger.addHandler(handler)
+
+    logger.warning("first")
+    logger.warning("second")
+
+    assert handler.queue.qsize() == 1
+    assert handler.dropped == 1
+    logger.removeHandler(handler)
@@ -0,0 +1,163 @@
+import asyncio
+import threading
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+from app.services import mcp_chatbot
+from app.services.mcp_chatbot import MCPChatbotService, llm_router_stats
+from app.services.provider_router import ProviderRouter
+from app.utils.write_behind import WriteBehindQueue
+
+
+class BlockingGeminiClient:
+    """Gemini client without an async API."""
+
+    def __init__(self):
+        self.thread = None
+
+    def generate_content(self, prompt, **kwargs):
+        self.thread = threading.current_thread()
+        return SimpleNamespace(text='{"is_medical": true, "confidence": 0.9}')
+
+
+@pytest.mark.asyncio
+async def test_sync_gemini_client_runs_in_thread_pool():
+    """Test that a blocking Gemini client is called off the event loop."""
+    service = MCPChatbotService()
+    service.gemini_client = BlockingGeminiClient()
+
+    result = await service._analyze_medical_content("I have a headache", "user-1")
+
+    assert result["is_medical"] is True
+    assert service.gemini_client.thread is not threading.main_thread()
+
+
+@pytest.mark.asyncio
+async def test_provider_concurrency_is_capped():
+    """Test that the per-provider semaphore bounds in-flight calls."""
+    service = MCPChatbotService()
+    service.provider_limits["openai"] = asyncio.Semaphore(2)
+    in_flight = 0
+    peak = 0
+
+    async def create(**kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))])
+
+    service.openai_client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=AsyncMock(side_effect=create)))
+    )
+
+    await asyncio.gather(*[service._openai_create(model="m", messages=[]) for _ in range(6)])
+
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_fused_mode_uses_one_llm_call_and_defers_assistant_write():
+    """Test the fused pipeline: one provider call, assistant message written in the background."""
+    service = MCPChatbotService()
+    service._store_message = AsyncMock()
+    service._complete = AsyncMock(return_value=(
+        '{"is_medical": true, "confidence": 0.8, "urgency_level": "low", '
+        '"response": "Rest and drink fluids."}'
+    ))
+
+    with patch("app.services.mcp_chatbot.settings.chat_fused_llm_call", True), \
+            patch("app.services.mcp_chatbot.write_behind_queue", WriteBehindQueue()) as queue:
+        result = await service.process_chat_message("I have a sore throat", "user-1", "session-1")
+        await queue.close()
+
+    assert result.message == "Rest and drink fluids."
+    assert result.is_medical is True
+    service._complete.assert_awaited_once()
+    assert [c.args[1] for c in service._store_message.await_args_list] == ["user", "assistant"]
+    assert "analyze_and_respond" in result.stage_timings
+
+
+@pytest.mark.asyncio
+async def test_stream_chat_message_yields_tokens_then_persists_reply():
+    """Test that streamed tokens are followed by a done event and one stored reply."""
+    service = MCPChatbotService()
+    service._store_message = AsyncMock()
+    service._analyze_medical_content = AsyncMock(return_value={"is_medical": True, "confidence": 0.7})
+
+    async def fake_stream(message, analysis):
+        for text in ["Drink ", "water."]:
+            yield text
+
+    service._stream_medical_response = fake_stream
+
+    with patch("app.services.mcp_chatbot.write_behind_queue", WriteBehindQueue()) as queue:
+        events = [event async for event in service.stream_chat_message("I feel dizzy", "user-1", "session-1")]
+        await queue.close()
+
+    assert [e["text"] for e in events if e["type"] == "token"] == ["Drink ", "water."]
+    assert events[-1]["type"] == "done"
+    assert service._store_message.await_args_list[-1].args[1:3] == ("assistant", "Drink water.")
+
+
+@pytest.mark.asyncio
+async def test_stream_fails_over_before_first_token():
+    """Test that a provider failing to open its stream falls through to the next one."""
+    service = MCPChatbotService()
+    service._router = ProviderRouter({"gemini": AsyncMock(), "openai": AsyncMock()})
+
+    async def provider_stream(provider, prompt):
+        if provider == "gemini":
+            raise RuntimeError("quota exceeded")
+        for text in ["Stay ", "hydrated."]:
+            yield text
+
+    service._provider_stream = provider_stream
+
+    chunks = [text async for text in service._stream_medical_response("I feel dizzy", {})]
+
+    assert chunks == ["Stay ", "hydrated."]
+    stats = service.router.stats()
+    assert stats["gemini_stream_error_rate"] == 1.0
+    # Streams do not feed the completion latencies used for ranking
+    assert service.router.stats_by_provider["openai"].samples == 0
+
+
+def test_router_stats_do_not_create_the_chatbot(monkeypatch):
+    """Test that reading router metrics before first use leaves the chatbot uncreated."""
+    monkeypatch.setattr(mcp_chatbot, "_mcp_chatbot", None)
+
+    assert llm_router_stats() == {}
+    assert mcp_chatbot._mcp_chatbot is None
+
+
+@pytest.mark.asyncio
+async def test_half_open_provider_gets_one_trial_stream():
+    """Test that concurrent streams send only one trial to a half-open provider."""
+    service = MCPChatbotService()
+    service._router = ProviderRouter({"gemini": AsyncMock(), "openai": AsyncMock()}, failure_threshold=1, reset_timeout=0)
+    service.router.record("gemini", 0.1, False)
+    release = asyncio.Event()
+    opened = []
+
+    async def provider_stream(provider, prompt):
+        opened.append(provider)
+        if provider == "gemini":
+            await release.wait()
+        yield f"{provider} reply"
+
+    service._provider_stream = provider_stream
+
+    async def stream():
+        return [text async for text in service._stream_medical_response("I feel dizzy", {})]
+
+    first = asyncio.ensure_future(stream())
+    await asyncio.sleep(0)
+    second = await stream()
+    release.set()
+
+    assert await first == ["gemini reply"]
+    assert second == ["openai reply"]
+    assert opened == ["gemini", "openai"]
+    assert service.router.breakers["gemini"].state == "closed"
@@ -0,0 +1,79 @@
+import asyncio
+import time
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from app.utils.metrics import PrometheusMiddleware, observe_llm
+
+
+def sample(name, labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def make_app():
+    app = FastAPI()
+    app.add_middleware(PrometheusMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"id": item_id}
+
+    return app
+
+
+def test_requests_are_labelled_by_route_template():
+    """Test that path parameters do not leak into metric labels."""
+    client = TestClient(make_app())
+    labels = {"method": "GET", "route": "/items/{item_id}", "status": "200"}
+    before = sample("healthify_http_requests_total", labels)
+
+    client.get("/items/1")
+    client.get("/items/2")
+
+    assert sample("healthify_http_requests_total", labels) == before + 2
+    assert sample("healthify_http_requests_total", {"method": "GET", "route": "/items/1", "status": "200"}) == 0.0
+
+    client.get("/does-not-exist")
+    assert sample("healthify_http_requests_total", {"method": "GET", "route": "unmatched", "status": "404"}) >= 1
+    assert sample("healthify_http_requests_in_flight", {}) == 0
+
+
+def test_llm_errors_are_counted():
+    """Test that a failing provider call records latency and an error."""
+    labels = {"provider": "test", "operation": "generate"}
+    before = sample("healthify_llm_errors_total", labels)
+
+    with pytest.raises(RuntimeError):
+        with observe_llm("test", "generate"):
+            raise RuntimeError("provider down")
+
+    assert sample("healthify_llm_errors_total", labels) == before + 1
+    assert sample("healthify_llm_request_duration_seconds_count", labels) >= 1
+
+
+def test_middleware_overhead_is_small():
+    """Benchmark the per-request cost of the middleware against a bare ASGI app."""
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        pass
+
+    async def receive():
+        return {"type": "http.request"}
+
+    async def run(handler, n):
+        scope = {"type": "http", "method": "GET", "path": "/bench"}
+        started = time.perf_counter()
+        for _ in range(n):
+            await handler(dict(scope), receive, send)
+        return (time.perf_counter() - started) / n
+
+    n = 5000
+    bare = asyncio.run(run(app, n))
+    wrapped = asyncio.run(run(PrometheusMiddleware(app), n))
+
+    # A few microseconds per request in practice; allow ample headroom for CI
+    assert wrapped - bare < 200e-6
@@ -0,0 +1,124 @@
+import asyncio
+import json
+import re
+import pytest
+from unittest.mock import AsyncMock
+from app.schemas.chat import SymptomAnalysisResponse
+from app.services import gemini_service
+from app.services.gemini_service import GeminiAIService, symptom_batcher_stats
+from app.utils.micro_batcher import MicroBatcher
+
+
+@pytest.mark.asyncio
+async def test_concurrent_submissions_share_a_batch():
+    """Test that concurrent items are sent together and results are split in order."""
+    batches = []
+
+    async def process_batch(items):
+        batches.append(list(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(process_batch, AsyncMock(), max_batch_size=3, window=0.05)
+    results = await asyncio.gather(*(batcher.submit(i) for i in range(4)))
+
+    assert results == [0, 2, 4, 6]
+    assert batches == [[0, 1, 2], [3]]
+    assert batcher.stats()["avg_batch_size"] == 2.0
+
+
+@pytest.mark.asyncio
+async def test_failed_items_fall_back_to_single_calls():
+    """Test that a failed item is retried alone and a failed batch retries every item."""
+    async def process_batch(items):
+        if len(items) > 2:
+            raise RuntimeError("provider error")
+        return [ValueError("invalid"), items[1]]
+
+    process_one = AsyncMock(side_effect=lambda item: f"single-{item}")
+    batcher = MicroBatcher(process_batch, process_one, max_batch_size=2, window=0.01)
+
+    assert await asyncio.gather(batcher.submit("a"), batcher.submit("b")) == ["single-a", "b"]
+    batcher.max_batch_size = 3
+    assert await asyncio.gather(*(batcher.submit(i) for i in "xyz")) == ["single-x", "single-y", "single-z"]
+    assert batcher.fallbacks == 4
+
+
+@pytest.mark.asyncio
+async def test_failed_items_raise_without_fallback():
+    async def process_batch(items):
+        return [items[0], ValueError("invalid")]
+
+    batcher = MicroBatcher(process_batch, AsyncMock(), max_batch_size=2, window=0.01, fallback=False)
+    results = await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+
+    assert results[0] == 1
+    assert isinstance(results[1], ValueError)
+    assert batcher.failed == 1
+
+
+ANALYSIS = {
+    "conditions": [{"name": "Common cold", "probability": 0.7, "description": "Viral infection", "severity": "mild"}],
+    "triage_advice": {"urgency": "low", "recommendation": "Rest", "timeframe": "within a week"},
+    "confidence_score": 0.6,
+    "follow_up_recommendations": ["Drink fluids"]
+}
+
+
+def batch_service(make_items):
+    """Gemini service whose batch call answers with ``make_items(refs)``, refs read back from the prompt."""
+    service = GeminiAIService()
+
+    async def generate(prompt, operation="symptom_analysis"):
+        refs = re.findall(r"Patient \d+ \(reference code (\w+)\)", prompt.text)
+        return f"```json\n{json.dumps(make_items(refs))}\n```"
+
+    service._generate_response = AsyncMock(side_effect=generate)
+    return service
+
+
+@pytest.mark.asyncio
+async def test_gemini_batch_response_is_split_and_validated():
+    """Test that one multi-item Gemini answer becomes one validated response per request."""
+    # Items out of order, second item missing a required field
+    service = batch_service(lambda refs: [
+        {**ANALYSIS, "id": 2, "ref": refs[2], "symptoms": ["Sneezing"]},
+        {"id": 1, "ref": refs[1], "symptoms": ["fever"], "conditions": []},
+        {**ANALYSIS, "id": 0, "ref": refs[0], "symptoms": ["cough"]},
+    ])
+
+    results = await service._analyze_batch([{"symptoms": ["cough"]}, {"symptoms": ["fever"]}, {"symptoms": ["sneezing"]}])
+
+    prompt = service._generate_response.await_args.args[0].text
+    assert "Patient 2 (reference code" in prompt and "exactly 3 objects" in prompt
+    assert isinstance(results[0], SymptomAnalysisResponse)
+    assert isinstance(results[1], Exception)
+    assert results[2].conditions[0].name == "Common cold"
+
+
+@pytest.mark.asyncio
+async def test_gemini_batch_rejects_misattributed_results():
+    """Test that swapped, misnumbered or duplicated results are never handed to another patient."""
+    service = batch_service(lambda refs: [
+        # Patients 0 and 1 swapped
+        {**ANALYSIS, "id": 0, "ref": refs[1], "symptoms": ["fever"]},
+        {**ANALYSIS, "id": 1, "ref": refs[0], "symptoms": ["cough"]},
+        # Right reference code, wrong patient's symptoms
+        {**ANALYSIS, "id": 2, "ref": refs[2], "symptoms": ["cough"]},
+        # Two answers for patient 3
+        {**ANALYSIS, "id": 3, "ref": refs[3], "symptoms": ["rash"]},
+        {**ANALYSIS, "id": 3, "ref": refs[3], "symptoms": ["rash"]},
+    ])
+
+    results = await service._analyze_batch([
+        {"symptoms": ["cough"]}, {"symptoms": ["fever"]}, {"symptoms": ["sneezing"]}, {"symptoms": ["rash"]}
+    ])
+
+    assert all(isinstance(result, Exception) for result in results)
+
+
+def test_batcher_stats_do_not_create_the_service(monkeypatch):
+    """Test that reading batcher metrics before first use leaves the Gemini service uncreated."""
+    monkeypatch.setattr(gemini_service, "_gemini_service", None)
+
+    assert symptom_batcher_stats() == {}
+    assert gemini_service._gemini_service is None
@@ -0,0 +1,35 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from app.utils.password_hasher import PasswordHasher
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_round_trip():
+    """Test hashing and verification through the executor."""
+    hasher = PasswordHasher(workers=2)
+    hashed = await hasher.hash("testpassword123")
+
+    assert await hasher.verify("testpassword123", hashed) is True
+    assert await hasher.verify("wrongpassword", hashed) is False
+    assert hasher.stats()["completed"] == 3
+    hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_saturated_hasher_sheds_load():
+    """Test that jobs beyond max_pending are rejected with 503."""
+    hasher = PasswordHasher(workers=1, max_pending=1)
+    hashed = await hasher.hash("testpassword123")
+
+    results = await asyncio.gather(
+        hasher.verify("testpassword123", hashed),
+        hasher.verify("testpassword123", hashed),
+        return_exceptions=True
+    )
+
+    assert results[0] is True
+    assert isinstance(results[1], HTTPException)
+    assert results[1].status_code == 503
+    assert hasher.stats()["rejected"] == 1
+    hasher.shutdown()
@@ -1,4 +1,16 @@
+import asyncio
 import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+from app.api import patients
+from app.database import Base, get_db
+from app.models.audit import AuditLog  # noqa: F401 - registers the mapper User relates to
+from app.models.chat import ChatSession  # noqa: F401 - registers the mapper User relates to
+from app.models.patient import Allergy, Patient
+from app.models.user import User
+from app.utils.security import get_current_user
 
 
 def test_create_patient_profile(client, auth_headers):
@@ -149,3 +161,51 @@ def test_get_medications(client, auth_headers):
     
     data = response.json()
     assert isinstance(data, list)
+
+
+@pytest.fixture
+def record_client():
+    """Client for the SQL patients router on an in-memory database with one patient."""
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    user = User(id=1, email="patient@example.com", hashed_password="x", first_name="Test", last_name="User", is_active=True)
+
+    async def seed():
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        async with session_factory() as session:
+            patient = Patient(user_id=user.id, blood_type="O+")
+            patient.allergies.append(Allergy(allergen="Peanuts", severity="severe"))
+            session.add_all([user, patient])
+            await session.commit()
+
+    async def override_get_db():
+        async with session_factory() as session:
+            yield session
+
+    asyncio.run(seed())
+    app = FastAPI()
+    app.include_router(patients.router)
+    app.dependency_overrides[get_current_user] = lambda: user
+    app.dependency_overrides[get_db] = override_get_db
+    yield TestClient(app)
+    asyncio.run(engine.dispose())
+
+
+def test_get_patient_record(record_client):
+    """Test getting the full patient record with ETag revalidation."""
+    response = record_client.get("/patients/me/record")
+    assert response.status_code == 200
+    
+    data = response.json()
+    assert data["blood_type"] == "O+"
+    assert [allergy["allergen"] for allergy in data["allergies"]] == ["Peanuts"]
+    assert data["medical_history"] == []
+    assert data["medications"] == []
+    
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"')
+    response = record_client.get("/patients/me/record", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
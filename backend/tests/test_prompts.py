@@ -0,0 +1,127 @@
+import asyncio
+import sys
+import time
+import pytest
+from types import ModuleType, SimpleNamespace
+from unittest.mock import AsyncMock, patch
+from app.services.mcp_chatbot import MCPChatbotService
+from app.services.prompts import (
+    SYMPTOM_ANALYSIS, GeminiContextCache, PromptRegistry, anthropic_system, format_patient_information
+)
+
+
+def test_template_keeps_static_prefix_and_counts_tokens():
+    """Test that rendering only fills the suffix and is counted per template."""
+    registry = PromptRegistry()
+    template = registry.register("greeting", prefix="Answer briefly. Output JSON like {\"a\": 1}.", suffix="Message: {message}")
+
+    first = registry.render("greeting", message="hello")
+    second = registry.render("greeting", message="headache {x}")
+
+    assert first.prefix is second.prefix
+    assert second.suffix == "Message: headache {x}"
+    assert first.text.startswith("Answer briefly.")
+    stats = registry.stats()
+    assert stats["greeting_renders"] == 2
+    assert stats["greeting_prefix_tokens"] == template.prefix_tokens > 0
+    with pytest.raises(ValueError):
+        registry.register("greeting", prefix="", suffix="")
+
+
+def test_symptom_prompt_puts_patient_data_after_the_prefix():
+    prompt = SYMPTOM_ANALYSIS.render(patient=format_patient_information({"symptoms": ["cough"], "age": 40}))
+
+    assert "cough" not in prompt.prefix
+    assert "- Symptoms: cough" in prompt.suffix
+    assert prompt.text.index('"conditions"') < prompt.text.index("- Symptoms: cough")
+
+
+def test_anthropic_prefix_marked_for_caching_only_when_long_enough():
+    prompt = SYMPTOM_ANALYSIS.render(patient="- Symptoms: cough")
+
+    with patch("app.services.prompts.settings.anthropic_cache_min_tokens", 1):
+        system = anthropic_system(prompt)
+    assert system == [{"type": "text", "text": prompt.prefix, "cache_control": {"type": "ephemeral"}}]
+
+    with patch("app.services.prompts.settings.anthropic_cache_min_tokens", 10 ** 6):
+        assert anthropic_system(prompt) == prompt.prefix
+
+
+@pytest.mark.asyncio
+async def test_gemini_sends_full_prompt_below_cache_minimum():
+    """Test that short prefixes skip cached content and are sent with the suffix."""
+    cache = GeminiContextCache("models/gemini-1.5-pro-001", min_tokens=10 ** 6)
+    prompt = SYMPTOM_ANALYSIS.render(patient="- Symptoms: cough")
+    default_model = object()
+
+    assert await cache.contents(prompt, default_model) == (default_model, prompt.text)
+
+
+@pytest.mark.asyncio
+async def test_anthropic_call_sends_prefix_as_system_prompt():
+    service = MCPChatbotService()
+    create = AsyncMock(return_value=SimpleNamespace(content=[SimpleNamespace(text="ok")]))
+    service.anthropic_client = SimpleNamespace(messages=SimpleNamespace(create=create))
+
+    await service._anthropic_complete(service._build_medical_analysis_prompt("I have a rash"), 100, 0.1)
+
+    kwargs = create.await_args.kwargs
+    assert "Respond with a JSON object" in str(kwargs["system"])
+    assert kwargs["messages"] == [{"role": "user", "content": 'Message: "I have a rash"'}]
+
+
+class FakeCachedContent:
+    created = []
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.updates = []
+
+    @classmethod
+    def create(cls, **kwargs):
+        time.sleep(0.01)
+        cached = cls(**kwargs)
+        cls.created.append(cached)
+        return cached
+
+    def update(self, ttl):
+        self.updates.append(ttl)
+
+    def delete(self):
+        pass
+
+
+@pytest.fixture
+def fake_gemini_caching(monkeypatch):
+    import google.generativeai as genai
+
+    FakeCachedContent.created = []
+    caching = ModuleType("google.generativeai.caching")
+    caching.CachedContent = FakeCachedContent
+    monkeypatch.setitem(sys.modules, "google.generativeai.caching", caching)
+    monkeypatch.setattr(
+        genai.GenerativeModel, "from_cached_content",
+        classmethod(lambda cls, cached_content: SimpleNamespace(cached=cached_content)),
+        raising=False
+    )
+    return FakeCachedContent
+
+
+@pytest.mark.asyncio
+async def test_gemini_context_cache_is_created_once_and_extended(fake_gemini_caching):
+    """Test that concurrent first uses share one cached content and refreshes extend it."""
+    cache = GeminiContextCache("models/gemini-1.5-pro-001", min_tokens=1, ttl=60)
+
+    models = await asyncio.gather(*(cache.model_for(SYMPTOM_ANALYSIS) for _ in range(5)))
+
+    assert len(fake_gemini_caching.created) == 1
+    assert len({id(model) for model in models}) == 1
+
+    # Due for refresh
+    model, cached, _ = cache._models[SYMPTOM_ANALYSIS.name]
+    cache._models[SYMPTOM_ANALYSIS.name] = (model, cached, time.monotonic() - 1)
+    await asyncio.gather(*(cache.model_for(SYMPTOM_ANALYSIS) for _ in range(3)))
+
+    assert len(fake_gemini_caching.created) == 1
+    assert len(cached.updates) == 1
+    assert cache._models[SYMPTOM_ANALYSIS.name][2] > time.monotonic()
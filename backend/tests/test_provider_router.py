@@ -0,0 +1,102 @@
+import asyncio
+import pytest
+from app.services.provider_router import NoProviderAvailable, ProviderRouter
+
+
+class FakeProvider:
+    """In-process provider with a fixed latency that can be told to fail."""
+
+    def __init__(self, name: str, latency: float = 0.0, fail: bool = False):
+        self.name = name
+        self.latency = latency
+        self.fail = fail
+        self.calls = 0
+        self.cancelled = 0
+
+    async def __call__(self, prompt, max_tokens, temperature):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.latency)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.fail:
+            raise RuntimeError(f"{self.name} unavailable")
+        return f"{self.name}: {prompt}"
+
+
+@pytest.mark.asyncio
+async def test_fails_over_to_next_provider():
+    """Test that an erroring provider falls through to the next one."""
+    primary, secondary = FakeProvider("primary", fail=True), FakeProvider("secondary")
+    router = ProviderRouter({"primary": primary, "secondary": secondary})
+
+    assert await router.complete("hi", 10, 0.1) == "secondary: hi"
+    assert router.failovers == 1
+    assert router.stats()["primary_error_rate"] == 1.0
+
+
+@pytest.mark.asyncio
+async def test_hedges_slow_provider():
+    """Test that a second provider is raced once the latency budget is exceeded."""
+    slow, fast = FakeProvider("slow", latency=1.0), FakeProvider("fast", latency=0.01)
+    router = ProviderRouter({"slow": slow, "fast": fast}, hedge_after=0.05)
+
+    assert await router.complete("hi", 10, 0.1) == "fast: hi"
+    await asyncio.sleep(0)
+    assert router.hedges == 1
+    assert slow.cancelled == 1
+    # The cancelled loser is not counted as a failure
+    assert router.stats_by_provider["slow"].samples == 0
+
+
+@pytest.mark.asyncio
+async def test_circuit_opens_after_repeated_failures():
+    """Test that a failing provider is skipped once its circuit opens."""
+    broken, healthy = FakeProvider("broken", fail=True), FakeProvider("healthy")
+    router = ProviderRouter({"broken": broken, "healthy": healthy}, failure_threshold=2, reset_timeout=60)
+
+    for _ in range(4):
+        await router.complete("hi", 10, 0.1)
+
+    assert broken.calls == 2
+    assert router.ranked() == ["healthy"]
+    assert router.stats()["broken_circuit_open"] == 1
+
+    healthy.fail = True
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            await router.complete("hi", 10, 0.1)
+    with pytest.raises(NoProviderAvailable):
+        await router.complete("hi", 10, 0.1)
+
+
+@pytest.mark.asyncio
+async def test_half_open_circuit_allows_one_trial():
+    """Test that a successful trial call closes the circuit again."""
+    flaky = FakeProvider("flaky", fail=True)
+    router = ProviderRouter({"flaky": flaky}, failure_threshold=1, reset_timeout=0.01)
+
+    with pytest.raises(RuntimeError):
+        await router.complete("hi", 10, 0.1)
+    assert router.ranked() == []
+
+    await asyncio.sleep(0.02)
+    flaky.fail = False
+    assert await router.complete("hi", 10, 0.1) == "flaky: hi"
+    assert router.breakers["flaky"].state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_ranks_by_measured_latency():
+    """Test that the faster provider leads once both have enough samples."""
+    slow, fast = FakeProvider("slow", latency=0.02), FakeProvider("fast", latency=0.001)
+    router = ProviderRouter({"slow": slow, "fast": fast}, min_samples=3)
+
+    assert router.ranked() == ["slow", "fast"]
+    for _ in range(3):
+        router.record("slow", 0.02, True)
+        router.record("fast", 0.001, True)
+
+    assert router.ranked() == ["fast", "slow"]
+    assert await router.complete("hi", 10, 0.1) == "fast: hi"
@@ -0,0 +1,110 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from fastapi import HTTPException
+from app.utils import rate_limiter as rate_limiter_module
+from app.utils.rate_limiter import RateLimiter, InMemoryRateLimitBackend, MongoSyncRateLimitBackend
+
+
+def make_request(ip: str = "127.0.0.1"):
+    return SimpleNamespace(client=SimpleNamespace(host=ip))
+
+
+@pytest.mark.asyncio
+async def test_in_memory_limiter_blocks_after_limit():
+    """Test that the token bucket rejects requests once exhausted."""
+    limiter = RateLimiter(requests=3, window=60, backend=InMemoryRateLimitBackend())
+
+    for _ in range(3):
+        assert await limiter(make_request()) is True
+
+    with pytest.raises(HTTPException) as exc_info:
+        await limiter(make_request())
+    assert exc_info.value.status_code == 429
+
+    # Other clients have their own bucket
+    assert await limiter(make_request("10.0.0.2")) is True
+
+
+@pytest.mark.asyncio
+async def test_in_memory_backend_evicts_idle_keys():
+    """Test that the backend keeps at most max_keys buckets."""
+    backend = InMemoryRateLimitBackend(max_keys=2)
+
+    await backend.hit("a", 5, 60)
+    await backend.hit("b", 5, 60)
+    await backend.hit("a", 5, 60)
+    await backend.hit("c", 5, 60)
+
+    assert list(backend._buckets) == ["a", "c"]
+
+
+@pytest.mark.asyncio
+async def test_mongo_sync_backend_counts_locally_between_syncs():
+    """Test that the shared backend admits against local counts without Mongo."""
+    backend = MongoSyncRateLimitBackend(sync_interval=3600)
+
+    results = [await backend.hit("a", 2, 60) for _ in range(3)]
+
+    assert results == [True, True, False]
+    assert sum(backend._pending.values()) == 2
+
+
+class FakeRateLimits:
+    def __init__(self):
+        self.counts = {}
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def bulk_write(self, operations, ordered=True):
+        await self.release.wait()
+        for op in operations:
+            doc_id = op._filter["_id"]
+            self.counts[doc_id] = self.counts.get(doc_id, 0) + op._doc["$inc"]["count"]
+
+    async def find(self, query, projection=None):
+        for doc_id in query["_id"]["$in"]:
+            if doc_id in self.counts:
+                yield {"_id": doc_id, "count": self.counts[doc_id]}
+
+
+@pytest.fixture
+def rate_limits(monkeypatch):
+    collection = FakeRateLimits()
+    monkeypatch.setattr(rate_limiter_module, "get_async_mongo", lambda: SimpleNamespace(rate_limits=collection))
+    return collection
+
+
+@pytest.mark.asyncio
+async def test_mongo_sync_backend_counts_hits_while_syncing(rate_limits):
+    """Test that hits being flushed still count until shared counts are reloaded."""
+    backend = MongoSyncRateLimitBackend(sync_interval=3600)
+    assert await backend.hit("a", 2, 60) is True
+    assert await backend.hit("a", 2, 60) is True
+
+    rate_limits.release.clear()
+    sync = asyncio.create_task(backend.sync())
+    await asyncio.sleep(0)
+
+    assert backend._pending == {}
+    assert await backend.hit("a", 2, 60) is False
+
+    rate_limits.release.set()
+    await sync
+
+    assert backend._in_flight == {}
+    assert list(backend._shared.values()) == [2]
+    assert await backend.hit("a", 2, 60) is False
+
+
+@pytest.mark.asyncio
+async def test_mongo_sync_backend_close_flushes_pending_hits(rate_limits):
+    """Test that closing the backend writes hits not yet synced."""
+    backend = MongoSyncRateLimitBackend(sync_interval=3600)
+    await backend.hit("a", 5, 60)
+    await backend.hit("a", 5, 60)
+
+    await backend.close()
+
+    assert list(rate_limits.counts.values()) == [2]
+    assert backend._pending == {}
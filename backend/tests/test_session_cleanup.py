@@ -0,0 +1,133 @@
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+from app.services.session_cleanup import cleanup_expired_sessions, expire_in_batches
+
+
+def matches(doc, query):
+    for field, condition in query.items():
+        value = doc.get(field)
+        if not isinstance(condition, dict):
+            if value != condition:
+                return False
+            continue
+        for op, operand in condition.items():
+            if op == "$lt" and not value < operand:
+                return False
+            if op == "$gte" and not value >= operand:
+                return False
+            if op == "$in" and value not in operand:
+                return False
+    return True
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, field, direction):
+        self.docs = sorted(self.docs, key=lambda doc: doc[field], reverse=direction < 0)
+        return self
+
+    def limit(self, count):
+        self.docs = self.docs[:count]
+        return self
+
+    async def to_list(self, length):
+        return [dict(doc) for doc in self.docs[:length]]
+
+
+class FakeCollection:
+    def __init__(self, docs=()):
+        self.docs = {doc["_id"]: dict(doc) for doc in docs}
+        self.finds = []
+
+    def find(self, query, projection=None):
+        self.finds.append(query)
+        return FakeCursor([doc for doc in self.docs.values() if matches(doc, query)])
+
+    async def find_one(self, query):
+        return next((dict(doc) for doc in self.docs.values() if matches(doc, query)), None)
+
+    async def update_many(self, query, update):
+        matched = [doc for doc in self.docs.values() if matches(doc, query)]
+        for doc in matched:
+            doc.update(update["$set"])
+        return MagicMock(modified_count=len(matched))
+
+    async def update_one(self, query, update, upsert=False):
+        doc = self.docs.setdefault(query["_id"], {"_id": query["_id"]})
+        doc.update(update.get("$set", {}))
+        for field, amount in update.get("$inc", {}).items():
+            doc[field] = doc.get(field, 0) + amount
+
+
+def make_db(chat_sessions=(), user_sessions=()):
+    db = MagicMock()
+    db.chat_sessions = FakeCollection(chat_sessions)
+    db.user_sessions = FakeCollection(user_sessions)
+    db.maintenance_checkpoints = FakeCollection()
+    return db
+
+
+def old_sessions(count, now):
+    return [
+        {"_id": i, "is_active": True, "created_at": now - timedelta(days=2, minutes=count - i)}
+        for i in range(count)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_expired_sessions_are_ended_in_batches():
+    """Test that old chat sessions and expired user sessions are ended a batch at a time."""
+    now = datetime.utcnow()
+    db = make_db(
+        chat_sessions=old_sessions(5, now) + [{"_id": "new", "is_active": True, "created_at": now}],
+        user_sessions=[
+            {"_id": "expired", "is_active": True, "expires_at": now - timedelta(hours=1)},
+            {"_id": "valid", "is_active": True, "expires_at": now + timedelta(days=1)},
+        ]
+    )
+
+    with patch("app.services.session_cleanup.settings.session_cleanup_batch_size", 2):
+        counts = await cleanup_expired_sessions(db)
+
+    assert counts == {"chat_sessions": 5, "user_sessions": 1}
+    assert db.chat_sessions.docs["new"]["is_active"] is True
+    assert all("ended_at" in db.chat_sessions.docs[i] for i in range(5))
+    assert db.user_sessions.docs["valid"]["is_active"] is True
+    # 2 + 2 + 1 sessions, each batch reads at most two ids
+    assert len(db.chat_sessions.finds) == 3
+    checkpoint = db.maintenance_checkpoints.docs["session_cleanup:chat_sessions"]
+    assert checkpoint["finished"] is True and checkpoint["processed"] == 5
+
+
+@pytest.mark.asyncio
+async def test_interrupted_run_resumes_from_checkpoint():
+    """Test that a run capped by max_batches leaves a checkpoint the next run resumes from."""
+    now = datetime.utcnow()
+    db = make_db(chat_sessions=old_sessions(5, now))
+    query = {"is_active": True, "created_at": {"$lt": now - timedelta(hours=24)}}
+
+    ended = await expire_in_batches(db, "chat", db.chat_sessions, query, "created_at", batch_size=2, max_batches=1)
+    assert ended == 2
+    checkpoint = dict(db.maintenance_checkpoints.docs["chat"])
+    assert checkpoint["finished"] is False
+    assert checkpoint["last_value"] == db.chat_sessions.docs[1]["created_at"]
+
+    ended = await expire_in_batches(db, "chat", db.chat_sessions, query, "created_at", batch_size=2)
+    assert ended == 3
+    assert db.chat_sessions.finds[1]["created_at"]["$gte"] == checkpoint["last_value"]
+    assert db.maintenance_checkpoints.docs["chat"]["finished"] is True
+
+
+@pytest.mark.asyncio
+async def test_user_sessions_skipped_with_ttl_index():
+    now = datetime.utcnow()
+    db = make_db(user_sessions=[{"_id": "expired", "is_active": True, "expires_at": now - timedelta(hours=1)}])
+
+    with patch("app.services.session_cleanup.settings.user_session_ttl_index", True):
+        counts = await cleanup_expired_sessions(db)
+
+    assert counts == {"chat_sessions": 0}
+    assert db.user_sessions.docs["expired"]["is_active"] is True
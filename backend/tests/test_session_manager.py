@@ -0,0 +1,75 @@
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, PropertyMock, patch
+from app.utils.session_manager import SessionManager
+
+
+def make_collection(session):
+    collection = MagicMock()
+    collection.find_one = AsyncMock(return_value=session)
+    collection.update_one = AsyncMock()
+    collection.update_many = AsyncMock()
+    collection.bulk_write = AsyncMock()
+    return collection
+
+
+def make_session(last_active_ago: float, user_id: str = "user-1", session_id: str = "s1"):
+    now = datetime.utcnow()
+    return {
+        "_id": session_id,
+        "user_id": user_id,
+        "is_active": True,
+        "last_active": now - timedelta(seconds=last_active_ago),
+        "expires_at": now + timedelta(days=1)
+    }
+
+
+@pytest.mark.asyncio
+async def test_validate_session_coalesces_reads_and_activity_writes():
+    """Test that repeated validations read once and write last_active in one bulk write."""
+    collection = make_collection(make_session(last_active_ago=120))
+    manager = SessionManager(cache_ttl=30, activity_granularity=60, flush_interval=60)
+
+    with patch.object(SessionManager, "db", new_callable=PropertyMock, return_value={"user_sessions": collection}):
+        for _ in range(5):
+            assert (await manager.validate_session("s1"))["_id"] == "s1"
+        collection.update_one.assert_not_called()
+        await manager.close()
+
+    collection.find_one.assert_awaited_once()
+    collection.bulk_write.assert_awaited_once()
+    assert len(collection.bulk_write.await_args.args[0]) == 1
+    assert manager.stats()["cache_hits"] == 4
+
+
+@pytest.mark.asyncio
+async def test_recent_activity_is_not_written():
+    collection = make_collection(make_session(last_active_ago=5))
+    manager = SessionManager(activity_granularity=60)
+
+    with patch.object(SessionManager, "db", new_callable=PropertyMock, return_value={"user_sessions": collection}):
+        await manager.validate_session("s1")
+        await manager.close()
+
+    collection.bulk_write.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_ending_sessions_invalidates_cache():
+    """Test that ended sessions are read from the database again."""
+    collection = make_collection(make_session(last_active_ago=5))
+    manager = SessionManager()
+
+    with patch.object(SessionManager, "db", new_callable=PropertyMock, return_value={"user_sessions": collection}):
+        await manager.validate_session("s1")
+        await manager.end_session("s1")
+        collection.find_one.return_value = None
+        assert await manager.validate_session("s1") is None
+
+        collection.find_one.return_value = make_session(last_active_ago=5)
+        await manager.validate_session("s1")
+        await manager.end_all_sessions("user-1")
+        collection.find_one.return_value = None
+        assert await manager.validate_session("s1") is None
+
+    assert collection.find_one.await_count == 4
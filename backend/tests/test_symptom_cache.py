@@ -0,0 +1,129 @@
+import asyncio
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.services.cache_service import CacheService
+from app.services.symptom_cache import SymptomCache, age_band, symptom_cache_key
+
+
+def make_cache_service():
+    db = MagicMock()
+    db.cache.update_one = AsyncMock()
+    db.cache.find_one = AsyncMock(return_value=None)
+    db.cache.delete_one = AsyncMock()
+    return db, CacheService(l1_max_size=64)
+
+
+def test_key_is_stable_across_formatting_and_order():
+    """Test that equivalent requests map to the same key."""
+    a = {"symptoms": ["Headache ", "fever"], "age": 34, "gender": "Female", "medical_history": ["Asthma"]}
+    b = {"symptoms": ["fever", "headache", "HEADACHE."], "age": 41, "gender": "female", "medical_history": ["asthma "]}
+    assert symptom_cache_key(a) == symptom_cache_key(b)
+    assert symptom_cache_key(a).startswith("symptom_analysis:v1:")
+
+
+def test_key_depends_on_demographics_and_history():
+    """Test that age band, gender and history change the key."""
+    base = {"symptoms": ["fever"], "age": 34, "gender": "female"}
+    assert symptom_cache_key(base) != symptom_cache_key({**base, "age": 70})
+    assert symptom_cache_key(base) != symptom_cache_key({**base, "gender": "male"})
+    assert symptom_cache_key(base) != symptom_cache_key({**base, "medical_history": ["diabetes"]})
+
+
+def test_age_bands():
+    assert age_band(None) == "unknown"
+    assert age_band(1) == "0-1"
+    assert age_band(17) == "13-17"
+    assert age_band(18) == "18-29"
+    assert age_band(90) == "65+"
+
+
+@pytest.mark.asyncio
+async def test_exact_hits_and_misses_are_counted():
+    """Test that a repeated request is served from the cache."""
+    db, service = make_cache_service()
+    cache = SymptomCache()
+    analyze = AsyncMock(return_value={"triage_level": "NON_URGENT"})
+
+    with patch("app.services.symptom_cache.cache_service", service), \
+            patch("app.services.cache_service.get_async_mongo", return_value=db):
+        await cache.get_or_analyze({"symptoms": ["Cough"]}, analyze)
+        result = await cache.get_or_analyze({"symptoms": ["cough "]}, analyze)
+
+    assert result == {"triage_level": "NON_URGENT"}
+    analyze.assert_awaited_once()
+    stats = cache.stats()
+    assert (stats["exact_hits"], stats["similar_hits"], stats["misses"]) == (1, 0, 1)
+    assert stats["hit_rate"] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_similarity_layer_reuses_near_identical_analysis():
+    """Test that a near-identical symptom set reuses a cached analysis when enabled."""
+    db, service = make_cache_service()
+    cache = SymptomCache(similarity_threshold=0.7)
+    analyze = AsyncMock(return_value={"triage_level": "URGENT"})
+    base = {"age": 30, "symptoms": ["sore throat", "runny nose", "persistent headache"]}
+
+    with patch("app.services.symptom_cache.cache_service", service), \
+            patch("app.services.cache_service.get_async_mongo", return_value=db):
+        await cache.get_or_analyze(base, analyze)
+        result = await cache.get_or_analyze({**base, "symptoms": ["sore throat", "runny nose", "persistent headaches"]}, analyze)
+        # A different age band is never matched
+        await cache.get_or_analyze({**base, "age": 70}, analyze)
+
+    assert result == {"triage_level": "URGENT"}
+    assert analyze.await_count == 2
+    assert cache.stats()["similar_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_similarity_layer_disabled_by_default():
+    db, service = make_cache_service()
+    cache = SymptomCache()
+    analyze = AsyncMock(return_value={"triage_level": "URGENT"})
+
+    with patch("app.services.symptom_cache.cache_service", service), \
+            patch("app.services.cache_service.get_async_mongo", return_value=db):
+        await cache.get_or_analyze({"symptoms": ["headache", "fever"]}, analyze)
+        await cache.get_or_analyze({"symptoms": ["headaches", "fever"]}, analyze)
+
+    assert analyze.await_count == 2
+    assert len(cache.index) == 0
+
+
+@pytest.mark.asyncio
+async def test_coalesced_and_stale_results_are_not_counted_as_hits():
+    """Test that single-flight waiters and stale serves are counted apart from hits."""
+    db, service = make_cache_service()
+    cache = SymptomCache()
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def analyze():
+        started.set()
+        await release.wait()
+        return {"triage_level": "NON_URGENT"}
+
+    with patch("app.services.symptom_cache.cache_service", service), \
+            patch("app.services.cache_service.get_async_mongo", return_value=db):
+        first = asyncio.ensure_future(cache.get_or_analyze({"symptoms": ["cough"]}, analyze))
+        await started.wait()
+        second = asyncio.ensure_future(cache.get_or_analyze({"symptoms": ["Cough"]}, analyze))
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(first, second)
+
+        now = datetime.utcnow()
+        service.l1.clear()
+        db.cache.find_one = AsyncMock(return_value={
+            "value": {"triage_level": "NON_URGENT"},
+            "stale_at": now - timedelta(seconds=5),
+            "expires_at": now + timedelta(seconds=60),
+        })
+        await cache.get_or_analyze({"symptoms": ["cough"]}, analyze, stale_ttl=60)
+        await asyncio.gather(*service._refresh_tasks)
+
+    stats = cache.stats()
+    assert (stats["exact_hits"], stats["misses"], stats["coalesced"], stats["stale"]) == (0, 1, 1, 1)
+    assert stats["hit_rate"] == 0.0
@@ -0,0 +1,107 @@
+import asyncio
+import threading
+import pytest
+from unittest.mock import AsyncMock, patch
+from celery.contrib.testing.worker import start_worker
+from app.celery_app import celery_app
+from app.services import symptom_jobs
+
+
+class FakeJobsCollection:
+    """In-memory stand-in for ``symptom_analyses`` shared by the API and worker threads."""
+
+    def __init__(self):
+        self.docs = {}
+        self.lock = threading.Lock()
+
+    async def insert_one(self, doc):
+        with self.lock:
+            self.docs[doc["_id"]] = dict(doc)
+
+    async def find_one(self, query):
+        with self.lock:
+            doc = self.docs.get(query["_id"])
+            if doc is None or any(doc.get(key) != value for key, value in query.items()):
+                return None
+            return dict(doc)
+
+    async def update_one(self, query, update):
+        with self.lock:
+            self.docs[query["_id"]].update(update["$set"])
+
+
+ANALYSIS = {
+    "conditions": [],
+    "triage_advice": {"urgency": "low", "recommendation": "Rest", "timeframe": "within a week"},
+    "disclaimer": "Not medical advice",
+    "confidence_score": 0.5,
+    "follow_up_recommendations": []
+}
+
+
+@pytest.fixture
+def local_worker():
+    """Run a Celery worker thread against an in-memory broker."""
+    celery_app.conf.update(broker_url="memory://", result_backend="cache+memory://")
+    with start_worker(celery_app, pool="solo", perform_ping_check=False, loglevel="WARNING"):
+        yield
+
+
+async def wait_for_status(user_id, job_id, statuses, timeout=10.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while asyncio.get_running_loop().time() < deadline:
+        job = await symptom_jobs.get_job(job_id, user_id)
+        if job["status"] in statuses:
+            return job
+        await asyncio.sleep(0.05)
+    raise AssertionError(f"job did not reach {statuses}")
+
+
+@pytest.mark.asyncio
+async def test_job_runs_on_worker_and_stores_result(local_worker):
+    """Test that a queued job is analyzed by a worker and its result stored."""
+    collection = FakeJobsCollection()
+    with patch.object(symptom_jobs, "jobs_collection", return_value=collection), \
+            patch.object(symptom_jobs, "_analyze", AsyncMock(return_value=ANALYSIS)) as analyze:
+        job = await symptom_jobs.create_job("user-1", {"symptoms": ["cough"]})
+        assert job["status"] == "pending"
+
+        finished = await wait_for_status("user-1", job["_id"], ("completed", "failed"))
+
+    assert finished["status"] == "completed"
+    assert finished["analysis"] == ANALYSIS
+    analyze.assert_awaited_once_with({"symptoms": ["cough"]})
+    # Other users cannot see the job
+    with patch.object(symptom_jobs, "jobs_collection", return_value=collection):
+        assert await symptom_jobs.get_job(job["_id"], "user-2") is None
+
+
+@pytest.mark.asyncio
+async def test_failed_analysis_marks_job_failed(local_worker):
+    collection = FakeJobsCollection()
+    with patch.object(symptom_jobs, "jobs_collection", return_value=collection), \
+            patch.object(symptom_jobs, "_analyze", AsyncMock(side_effect=RuntimeError("provider down"))):
+        job = await symptom_jobs.create_job("user-1", {"symptoms": ["cough"]})
+        finished = await wait_for_status("user-1", job["_id"], ("completed", "failed"))
+
+    assert finished["status"] == "failed"
+    assert finished["error"] == "provider down"
+
+
+@pytest.mark.asyncio
+async def test_job_events_stop_at_final_status():
+    """Test that the event stream yields each status change and ends when the job finishes."""
+    collection = FakeJobsCollection()
+    await collection.insert_one({"_id": "job-1", "user_id": "user-1", "status": "running"})
+
+    async def finish_later():
+        await asyncio.sleep(0.05)
+        await collection.update_one({"_id": "job-1"}, {"$set": {"status": "completed"}})
+
+    with patch.object(symptom_jobs, "jobs_collection", return_value=collection), \
+            patch.object(symptom_jobs.settings, "symptom_job_poll_interval", 0.01):
+        task = asyncio.create_task(finish_later())
+        statuses = [job["status"] async for job in symptom_jobs.job_events("job-1", "user-1")]
+        await task
+
+    assert statuses == ["running", "completed"]
@@ -0,0 +1,75 @@
+import time
+import pytest
+from types import SimpleNamespace
+from app.utils import token_cache as token_cache_module
+from app.utils.token_cache import TokenCache
+
+
+class FakeRevokedTokens:
+    def __init__(self):
+        self.docs = {}
+
+    async def update_one(self, query, update, upsert=False):
+        self.docs[query["_id"]] = update["$set"]
+
+
+def make_decoder(exp: float):
+    calls = []
+
+    def decode(token):
+        calls.append(token)
+        return {"sub": "user-1", "exp": exp}
+
+    return decode, calls
+
+
+def test_verified_claims_are_cached_until_exp():
+    """Test that a token is decoded once and reused until it expires."""
+    cache = TokenCache(max_size=10)
+    decode, calls = make_decoder(time.time() + 60)
+
+    assert cache.get_claims("token-a", decode)["sub"] == "user-1"
+    assert cache.get_claims("token-a", decode)["sub"] == "user-1"
+    assert len(calls) == 1
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+    expired_decode, expired_calls = make_decoder(time.time() - 1)
+    cache.get_claims("token-b", expired_decode)
+    cache.get_claims("token-b", expired_decode)
+    assert len(expired_calls) == 2
+
+
+def test_cache_is_bounded():
+    """Test that the least recently used token is evicted."""
+    cache = TokenCache(max_size=2)
+    decode, calls = make_decoder(time.time() + 60)
+
+    for token in ("a", "b", "c"):
+        cache.get_claims(token, decode)
+    assert cache.stats()["size"] == 2
+
+    cache.get_claims("a", decode)
+    assert calls == ["a", "b", "c", "a"]
+
+
+@pytest.mark.asyncio
+async def test_revoked_token_is_rejected(monkeypatch):
+    """Test that revocation evicts the token and is persisted for other workers."""
+    revoked_tokens = FakeRevokedTokens()
+    monkeypatch.setattr(token_cache_module, "get_async_mongo", lambda: SimpleNamespace(revoked_tokens=revoked_tokens))
+
+    cache = TokenCache(max_size=10, sync_interval=3600)
+    exp = time.time() + 60
+    decode, _ = make_decoder(exp)
+    cache.get_claims("token-a", decode)
+
+    await cache.revoke("token-a", exp)
+
+    with pytest.raises(ValueError):
+        cache.get_claims("token-a", decode)
+    assert len(revoked_tokens.docs) == 1
+    assert cache.stats()["size"] == 0